@@ -52,7 +52,7 @@ class DeviationDetector:
         Exponentially Weighted Moving Average.
         Returns severity if last point exceeds control limits.
         """
-        if not values:
+        if not values or std_dev == 0:
             return None
             
         z = mean
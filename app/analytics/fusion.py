@@ -1,10 +1,11 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Tuple
 import json
+import numpy as np
 
-from ..models import AnomalyEvent, Issue, TextRecord, SignalDefinition, BaselineStats
+from ..models import AnomalyEvent, Issue, TextRecord, SignalDefinition, BaselineStats, RegionClosure
 from ..analytics.nlp import NLPProcessor
 
 class FusionEngine:
@@ -12,6 +13,25 @@ class FusionEngine:
     Synthesizes multi-modal data (Numeric + Text) to assess Policy/Sector health.
     """
 
+    # (upper bound exclusive, label); scores at or above the last bound are LOW
+    SEVERITY_BANDS = [(40, "CRITICAL"), (70, "HIGH"), (90, "MEDIUM")]
+    # (lower bound exclusive, label); data point counts at or below the last bound are LOW
+    CONFIDENCE_BANDS = [(50, "HIGH"), (10, "MEDIUM")]
+
+    @staticmethod
+    def severity_label(score: float) -> str:
+        for bound, label in FusionEngine.SEVERITY_BANDS:
+            if score < bound:
+                return label
+        return "LOW"
+
+    @staticmethod
+    def confidence_label(data_points: int) -> str:
+        for bound, label in FusionEngine.CONFIDENCE_BANDS:
+            if data_points > bound:
+                return label
+        return "LOW"
+
     @staticmethod
     def calculate_policy_health(
         db: Session, 
@@ -40,11 +60,23 @@ class FusionEngine:
         # Here we assume category roughly matches or we rely on explicit mapping.
         # For demo, we fetch all issues in region and filter by "relevant" keywords if needed,
         # or assume strictly linked if schema supported it. 
-        # We'll fetch all issues for the region for now as a proxy for "Civic Health".
-        issues = db.query(Issue).filter(
+        # We'll use all issues for the region for now as a proxy for "Civic Health".
+        # Classified issues are aggregated in SQL; any not yet classified are scored here.
+        # Near-duplicates of an earlier issue are left out, so each complaint counts once.
+        issue_count, sentiment_sum = db.query(func.count(Issue.id), func.sum(Issue.sentiment_score)).filter(
+            Issue.region_id == region_id,
+            Issue.created_at >= start_date,
+            Issue.canonical_issue_id == None
+        ).one()
+        unclassified = db.query(Issue.title, Issue.description).filter(
             Issue.region_id == region_id,
-            Issue.created_at >= start_date
+            Issue.created_at >= start_date,
+            Issue.sentiment_score == None,
+            Issue.canonical_issue_id == None
         ).all()
+        sentiment_sum = (sentiment_sum or 0.0) + sum(
+            NLPProcessor.compute_sentiment(f"{title} {description}") for title, description in unclassified
+        )
         
         # --- Scoring Logic ---
         score = 100.0
@@ -52,7 +84,7 @@ class FusionEngine:
             "numeric_anomalies": [],
             "nlp_insights": [],
             "sentiment_score": 0.0,
-            "total_reports": len(issues)
+            "total_reports": issue_count
         }
         
         # Penalty: Numeric Anomalies
@@ -65,14 +97,8 @@ class FusionEngine:
             evidence["numeric_anomalies"].append(f"Signal {a.signal_id} deviation: {severity:.2f} sigma")
         
         # Penalty: NLP Sentiment & Volume
-        if issues:
-            sentiments = []
-            for i in issues:
-                text = f"{i.title} {i.description}"
-                s = NLPProcessor.compute_sentiment(text)
-                sentiments.append(s)
-            
-            avg_sentiment = sum(sentiments) / len(sentiments)
+        if issue_count:
+            avg_sentiment = sentiment_sum / issue_count
             evidence["sentiment_score"] = round(avg_sentiment, 2)
             
             if avg_sentiment < 0:
@@ -80,38 +106,133 @@ class FusionEngine:
                 evidence["nlp_insights"].append(f"Negative citizen sentiment ({avg_sentiment:.2f})")
             
             # Volume penalty (e.g. > 10 issues is bad)
-            if len(issues) > 10:
+            if issue_count > 10:
                 score -= 10
-                evidence["nlp_insights"].append(f"High issue volume ({len(issues)} reports)")
+                evidence["nlp_insights"].append(f"High issue volume ({issue_count} reports)")
         
         # Clamp Score
         score = max(0.0, min(100.0, score))
         
         # Determine Severity Label
-        if score < 40:
-            severity_label = "CRITICAL"
-        elif score < 70:
-            severity_label = "HIGH"
-        elif score < 90:
-            severity_label = "MEDIUM"
-        else:
-            severity_label = "LOW"
+        severity_label = FusionEngine.severity_label(score)
             
         # Determine Confidence (Data Density)
-        data_points = len(anomalies) + len(issues)
-        if data_points > 50:
-            confidence = "HIGH"
-        elif data_points > 10:
-            confidence = "MEDIUM"
-        else:
-            confidence = "LOW"
+        data_points = len(anomalies) + issue_count
+        confidence = FusionEngine.confidence_label(data_points)
             
         return {
             "score": round(score, 1),
             "severity": severity_label,
             "confidence": confidence,
             "evidence": evidence,
-            "primary_anomaly": anomalies[0] if anomalies else None
+            "primary_anomaly": anomalies[0] if anomalies else None,
+            "primary_anomaly_id": anomalies[0].id if anomalies else None
+        }
+
+    @staticmethod
+    def calculate_health_matrix(
+        db: Session,
+        region_ids: List[str],
+        sector_ids: List[str],
+        window_days: int = 7,
+        include_descendants: bool = False
+    ) -> Dict[str, np.ndarray]:
+        """
+        Batch form of calculate_policy_health for every (region, sector) pair.
+        Anomaly penalties and issue volume/sentiment each come from one GROUP BY,
+        and scoring is vectorized.
+        With include_descendants, each region also absorbs data from its whole subtree.
+        Returns (regions x sectors) arrays: score, severity, confidence, anomaly_count,
+        and per-region arrays: issue_count, sentiment_score.
+        """
+        start_date = datetime.now() - timedelta(days=window_days)
+        r_index = {r: i for i, r in enumerate(region_ids)}
+        s_index = {s: j for j, s in enumerate(sector_ids)}
+        shape = (len(region_ids), len(sector_ids))
+
+        anomaly_penalty = np.zeros(shape)
+        anomaly_count = np.zeros(shape, dtype=int)
+        issue_count = np.zeros(len(region_ids), dtype=int)
+        sentiment_sum = np.zeros(len(region_ids))
+
+        # 1. Numeric anomaly penalties, capped per anomaly as in the single-context path
+        raw_penalty = func.coalesce(AnomalyEvent.severity, 0) * 5
+        capped_penalty = case((raw_penalty > 30, 30), else_=raw_penalty)
+        if include_descendants:
+            region_col = RegionClosure.ancestor_id
+            anomaly_query = db.query(region_col, SignalDefinition.sector_id, func.sum(capped_penalty), func.count(AnomalyEvent.id)).join(
+                RegionClosure, RegionClosure.descendant_id == AnomalyEvent.region_id
+            )
+        else:
+            region_col = AnomalyEvent.region_id
+            anomaly_query = db.query(region_col, SignalDefinition.sector_id, func.sum(capped_penalty), func.count(AnomalyEvent.id))
+        anomaly_rows = anomaly_query.join(
+            SignalDefinition, SignalDefinition.id == AnomalyEvent.signal_id
+        ).filter(
+            AnomalyEvent.timestamp >= start_date,
+            region_col.in_(region_ids),
+            SignalDefinition.sector_id.in_(sector_ids)
+        ).group_by(region_col, SignalDefinition.sector_id).all()
+
+        for r_id, s_id, penalty, count in anomaly_rows:
+            i, j = r_index[r_id], s_index[s_id]
+            anomaly_penalty[i, j] = penalty or 0.0
+            anomaly_count[i, j] = count
+
+        # 2. Issue volume and sentiment per region (issues are not sector-specific)
+        issue_region = RegionClosure.ancestor_id if include_descendants else Issue.region_id
+
+        def issue_base(*cols):
+            query = db.query(issue_region, *cols)
+            if include_descendants:
+                query = query.join(RegionClosure, RegionClosure.descendant_id == Issue.region_id)
+            return query
+
+        issue_rows = issue_base(func.count(Issue.id), func.sum(Issue.sentiment_score)).filter(
+            issue_region.in_(region_ids),
+            Issue.created_at >= start_date,
+            Issue.canonical_issue_id == None
+        ).group_by(issue_region).all()
+        for r_id, count, total in issue_rows:
+            i = r_index[r_id]
+            issue_count[i] = count
+            sentiment_sum[i] = total or 0.0
+
+        # Issues not yet classified by the NLP job are scored here
+        unclassified = issue_base(Issue.title, Issue.description).filter(
+            issue_region.in_(region_ids),
+            Issue.created_at >= start_date,
+            Issue.sentiment_score == None,
+            Issue.canonical_issue_id == None
+        )
+        for r_id, title, description in unclassified.yield_per(1000):
+            sentiment_sum[r_index[r_id]] += NLPProcessor.compute_sentiment(f"{title} {description}")
+
+        avg_sentiment = np.divide(sentiment_sum, issue_count, out=np.zeros(len(region_ids)), where=issue_count > 0)
+
+        # 3. Vectorized scoring
+        score = 100.0 - anomaly_penalty
+        sentiment_penalty = np.where(avg_sentiment < 0, np.abs(avg_sentiment) * 20, 0.0)
+        volume_penalty = np.where(issue_count > 10, 10.0, 0.0)
+        score -= (sentiment_penalty + volume_penalty)[:, None]
+        score = np.round(np.clip(score, 0.0, 100.0), 1)
+
+        severity = np.full(shape, "LOW", dtype=object)
+        for bound, label in reversed(FusionEngine.SEVERITY_BANDS):
+            severity[score < bound] = label
+
+        data_points = anomaly_count + issue_count[:, None]
+        confidence = np.full(shape, "LOW", dtype=object)
+        for bound, label in reversed(FusionEngine.CONFIDENCE_BANDS):
+            confidence[data_points > bound] = label
+
+        return {
+            "score": score,
+            "severity": severity,
+            "confidence": confidence,
+            "anomaly_count": anomaly_count,
+            "issue_count": issue_count,
+            "sentiment_score": np.round(avg_sentiment, 2)
         }
 
     @staticmethod
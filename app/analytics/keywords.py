@@ -0,0 +1,90 @@
+import re
+from typing import Dict, Iterable, List, Set
+
+# Python's \w misses Tamil vowel signs and virama (categories Mn/Mc), so \b would
+# split Tamil words apart. Treat the whole Tamil block as word characters instead.
+WORD_CHARS = r"\w஀-௿"
+TAMIL_CHARS = re.compile(r"[஀-௿]")
+VIRAMA = "்"
+
+# Inflections accepted after an English keyword ("delay" -> "delayed", "wait" -> "waiting")
+ENGLISH_SUFFIXES = r"(?:s|es|ed|d|ing)?"
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex alternation factored into a trie ("bad|bribe" -> "b(?:ad|ribe)"), so the
+    engine follows one branch per character instead of trying every keyword in turn.
+    """
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        alternation = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # A word ending here makes the longer continuations optional (greedy, so longest wins)
+        return f"(?:{alternation})?" if "" in node else alternation
+
+    return build(trie)
+
+class KeywordMatcher:
+    """
+    Finds every labelled keyword in a text with one scan of a single precompiled regex.
+    English keywords must be whole words (allowing common inflections), so "no" no longer
+    matches "know" and "pay" no longer matches "repayment". Tamil keywords are stems
+    matched at a word start, since Tamil attaches case and tense suffixes directly.
+    A keyword may carry several labels (e.g. "bad" is both a failure type and negative).
+    """
+
+    def __init__(self, labelled_keywords: Dict[str, Iterable[str]]):
+        self.labels_by_keyword: Dict[str, List[str]] = {}
+        for label, keywords in labelled_keywords.items():
+            for k in keywords:
+                self.labels_by_keyword.setdefault(k.lower(), []).append(label)
+
+        # A Tamil word ending in a bare consonant (virama) takes a vowel sign on that
+        # consonant when inflected (மோசம் -> மோசமாக), so match the stem without the virama
+        self.keywords_by_stem: Dict[str, Set[str]] = {}
+        for k in self.labels_by_keyword:
+            stem = k[:-1] if TAMIL_CHARS.search(k) and k.endswith(VIRAMA) else k
+            self.keywords_by_stem.setdefault(stem, set()).add(k)
+
+        english = [s for s in self.keywords_by_stem if not TAMIL_CHARS.search(s)]
+        tamil = [s for s in self.keywords_by_stem if TAMIL_CHARS.search(s)]
+        branches = []
+        if english:
+            branches.append(f"({trie_pattern(english)}){ENGLISH_SUFFIXES}(?![{WORD_CHARS}])")
+        if tamil:
+            branches.append(f"({trie_pattern(tamil)})")
+        self.pattern = re.compile(f"(?<![{WORD_CHARS}])(?:{'|'.join(branches)})") if branches else None
+
+    def keywords(self, text: str) -> Set[str]:
+        """
+        Distinct keywords present in the text.
+        """
+        if not text or self.pattern is None:
+            return set()
+        found = set()
+        for groups in set(self.pattern.findall(text.lower())):
+            for stem in (groups if isinstance(groups, tuple) else (groups,)):
+                if stem:
+                    found.update(self.keywords_by_stem[stem])
+        return found
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """
+        Label -> distinct keywords of that label found in the text.
+        """
+        hits: Dict[str, Set[str]] = {}
+        for k in self.keywords(text):
+            for label in self.labels_by_keyword[k]:
+                hits.setdefault(label, set()).add(k)
+        return hits
+
+    def match_batch(self, texts: List[str]) -> List[Dict[str, Set[str]]]:
+        return [self.match(t) for t in texts]
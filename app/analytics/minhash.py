@@ -0,0 +1,132 @@
+import re
+import zlib
+import hashlib
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
+
+from .keywords import WORD_CHARS
+
+MERSENNE_PRIME = (1 << 31) - 1
+NON_WORD = re.compile(f"[^{WORD_CHARS}]+")
+
+class MinHasher:
+    """
+    MinHash signatures over character shingles of normalized text. Character
+    shingles need no tokenizer, so Tamil and English are handled alike.
+    Uses (a*x + b) mod p permutations with p < 2^31 so products fit in uint64,
+    and crc32 shingle hashes so signatures are stable across processes.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        normalized = " ".join(NON_WORD.sub(" ", (text or "").lower()).split())
+        if len(normalized) <= self.shingle_size:
+            return {normalized} if normalized else set()
+        k = self.shingle_size
+        return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+        ) % MERSENNE_PRIME
+        return ((np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME).min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """
+        Estimated Jaccard similarity of the two shingle sets.
+        """
+        return float(np.mean(sig_a == sig_b))
+
+class MinHashLSH:
+    """
+    Banded LSH over MinHash signatures: two documents become candidates when all rows
+    of at least one band agree, so only a handful of buckets are read per lookup.
+    With 16 bands of 8 rows the candidate probability passes 50% around Jaccard 0.7;
+    candidates are then checked against `threshold` on the full signature.
+    Buckets are scoped (e.g. per region), so documents only match within their scope,
+    and entries carry a timestamp so lookups can be limited to a time window.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.buckets: Dict[int, List[str]] = {}
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.scopes: Dict[str, str] = {}
+        self.timestamps: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _bucket_keys(self, scope: str, signature: np.ndarray) -> List[int]:
+        keys = []
+        prefix = scope.encode("utf-8") + b"\x00"
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(prefix + bytes([band]) + chunk, digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "little"))
+        return keys
+
+    def query(self, signature: np.ndarray, scope: str, timestamp: Optional[float] = None,
+              window: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Indexed documents in the same scope at or above the similarity threshold
+        (and within `window` seconds of `timestamp`), most similar first.
+        """
+        candidates = set()
+        for key in self._bucket_keys(scope, signature):
+            candidates.update(self.buckets.get(key, ()))
+
+        matches = []
+        for doc_id in candidates:
+            if window is not None and timestamp is not None and abs(self.timestamps[doc_id] - timestamp) > window:
+                continue
+            similarity = MinHasher.similarity(signature, self.signatures[doc_id])
+            if similarity >= self.threshold:
+                matches.append((doc_id, similarity))
+        matches.sort(key=lambda m: (-m[1], self.timestamps[m[0]]))
+        return matches
+
+    def insert(self, doc_id: str, signature: np.ndarray, scope: str, timestamp: float):
+        if doc_id in self.signatures:
+            self.remove(doc_id)
+        self.signatures[doc_id] = signature
+        self.scopes[doc_id] = scope
+        self.timestamps[doc_id] = timestamp
+        for key in self._bucket_keys(scope, signature):
+            self.buckets.setdefault(key, []).append(doc_id)
+
+    def remove(self, doc_id: str):
+        signature = self.signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        scope = self.scopes.pop(doc_id)
+        self.timestamps.pop(doc_id)
+        for key in self._bucket_keys(scope, signature):
+            bucket = self.buckets.get(key)
+            if bucket:
+                bucket.remove(doc_id)
+                if not bucket:
+                    del self.buckets[key]
+
+    def prune(self, before: float) -> int:
+        """
+        Drops documents older than `before`, keeping memory bounded by the window.
+        """
+        stale = [doc_id for doc_id, ts in self.timestamps.items() if ts < before]
+        for doc_id in stale:
+            self.remove(doc_id)
+        return len(stale)
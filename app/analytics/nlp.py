@@ -1,15 +1,13 @@
 import re
-import numpy as np
 from typing import List, Dict, Tuple
 from collections import Counter
-# Assuming scikit-learn is available for the requested TF-IDF + KMeans feature
-# If not, this would need to be replaced with a naive implementation
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+
+from .keywords import KeywordMatcher, WORD_CHARS
 
 class NLPProcessor:
     
     TAMIL_UNICODE_RANGE = (0x0B80, 0x0BFF)
+    TAMIL_PATTERN = re.compile(f"[{chr(TAMIL_UNICODE_RANGE[0])}-{chr(TAMIL_UNICODE_RANGE[1])}]")
     
     FAILURE_KEYWORDS = {
         "delay": ["late", "wait", "delay", "pending", "slow", "தாமதம்", "காத்திரு", "மெதுவாக"],
@@ -23,6 +21,10 @@ class NLPProcessor:
     SENTIMENT_POSITIVE = ["good", "great", "fast", "thanks", "resolved", "நன்று", "நன்றி", "விரைவு"]
     SENTIMENT_NEGATIVE = ["bad", "worst", "slow", "angry", "fail", "மோசம்", "கோபம்", "தோல்வி"]
 
+    # Keyword surge terms
+    TERM_PATTERN = re.compile(f"[{WORD_CHARS}]+")
+    MIN_TERM_LENGTH = 4
+
     @staticmethod
     def detect_language(text: str) -> str:
         """
@@ -31,91 +33,89 @@ class NLPProcessor:
         if not text:
             return "en"
         
-        tamil_char_count = sum(1 for char in text if NLPProcessor.TAMIL_UNICODE_RANGE[0] <= ord(char) <= NLPProcessor.TAMIL_UNICODE_RANGE[1])
-        if tamil_char_count > 0:
+        if NLPProcessor.TAMIL_PATTERN.search(text):
             return "ta"
         return "en"
 
+    # Sentiment labels share the matcher with the failure categories, so one scan finds both
+    POSITIVE_LABEL = "sentiment:positive"
+    NEGATIVE_LABEL = "sentiment:negative"
+
+    matcher = KeywordMatcher({
+        **FAILURE_KEYWORDS,
+        POSITIVE_LABEL: SENTIMENT_POSITIVE,
+        NEGATIVE_LABEL: SENTIMENT_NEGATIVE
+    })
+
+    @staticmethod
+    def _failure_type_from_hits(hits: Dict) -> str:
+        # First category in FAILURE_KEYWORDS order wins, as before
+        for category in NLPProcessor.FAILURE_KEYWORDS:
+            if category in hits:
+                return category
+        return "other"
+
+    @staticmethod
+    def _sentiment_from_hits(hits: Dict) -> float:
+        pos_score = len(hits.get(NLPProcessor.POSITIVE_LABEL, ()))
+        neg_score = len(hits.get(NLPProcessor.NEGATIVE_LABEL, ()))
+
+        total = pos_score + neg_score
+        if total == 0:
+            return 0.0
+
+        return (pos_score - neg_score) / total
+
     @staticmethod
     def categorize_failure_type(text: str) -> str:
         """
         Categorize into delay, denial, quality, access, awareness, corruption based on keywords.
         Returns 'other' if no match.
         """
-        text_lower = text.lower()
-        for category, keywords in NLPProcessor.FAILURE_KEYWORDS.items():
-            if any(k in text_lower for k in keywords):
-                return category
-        return "other"
+        return NLPProcessor._failure_type_from_hits(NLPProcessor.matcher.match(text))
 
     @staticmethod
     def compute_sentiment(text: str) -> float:
         """
         Returns a score between -1.0 (Negative) and 1.0 (Positive).
-        Simple keyword counting approach.
+        Simple keyword counting approach: each distinct keyword counts once.
         """
-        text_lower = text.lower()
-        pos_score = sum(1 for w in NLPProcessor.SENTIMENT_POSITIVE if w in text_lower)
-        neg_score = sum(1 for w in NLPProcessor.SENTIMENT_NEGATIVE if w in text_lower)
-        
-        total = pos_score + neg_score
-        if total == 0:
-            return 0.0
-        
-        return (pos_score - neg_score) / total
+        return NLPProcessor._sentiment_from_hits(NLPProcessor.matcher.match(text))
 
     @staticmethod
-    def cluster_topics(texts: List[str], num_clusters: int = 5) -> List[Dict]:
+    def analyze(text: str) -> Dict:
         """
-        Uses TF-IDF and KMeans to cluster texts and extract top terms per cluster.
+        Language, sentiment and failure type in the shape stored on Issue/TextRecord.
         """
-        if not texts or len(texts) < num_clusters:
-            return []
+        hits = NLPProcessor.matcher.match(text)
+        return {
+            "language": NLPProcessor.detect_language(text),
+            "sentiment_score": NLPProcessor._sentiment_from_hits(hits),
+            "failure_type": NLPProcessor._failure_type_from_hits(hits)
+        }
 
-        try:
-            vectorizer = TfidfVectorizer(max_df=0.5, min_df=2, stop_words='english', max_features=1000)
-            tfidf_matrix = vectorizer.fit_transform(texts)
-            
-            km = KMeans(n_clusters=num_clusters, init='k-means++', max_iter=100, n_init=1)
-            km.fit(tfidf_matrix)
-            
-            order_centroids = km.cluster_centers_.argsort()[:, ::-1]
-            terms = vectorizer.get_feature_names_out()
-            
-            clusters = []
-            for i in range(num_clusters):
-                top_terms = [terms[ind] for ind in order_centroids[i, :5]]
-                clusters.append({
-                    "cluster_id": i,
-                    "top_terms": top_terms,
-                    "count": int(np.sum(km.labels_ == i))
-                })
-            
-            return clusters
-        except Exception as e:
-            # Fallback for sparse data or import errors
-            return [{"cluster_id": 0, "top_terms": ["insufficient", "data"], "count": len(texts)}]
+    @staticmethod
+    def analyze_batch(texts: List[str]) -> List[Dict]:
+        return [NLPProcessor.analyze(t) for t in texts]
 
     @staticmethod
-    def compute_keyword_surge(current_texts: List[str], previous_texts: List[str], top_n: int = 10) -> List[Dict]:
+    def extract_terms(text: str) -> Counter:
         """
-        Compares word frequencies between two periods to find surging keywords.
+        Occurrences of each surge-candidate term: lowercased words of at least
+        MIN_TERM_LENGTH characters, Tamil words kept whole.
+        """
+        if not text:
+            return Counter()
+        return Counter(w for w in NLPProcessor.TERM_PATTERN.findall(text.lower()) if len(w) >= NLPProcessor.MIN_TERM_LENGTH)
+
+    @staticmethod
+    def surges_from_counts(curr_freq: Dict[str, int], prev_freq: Dict[str, int], top_n: int = 10) -> List[Dict]:
+        """
+        Terms whose count grew by more than 20% over the previous period.
+        `curr_freq` should hold the most frequent current terms (about 100).
         """
-        def get_freq(t_list):
-            words = []
-            for t in t_list:
-                # Basic tokenization
-                words.extend(re.findall(r'\w+', t.lower()))
-            return Counter(words)
-
-        curr_freq = get_freq(current_texts)
-        prev_freq = get_freq(previous_texts)
-        
         surges = []
-        # Filter for words present in current set with significant count
-        for word, count in curr_freq.most_common(100):
-            if len(word) < 4: continue # Skip small words
-            
+        for word, count in curr_freq.items():
             prev_count = prev_freq.get(word, 0)
             # Avoid division by zero, assume base 1
             prev_norm = max(prev_count, 1)
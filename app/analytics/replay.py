@@ -0,0 +1,136 @@
+import math
+import numpy as np
+from typing import Tuple
+from scipy.signal import lfilter
+
+class ReplayDetector:
+    """
+    Vectorized counterparts of DeviationDetector for replaying a full series history.
+    Every method takes the whole series and returns one severity per point
+    (NaN where no anomaly was flagged), using a trailing window as the baseline
+    so that a point is never compared against its own future.
+    """
+
+    @staticmethod
+    def rolling_stats(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Trailing (mean, sample std_dev) of the `window` points strictly before each point,
+        computed from cumulative sums in O(n). NaN until enough history exists.
+        """
+        n = len(values)
+        mean = np.full(n, np.nan)
+        std = np.full(n, np.nan)
+        if n <= window or window < 2:
+            return mean, std
+
+        # Shift by the series mean so the sum-of-squares trick does not lose precision
+        shift = values.mean()
+        x = values - shift
+        c1 = np.concatenate(([0.0], np.cumsum(x)))
+        c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+
+        # Window for point t covers [t - window, t)
+        s1 = c1[window:n] - c1[:n - window]
+        s2 = c2[window:n] - c2[:n - window]
+        var = (s2 - s1 * s1 / window) / (window - 1)
+
+        mean[window:] = s1 / window + shift
+        std[window:] = np.sqrt(np.clip(var, 0.0, None))
+        return mean, std
+
+    @staticmethod
+    def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+        """
+        Mean of the `window` points ending at (and including) each point. NaN before that.
+        """
+        n = len(values)
+        out = np.full(n, np.nan)
+        if n < window or window < 1:
+            return out
+        c = np.concatenate(([0.0], np.cumsum(values)))
+        out[window - 1:] = (c[window:] - c[:n - window + 1]) / window
+        return out
+
+    @staticmethod
+    def zscore(values: np.ndarray, window: int = 30, threshold: float = 3.0) -> np.ndarray:
+        mean, std = ReplayDetector.rolling_stats(values, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (values - mean) / std
+        z[~np.isfinite(z)] = np.nan
+        return np.where(np.abs(z) > threshold, z, np.nan)
+
+    @staticmethod
+    def ewma(values: np.ndarray, window: int = 30, lambda_: float = 0.2, threshold_sigma: float = 3.0) -> np.ndarray:
+        """
+        EWMA via a first-order IIR filter: z_t = lambda * x_t + (1 - lambda) * z_{t-1}.
+        The statistic is seeded with the first value and compared against the trailing baseline.
+        """
+        n = len(values)
+        if n == 0:
+            return np.array([])
+        mean, std = ReplayDetector.rolling_stats(values, window)
+        z, _ = lfilter([lambda_], [1.0, -(1.0 - lambda_)], values, zi=[(1.0 - lambda_) * values[0]])
+
+        control_limit = threshold_sigma * std * math.sqrt(lambda_ / (2 - lambda_))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            severity = (z - mean) / std
+        breached = np.abs(z - mean) > control_limit
+        severity[~np.isfinite(severity)] = np.nan
+        return np.where(breached & (std > 0), severity, np.nan)
+
+    @staticmethod
+    def cusum(values: np.ndarray, window: int = 30, drift: float = 1, threshold: float = 5) -> np.ndarray:
+        """
+        Tabular CUSUM against the trailing baseline. Accumulators reset after each alarm
+        so a single shift is reported once rather than on every following point.
+        The max(0, ...) recursion is not a linear filter, so this is a single O(n) pass.
+        """
+        n = len(values)
+        out = np.full(n, np.nan)
+        mean, std = ReplayDetector.rolling_stats(values, window)
+
+        c_plus = 0.0
+        c_minus = 0.0
+        for t in range(n):
+            mu, sd = mean[t], std[t]
+            if not np.isfinite(sd) or sd == 0:
+                continue
+            dev = values[t] - mu
+            k = drift * sd / 2
+            c_plus = max(0.0, c_plus + dev - k)
+            c_minus = max(0.0, c_minus - dev - k)
+            h = threshold * sd
+            if c_plus > h or c_minus > h:
+                out[t] = max(c_plus, c_minus) / sd
+                c_plus = 0.0
+                c_minus = 0.0
+        return out
+
+    @staticmethod
+    def sudden_drop(values: np.ndarray, window: int = 30, drop_percent: float = 0.3) -> np.ndarray:
+        n = len(values)
+        prev_avg = np.full(n, np.nan)
+        if n > window:
+            prev_avg[window:] = ReplayDetector.rolling_mean(values, window)[window - 1:n - 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drop = (prev_avg - values) / prev_avg
+        drop[~np.isfinite(drop)] = np.nan
+        return np.where(drop >= drop_percent, drop, np.nan)
+
+    @staticmethod
+    def changepoint(values: np.ndarray, window_size: int = 5, threshold_ratio: float = 1.5) -> np.ndarray:
+        """
+        Mean-shift ratio between the two adjacent windows ending at each point.
+        """
+        n = len(values)
+        out = np.full(n, np.nan)
+        if n < window_size * 2:
+            return out
+        means = ReplayDetector.rolling_mean(values, window_size)
+        mean2 = means[2 * window_size - 1:]
+        mean1 = means[window_size - 1:n - window_size]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.abs(mean2 - mean1) / np.abs(mean1)
+        ratio[~np.isfinite(ratio)] = np.nan
+        out[2 * window_size - 1:] = np.where(ratio > threshold_ratio, ratio, np.nan)
+        return out
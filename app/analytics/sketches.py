@@ -0,0 +1,159 @@
+import math
+import random
+import struct
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch (Karnin, Lang, Liberty 2016).
+    Keeps a stack of compactors where an item at level h stands for 2^h
+    original values, giving rank error around 1/k with O(k) memory.
+    """
+
+    HEADER = struct.Struct("<HIddH")  # k, count, min, max, levels
+
+    def __init__(self, k: int = 200, c: float = 2.0 / 3.0):
+        self.k = k
+        self.c = c
+        self.count = 0
+        self.min_value = math.inf
+        self.max_value = -math.inf
+        self.compactors: List[List[float]] = []
+        self.size = 0
+        self.max_size = 0
+        self._grow()
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], k: int = 200) -> "KLLSketch":
+        sketch = cls(k)
+        for v in values:
+            sketch.update(v)
+        return sketch
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _capacity(self, height: int) -> int:
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil(self.k * self.c ** depth)) + 1
+
+    def update(self, value: float):
+        value = float(value)
+        self.count += 1
+        self.min_value = min(self.min_value, value)
+        self.max_value = max(self.max_value, value)
+        self.compactors[0].append(value)
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def _compress(self):
+        for h in range(len(self.compactors)):
+            level = self.compactors[h]
+            if len(level) < self._capacity(h):
+                continue
+            if h + 1 >= len(self.compactors):
+                self._grow()
+            level.sort()
+            leftover = [level.pop()] if len(level) % 2 == 1 else []
+            offset = random.randint(0, 1)
+            self.compactors[h + 1].extend(level[offset::2])
+            self.compactors[h] = leftover
+            self.size = sum(len(c) for c in self.compactors)
+            if self.size < self.max_size:
+                break
+
+    def merge(self, other: "KLLSketch"):
+        """
+        Folds another sketch into this one in place.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, level in enumerate(other.compactors):
+            self.compactors[h].extend(level)
+        self.count += other.count
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        self.size = sum(len(c) for c in self.compactors)
+        while self.size >= self.max_size:
+            self._compress()
+
+    def _weighted_items(self):
+        values = np.fromiter((v for level in self.compactors for v in level), dtype=float, count=self.size)
+        weights = np.fromiter(
+            (2 ** h for h, level in enumerate(self.compactors) for _ in level), dtype=float, count=self.size
+        )
+        order = np.argsort(values, kind="stable")
+        return values[order], weights[order]
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        if self.count == 0:
+            return [None for _ in qs]
+        values, weights = self._weighted_items()
+        cum = np.cumsum(weights)
+        total = cum[-1]
+        results = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min_value)
+            elif q >= 1:
+                results.append(self.max_value)
+            else:
+                idx = int(np.searchsorted(cum, q * total, side="left"))
+                results.append(float(values[min(idx, len(values) - 1)]))
+        return results
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def robust_stats(self) -> Optional[Dict[str, float]]:
+        """
+        Median, quartiles, IQR and an approximate MAD.
+        MAD is the weighted median of |item - median| over the retained items.
+        """
+        if self.count < 2:
+            return None
+        q1, median, q3 = self.quantiles([0.25, 0.5, 0.75])
+        values, weights = self._weighted_items()
+        deviations = np.abs(values - median)
+        order = np.argsort(deviations, kind="stable")
+        cum = np.cumsum(weights[order])
+        idx = int(np.searchsorted(cum, 0.5 * cum[-1], side="left"))
+        mad = float(deviations[order][min(idx, len(order) - 1)])
+        return {
+            "median": median,
+            "q1": q1,
+            "q3": q3,
+            "iqr": q3 - q1,
+            "mad": mad,
+            "count": self.count
+        }
+
+    def to_bytes(self) -> bytes:
+        parts = [self.HEADER.pack(self.k, self.count, self.min_value, self.max_value, len(self.compactors))]
+        parts.append(struct.pack(f"<{len(self.compactors)}I", *(len(level) for level in self.compactors)))
+        parts.append(np.array([v for level in self.compactors for v in level], dtype="<f8").tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KLLSketch":
+        k, count, min_value, max_value, levels = cls.HEADER.unpack_from(data, 0)
+        offset = cls.HEADER.size
+        lengths = struct.unpack_from(f"<{levels}I", data, offset)
+        offset += 4 * levels
+        flat = np.frombuffer(data, dtype="<f8", offset=offset, count=sum(lengths)).tolist()
+
+        sketch = cls(k)
+        while len(sketch.compactors) < levels:
+            sketch._grow()
+        pos = 0
+        for h, n in enumerate(lengths):
+            sketch.compactors[h] = flat[pos:pos + n]
+            pos += n
+        sketch.count = count
+        sketch.min_value = min_value
+        sketch.max_value = max_value
+        sketch.size = pos
+        return sketch
@@ -0,0 +1,131 @@
+import os
+import threading
+import joblib
+import numpy as np
+from typing import Dict, List, Optional
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.cluster import MiniBatchKMeans
+
+from ..config import settings
+from .keywords import WORD_CHARS
+
+class TopicModel:
+    """
+    Topic clusters trained incrementally: texts are hashed into a fixed feature space
+    (no vocabulary to refit) and fed to MiniBatchKMeans.partial_fit, so a training run
+    only reads documents it has not seen and cluster ids stay stable between runs.
+    Hashing discards the terms themselves, so the first token seen at each feature
+    index is remembered to label the clusters.
+    """
+
+    N_FEATURES = 2 ** 16
+    MAX_TERMS = 200_000
+
+    def __init__(self, num_clusters: int = 8, random_state: int = 0):
+        self.num_clusters = num_clusters
+        self.vectorizer = HashingVectorizer(
+            n_features=self.N_FEATURES,
+            # Same word definition as the keyword matcher, so Tamil words stay whole
+            token_pattern=f"[{WORD_CHARS}]{{2,}}",
+            stop_words="english",
+            alternate_sign=False,
+            norm="l2"
+        )
+        self.kmeans = MiniBatchKMeans(n_clusters=num_clusters, random_state=random_state, n_init=3)
+        self.terms: Dict[int, str] = {}
+        self.documents_seen = 0
+
+    @property
+    def is_fitted(self) -> bool:
+        return hasattr(self.kmeans, "cluster_centers_")
+
+    def _remember_terms(self, texts: List[str]):
+        if len(self.terms) >= self.MAX_TERMS:
+            return
+        analyzer = self.vectorizer.build_analyzer()
+        tokens = sorted({token for t in texts for token in analyzer(t)})
+        if not tokens:
+            return
+        # Each token on its own hashes to exactly one column
+        indices = self.vectorizer.transform(tokens).indices
+        for token, index in zip(tokens, indices):
+            self.terms.setdefault(int(index), token)
+
+    def partial_fit(self, texts: List[str]) -> bool:
+        """
+        Updates the centroids with one batch. The first batch must hold at least
+        `num_clusters` texts to seed them; returns False if it was skipped.
+        """
+        if not texts or (not self.is_fitted and len(texts) < self.num_clusters):
+            return False
+        self.kmeans.partial_fit(self.vectorizer.transform(texts))
+        self._remember_terms(texts)
+        self.documents_seen += len(texts)
+        return True
+
+    def predict(self, texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        return [int(c) for c in self.kmeans.predict(self.vectorizer.transform(texts))]
+
+    def top_terms(self, cluster_id: int, n: int = 5) -> List[str]:
+        terms = []
+        for index in np.argsort(self.kmeans.cluster_centers_[cluster_id])[::-1]:
+            if self.kmeans.cluster_centers_[cluster_id, index] <= 0:
+                break
+            term = self.terms.get(int(index))
+            if term:
+                terms.append(term)
+                if len(terms) == n:
+                    break
+        return terms
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        joblib.dump(self, tmp_path)
+        # Atomic swap so readers never load a half-written file
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> "TopicModel":
+        return joblib.load(path)
+
+class TopicModelStore:
+    """
+    Process-wide handle on the persisted topic model. The file is re-read whenever
+    its mtime changes, so workers and other processes pick up a retrained model.
+    """
+    _model: Optional[TopicModel] = None
+    _mtime: Optional[float] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> Optional[TopicModel]:
+        path = settings.TOPIC_MODEL_PATH
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        with cls._lock:
+            if mtime != cls._mtime:
+                cls._model = TopicModel.load(path)
+                cls._mtime = mtime
+            return cls._model
+
+    @classmethod
+    def put(cls, model: TopicModel):
+        model.save(settings.TOPIC_MODEL_PATH)
+        with cls._lock:
+            cls._model = model
+            cls._mtime = os.stat(settings.TOPIC_MODEL_PATH).st_mtime
+
+    @classmethod
+    def assign(cls, texts: List[str]) -> List[Optional[int]]:
+        """
+        Cluster id per text, or None for all of them until a model has been trained.
+        """
+        model = cls.get()
+        if model is None or not model.is_fitted:
+            return [None] * len(texts)
+        return model.predict(texts)
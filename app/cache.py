@@ -0,0 +1,47 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class TTLCache:
+    """
+    Thread-safe in-process cache whose entries expire `ttl` seconds after they are put.
+    Holds at most `max_entries`, dropping the oldest insert first. Each worker process
+    has its own copy, so the TTL bounds staleness from writers in other processes.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                # Dicts keep insertion order, so this drops the oldest entry
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]):
+        """
+        Drops every entry whose key matches `predicate`.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings
 
@@ -20,6 +20,49 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./civic_radar.db"
 
+    # Caching
+    NLP_INSIGHTS_CACHE_TTL_SECONDS: int = 3600 # Completed-day aggregates; 0 disables
+    ADMIN_INSIGHTS_CACHE_TTL_SECONDS: int = 300
+
+    # Alert sweep
+    ALERT_SWEEP_WORKERS: int = 4
+
+    # Event stream
+    EVENT_BUFFER_SIZE: int = 1000
+    EVENT_QUEUE_SIZE: int = 256
+    EVENT_HEARTBEAT_SECONDS: int = 15
+
+    # Alert explanations
+    EXPLANATION_LRU_SIZE: int = 1024 # 0 disables the in-memory layer; the table is always used
+    EXPLANATION_PREGENERATE: bool = True
+
+    # NLP backlog job
+    NLP_BACKLOG_CHUNK_SIZE: int = 2000
+    NLP_BACKLOG_WORKERS: int = 2 # 0 classifies in the calling process
+
+    # Topic model
+    TOPIC_MODEL_PATH: str = "data/topic_model.joblib"
+    TOPIC_CLUSTERS: int = 8
+    TOPIC_TRAIN_BATCH_SIZE: int = 2000
+
+    # Duplicate issue detection
+    DEDUP_INDEX_PATH: str = "data/dedup_index.joblib"
+    DEDUP_THRESHOLD: float = 0.8 # Estimated Jaccard similarity of character shingles
+    DEDUP_WINDOW_DAYS: int = 30 # Only issues this close in time can be duplicates
+
+    # Rule-based issue triage
+    AI_TRIAGE_CACHE_SIZE: int = 50000 # Distinct normalized descriptions kept; 0 disables
+    AI_TRIAGE_BATCH_MAX: int = 10000
+
+    # LLM client
+    GEMINI_BASE_URL: Optional[str] = None # e.g. http://127.0.0.1:8090 for scripts/llm_stub_server.py
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_TIMEOUT_SECONDS: float = 20.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_BACKOFF_SECONDS: float = 0.5
+    LLM_BREAKER_FAILURES: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+
     class Config:
         case_sensitive = True
         env_file = ".env"
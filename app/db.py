@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+import logging
+from sqlalchemy import create_engine, inspect, literal, text
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import settings
 
@@ -21,7 +22,52 @@ def get_db():
     finally:
         db.close()
 
+logger = logging.getLogger("civic_radar")
+
 def init_db():
     # Tables are created here. 
     # Models must be imported before calling this in a real application context.
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+def _column_ddl(column, dialect) -> str:
+    ddl = f"{column.name} {column.type.compile(dialect=dialect)}"
+    # Only constant defaults can fill existing rows (SQLite rejects e.g. CURRENT_TIMESTAMP here)
+    default = None
+    if column.default is not None and column.default.is_scalar:
+        default = literal(column.default.arg).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    if not column.nullable and default is not None:
+        ddl += " NOT NULL"
+    for fk in column.foreign_keys:
+        ddl += f" REFERENCES {fk.column.table.name}({fk.column.name})"
+        if fk.ondelete:
+            ddl += f" ON DELETE {fk.ondelete}"
+    return ddl
+
+def upgrade_schema():
+    """
+    Brings tables created by an older version up to the models (idempotent; run at
+    startup). create_all never alters existing tables, so columns added since are
+    added with ALTER TABLE and missing indexes are created. Columns are added
+    nullable unless the model gives them a default to fill existing rows with.
+    Values stored in an older format are rewritten to the current one.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, engine.dialect)}"))
+                    logger.info(f"Added column {table.name}.{column.name}.")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        if engine.dialect.name == "sqlite" and "alerts" in existing_tables:
+            # Alerts stored through server_default=func.now() carry no fractional seconds, so the
+            # keyset tie-break on created_at never equals a bound cursor value ('.000000')
+            conn.execute(text("UPDATE alerts SET created_at = created_at || '.000000' WHERE created_at NOT LIKE '%.%'"))
@@ -1,35 +1,239 @@
 import os
+import asyncio
 import logging
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, Optional
 from google import genai
-from google.genai import types
+from google.genai import types, errors
+
+from ..config import settings
 
 logger = logging.getLogger("civic_radar")
 
 # Try to get API Key from env
 API_KEY = os.environ.get("API_KEY") or os.environ.get("GEMINI_API_KEY")
+MODEL_NAME = "gemini-2.0-flash-exp"
+
+# Provider errors worth retrying; anything else (bad request, auth) fails at once
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures. While open, calls
+    are refused until `reset_timeout` has passed; then a single trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> bool:
+        """True when this call is the half-open trial."""
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_in_flight:
+                raise CircuitOpenError()
+            self.trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """Frees the trial slot of a call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning("LLM circuit breaker opened after repeated failures.")
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+class LLMMetrics:
+    """
+    Counters plus a window of recent call latencies (successful or not, excluding short-circuits).
+    """
+
+    def __init__(self, window: int = 500):
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
 
-def generate_alert_explanation(prompt_text: str) -> str | None:
+    def observe(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            counters = {
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "retries": self.retries,
+                "short_circuited": self.short_circuited
+            }
+
+        def pct(q):
+            return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 1) if latencies else None
+
+        counters["latency_ms"] = {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0), "samples": len(latencies)}
+        return counters
+
+class GeminiClient:
+    """
+    Long-lived async Gemini client shared by the process.
+    Concurrency is capped per event loop, each attempt has a timeout, retryable
+    errors back off exponentially, and a circuit breaker turns a failing provider
+    into an immediate None so callers fall back without waiting.
+    """
+
+    def __init__(self, api_key: Optional[str], base_url: Optional[str] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.breaker = CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_SECONDS)
+        self.metrics = LLMMetrics()
+        # The SDK's async transport is bound to the loop it was first used on,
+        # so the client, like the semaphore, is kept per event loop
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, genai.Client]" = weakref.WeakKeyDictionary()
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    def _client(self) -> genai.Client:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = genai.Client(
+                api_key=self.api_key,
+                http_options=types.HttpOptions(
+                    base_url=self.base_url,
+                    # Retries are handled here so the breaker and metrics see every attempt
+                    retry_options=types.HttpRetryOptions(attempts=1)
+                )
+            )
+        return client
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        return semaphore
+
+    @staticmethod
+    def _retryable(e: Exception) -> bool:
+        if isinstance(e, asyncio.TimeoutError):
+            return True
+        if isinstance(e, errors.APIError):
+            return e.code in RETRYABLE_STATUS_CODES
+        # Connection-level failures (refused, reset) carry no status code
+        return not isinstance(e, (ValueError, TypeError))
+
+    async def _attempt(self, prompt_text: str) -> Optional[str]:
+        async with self._semaphore():
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    self._client().aio.models.generate_content(
+                        model=MODEL_NAME,
+                        contents=prompt_text,
+                        config=types.GenerateContentConfig(
+                            temperature=0.3, # Low temperature for factual summarization
+                            max_output_tokens=300
+                        )
+                    ),
+                    timeout=settings.LLM_TIMEOUT_SECONDS
+                )
+                return response.text
+            finally:
+                self.metrics.observe(time.perf_counter() - start)
+
+    async def generate(self, prompt_text: str) -> Optional[str]:
+        """
+        Generated text, or None if the key is missing, the circuit is open
+        or every attempt failed.
+        """
+        if not self.api_key:
+            logger.warning("Gemini API Key missing. Skipping LLM generation.")
+            return None
+        try:
+            trial = self.breaker.before_call()
+        except CircuitOpenError:
+            self.metrics.incr("short_circuited")
+            return None
+
+        self.metrics.incr("calls")
+        settled = False
+        try:
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                try:
+                    text = await self._attempt(prompt_text)
+                    self.breaker.record_success()
+                    settled = True
+                    self.metrics.incr("successes")
+                    return text
+                except Exception as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.metrics.incr("timeouts")
+                    if attempt < settings.LLM_MAX_RETRIES and self._retryable(e):
+                        self.metrics.incr("retries")
+                        delay = settings.LLM_BACKOFF_SECONDS * (2 ** attempt)
+                        await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                        continue
+                    logger.error(f"Gemini generation failed: {e!r}")
+                    self.breaker.record_failure()
+                    settled = True
+                    self.metrics.incr("failures")
+                    return None
+        finally:
+            # CancelledError is a BaseException and skips the handler above; a
+            # cancelled trial must not hold the half-open slot forever
+            if trial and not settled:
+                self.breaker.release_trial()
+
+gemini = GeminiClient(API_KEY, settings.GEMINI_BASE_URL)
+
+async def generate_alert_explanation_async(prompt_text: str) -> str | None:
     """
     Generates a text summary using Gemini.
     Returns None if API key is missing or request fails.
     """
-    if not API_KEY:
-        logger.warning("Gemini API Key missing. Skipping LLM generation.")
-        return None
-
-    try:
-        client = genai.Client(api_key=API_KEY)
-        
-        # Using the model specified for basic text tasks in guidelines
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp", 
-            contents=prompt_text,
-            config=types.GenerateContentConfig(
-                temperature=0.3, # Low temperature for factual summarization
-                max_output_tokens=300
-            )
-        )
-        return response.text
-    except Exception as e:
-        logger.error(f"Gemini generation failed: {e}")
-        return None
+    return await gemini.generate(prompt_text)
@@ -2,10 +2,11 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
-from .db import init_db
+from .db import init_db, SessionLocal
 # Import models so they are registered with SQLAlchemy Base
 from . import models
-from .routers import auth, policies, regions, datasets, ingest, surveys, ngo_reports, analytics, nlp, alerts, explain, reports, ai
+from .routers import auth, policies, regions, datasets, ingest, surveys, ngo_reports, analytics, nlp, alerts, explain, reports, ai, fusion, events, search
+from .services import region_service, search_service
 
 # Setup Structured Logging
 logging.basicConfig(
@@ -48,6 +49,18 @@ def on_startup():
     init_db()
     logger.info("Database initialized successfully.")
 
+    # Regions may have been inserted directly (seed scripts), so resync the closure table
+    db = SessionLocal()
+    try:
+        rows = region_service.rebuild_closure(db)
+        logger.info(f"Region closure table rebuilt ({rows} rows).")
+        tree = region_service.load_region_tree(db)
+        logger.info(f"Region tree cache loaded ({len(tree.by_id)} regions).")
+        backfilled = search_service.ensure_search_index(db)
+        logger.info(f"Search index ready ({backfilled} documents backfilled).")
+    finally:
+        db.close()
+
 @app.get("/health")
 def health_check():
     """
@@ -80,6 +93,9 @@ app.include_router(alerts.router, prefix=settings.API_V1_STR)
 app.include_router(explain.router, prefix=settings.API_V1_STR)
 app.include_router(reports.router, prefix=settings.API_V1_STR)
 app.include_router(ai.router, prefix=settings.API_V1_STR)
+app.include_router(fusion.router, prefix=settings.API_V1_STR)
+app.include_router(events.router, prefix=settings.API_V1_STR)
+app.include_router(search.router, prefix=settings.API_V1_STR)
 
 if __name__ == "__main__":
     import uvicorn
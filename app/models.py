@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Float, Enum as SqEnum, Index, JSON
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Float, Enum as SqEnum, Index, JSON, LargeBinary, Date, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime
 import uuid
 import enum
 from .db import Base
@@ -80,6 +81,18 @@ class Region(Base):
     numeric_records = relationship("NumericRecord", back_populates="region")
     text_records = relationship("TextRecord", back_populates="region")
 
+class RegionClosure(Base):
+    __tablename__ = "region_closure"
+
+    # One row per (ancestor, descendant) pair, including each region paired with itself at depth 0
+    ancestor_id = Column(String, ForeignKey("regions.id"), primary_key=True)
+    descendant_id = Column(String, ForeignKey("regions.id"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index('idx_closure_descendant', 'descendant_id', 'depth'),
+    )
+
 class Sector(Base):
     __tablename__ = "sectors"
     
@@ -119,12 +132,23 @@ class Issue(Base):
     region_id = Column(String, ForeignKey("regions.id"), nullable=True)
     
     ai_analysis = Column(Text, nullable=True)
+    # Typed NLP results (mirrors ai_analysis), NULL until classified
+    language = Column(String, nullable=True, index=True)
+    sentiment_score = Column(Float, nullable=True, index=True)
+    failure_type = Column(String, nullable=True, index=True)
+    topic_cluster = Column(Integer, nullable=True, index=True) # Id in the persisted topic model
+    # Set when the issue is a near-duplicate of an earlier one (see dedup_service); NULL for unique complaints
+    canonical_issue_id = Column(String, ForeignKey("issues.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     reporter = relationship("User", back_populates="issues")
     region = relationship("Region", back_populates="issues")
 
+    __table_args__ = (
+        Index('idx_issue_region_created', 'region_id', 'created_at'),
+    )
+
 # Signals & Analytics
 class SignalDefinition(Base):
     __tablename__ = "signal_definitions"
@@ -164,6 +188,11 @@ class TextRecord(Base):
     region_id = Column(String, ForeignKey("regions.id"))
     timestamp = Column(DateTime(timezone=True), index=True)
     value = Column(Text, nullable=False)
+    # Typed NLP results, NULL until classified
+    language = Column(String, nullable=True, index=True)
+    sentiment_score = Column(Float, nullable=True, index=True)
+    failure_type = Column(String, nullable=True, index=True)
+    topic_cluster = Column(Integer, nullable=True, index=True) # Id in the persisted topic model
 
     signal = relationship("SignalDefinition", back_populates="text_records")
     region = relationship("Region", back_populates="text_records")
@@ -182,6 +211,62 @@ class BaselineStats(Base):
     std_dev = Column(Float)
     computed_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class SignalRollup(Base):
+    __tablename__ = "signal_rollups"
+
+    # Daily aggregate of a signal over a region's whole subtree (via region_closure)
+    signal_id = Column(String, ForeignKey("signal_definitions.id"), primary_key=True)
+    region_id = Column(String, ForeignKey("regions.id"), primary_key=True)
+    bucket = Column(Date, primary_key=True)
+    value_sum = Column(Float, nullable=False)
+    value_count = Column(Integer, nullable=False)
+    value_min = Column(Float)
+    value_max = Column(Float)
+
+class SearchDocument(Base):
+    __tablename__ = "search_documents"
+
+    # Searchable copy of Issue and TextRecord text, maintained by database triggers
+    # (see search_service.ensure_search_index). The integer id is the full-text rowid.
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    doc_type = Column(String, nullable=False) # "issue" or "text_record"
+    doc_id = Column(String, nullable=False)
+    region_id = Column(String, nullable=True)
+    ts = Column(DateTime(timezone=True), nullable=True)
+    title = Column(String, nullable=True)
+    body = Column(Text, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('doc_type', 'doc_id', name='uq_search_document'),
+        Index('idx_search_region_ts', 'region_id', 'ts'),
+    )
+
+class TermDailyCount(Base):
+    __tablename__ = "term_daily_counts"
+
+    # Term occurrences in classified texts per day, counted for the text's region,
+    # every ancestor (via region_closure) and ALL_REGIONS
+    region_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    term = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+
+    ALL_REGIONS = "*"
+
+class QuantileSketch(Base):
+    __tablename__ = "quantile_sketches"
+    
+    id = Column(String, primary_key=True, default=generate_uuid)
+    signal_id = Column(String, ForeignKey("signal_definitions.id"))
+    region_id = Column(String, ForeignKey("regions.id"))
+    count = Column(Integer, default=0)
+    data = Column(LargeBinary, nullable=False) # Serialized KLLSketch
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('idx_sketch_signal_region', 'signal_id', 'region_id', unique=True),
+    )
+
 class AnomalyEvent(Base):
     __tablename__ = "anomaly_events"
     
@@ -192,26 +277,83 @@ class AnomalyEvent(Base):
     severity = Column(Float)
     description = Column(Text)
     
+    signal = relationship("SignalDefinition")
     alerts = relationship("Alert", back_populates="anomaly")
 
+    __table_args__ = (
+        Index('idx_anomaly_region_ts', 'region_id', 'timestamp'),
+        Index('idx_anomaly_series_ts', 'signal_id', 'region_id', 'timestamp'),
+    )
+
+class PolicyHealthSnapshot(Base):
+    __tablename__ = "policy_health_snapshots"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    region_id = Column(String, ForeignKey("regions.id"))
+    sector_id = Column(String, ForeignKey("sectors.id"))
+    window_days = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+    severity = Column(String, nullable=False)
+    confidence = Column(String, nullable=False)
+    evidence = Column(JSON, nullable=False)
+    primary_anomaly_id = Column(String, ForeignKey("anomaly_events.id"), nullable=True)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set when issues changed since computed_at; readers then recompute instead of trusting it
+    stale = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        Index('idx_health_context_time', 'region_id', 'sector_id', 'window_days', 'computed_at'),
+    )
+
 class Alert(Base):
     __tablename__ = "alerts"
     
     id = Column(String, primary_key=True, default=generate_uuid)
-    anomaly_id = Column(String, ForeignKey("anomaly_events.id"))
+    anomaly_id = Column(String, ForeignKey("anomaly_events.id"), index=True)
     status = Column(SqEnum(AlertStatus), default=AlertStatus.NEW)
     assigned_to_id = Column(String, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Python-side default keeps the stored format identical to bound cursor values (keyset pagination)
+    created_at = Column(DateTime(timezone=True), default=datetime.now, server_default=func.now())
     
     anomaly = relationship("AnomalyEvent", back_populates="alerts")
     assigned_to = relationship("User", back_populates="alerts")
     recommendations = relationship("Recommendation", back_populates="alert")
 
+    __table_args__ = (
+        Index('idx_alert_created_id', 'created_at', 'id'),
+        Index('idx_alert_status_created', 'status', 'created_at'),
+    )
+
+class JobCheckpoint(Base):
+    """
+    Progress of a resumable background job, one row per job name.
+    """
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String, primary_key=True)
+    status = Column(String, nullable=False) # running, completed, failed
+    cursor = Column(JSON, nullable=True) # Job-specific resume position
+    processed = Column(Integer, default=0)
+    started_at = Column(DateTime(timezone=True), default=datetime.now)
+    updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+
+class AlertExplanation(Base):
+    """
+    LLM explanations keyed by a hash of the prompt inputs, so alerts with
+    unchanged evidence reuse the stored text instead of calling the model again.
+    """
+    __tablename__ = "alert_explanations"
+
+    key = Column(String, primary_key=True) # sha256 hex of prompt version, model and inputs
+    explanation = Column(Text, nullable=False)
+    model = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.now, server_default=func.now())
+
 class Recommendation(Base):
     __tablename__ = "recommendations"
     
     id = Column(String, primary_key=True, default=generate_uuid)
-    alert_id = Column(String, ForeignKey("alerts.id"))
+    alert_id = Column(String, ForeignKey("alerts.id"), index=True)
     content = Column(Text) # AI generated text
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -1,6 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from ..schemas.ai import IssueAnalysisRequest, IssueAnalysisResponse, AdminInsightsRequest, AdminInsightsResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..config import settings
+from ..db import get_db
+from ..schemas.ai import (
+    IssueAnalysisRequest, IssueAnalysisResponse, IssueAnalysisBatchRequest, IssueAnalysisBatchResponse,
+    AdminInsightsRequest, AdminInsightsResponse, AdminInsightsSummaryResponse
+)
 from ..services import ai_service
+from ..security.jwt import get_current_admin_user
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
@@ -12,10 +20,36 @@ def analyze_issue(payload: IssueAnalysisRequest):
     """
     return ai_service.analyze_issue_deterministic(payload.description)
 
+@router.post("/analyze-issue/batch", response_model=IssueAnalysisBatchResponse)
+def analyze_issue_batch(payload: IssueAnalysisBatchRequest):
+    """
+    Analyzes many issue descriptions (e.g. app draft backfills) in one request.
+    Results are returned in the order of the descriptions.
+    """
+    if len(payload.descriptions) > settings.AI_TRIAGE_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {settings.AI_TRIAGE_BATCH_MAX} descriptions per batch")
+    return {"results": ai_service.analyze_issues_deterministic(payload.descriptions)}
+
 @router.post("/admin-insights", response_model=AdminInsightsResponse)
 def admin_insights(payload: AdminInsightsRequest):
     """
     Generates strategic insights for administrators based on a list of recent issues.
     """
     insight_text = ai_service.generate_admin_insights_mock(payload.issues)
-    return {"insight": insight_text}
\ No newline at end of file
+    return {"insight": insight_text}
+
+@router.get("/admin-insights", response_model=AdminInsightsSummaryResponse)
+def admin_insights_server_side(
+    region_id: Optional[str] = Query(None, description="Aggregate this region's whole subtree"),
+    window_days: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Server-side admin insights: urgency mix, category distribution and trend deltas
+    computed from the issues table, so dashboards need not upload their issue lists.
+    """
+    try:
+        return ai_service.get_admin_insights(db, region_id, window_days)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from ..db import get_db
-from ..services import alert_service
-from ..schemas.alerts import AlertResponse, AlertGenerateRequest, AlertReviewRequest
+from ..services import alert_service, explain_service
+from ..config import settings
+from ..schemas.alerts import AlertResponse, AlertGenerateRequest, AlertReviewRequest, AlertSweepRequest, AlertSweepSummary
 from ..security.jwt import get_current_admin_user
+from ..models import AlertStatus
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
 @router.post("/generate")
 def generate_alerts(
     payload: AlertGenerateRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin_user)
 ):
@@ -21,19 +24,57 @@ def generate_alerts(
     """
     alert = alert_service.generate_alert_for_sector(db, payload.region_id, payload.sector_id)
     if alert:
+        if settings.EXPLANATION_PREGENERATE:
+            background_tasks.add_task(explain_service.pregenerate_explanations, [alert.id])
         return {"status": "generated", "alert_id": alert.id}
     return {"status": "healthy", "message": "Policy health score is acceptable. No alert generated."}
 
+@router.post("/sweep", response_model=AlertSweepSummary)
+def sweep_alerts(
+    payload: AlertSweepRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Runs alert generation for every Region+Sector pair in the state, or in one region's subtree,
+    in parallel. Returns counts and stage timings.
+    """
+    if payload.workers is not None and not 1 <= payload.workers <= 32:
+        raise HTTPException(status_code=400, detail="workers must be between 1 and 32")
+    try:
+        summary = alert_service.sweep_alerts(db, payload.region_id, payload.sector_ids, payload.workers)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if settings.EXPLANATION_PREGENERATE and summary.alert_ids:
+        background_tasks.add_task(explain_service.pregenerate_explanations, summary.alert_ids)
+    return summary
+
 @router.get("", response_model=List[AlertResponse])
 def list_alerts(
+    response: Response,
     region_id: Optional[str] = None,
+    status: Optional[AlertStatus] = None,
+    sector_id: Optional[str] = None,
+    severity: Optional[str] = Query(None, pattern="^(LOW|MEDIUM|HIGH|CRITICAL)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin_user)
 ):
     """
-    Get all alerts with live Fusion insights (Health Score, Confidence).
+    Get alerts newest first with Fusion insights (Health Score, Confidence).
+    When more alerts exist, the cursor for the next page is returned in the X-Next-Cursor header.
     """
-    return alert_service.get_alerts_enriched(db, region_id)
+    try:
+        alerts, next_cursor = alert_service.get_alerts_enriched(
+            db, region_id, status, sector_id, severity, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return alerts
 
 @router.get("/{alert_id}", response_model=AlertResponse)
 def get_alert(
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from ..db import get_db
-from ..services import analytics_service
+from ..services import analytics_service, health_service
 from ..security.jwt import get_current_admin_user
-from typing import Optional
+from ..models import RegionType
+from typing import Optional, List
+from datetime import datetime
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -25,12 +27,147 @@ def run_deviations(
     method: str = Query("zscore", regex="^(zscore|cusum|ewma|sudden_drop|changepoint)$"),
     signal_id: Optional[str] = Query(None),
     region_id: Optional[str] = Query(None),
+    baseline_type: str = Query("mean", pattern="^(mean|robust)$"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin_user)
 ):
     """
     Trigger anomaly detection using specified statistical method.
     Methods: zscore, cusum, ewma, sudden_drop, changepoint.
+    Baselines: mean (mean/std_dev) or robust (median/MAD from quantile sketches).
     """
-    count = analytics_service.run_deviation_detection(db, method, signal_id, region_id)
+    count = analytics_service.run_deviation_detection(db, method, signal_id, region_id, baseline_type)
     return {"status": "success", "anomalies_detected": count}
+
+@router.get("/baseline/robust")
+def read_robust_baselines(
+    signal_id: Optional[str] = Query(None),
+    region_id: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Median, IQR and MAD baselines per series, served from quantile sketches.
+    """
+    return analytics_service.get_robust_baselines(db, signal_id, region_id)
+
+@router.post("/baseline/sketches/rebuild")
+def rebuild_sketches(
+    signal_id: Optional[str] = Query(None),
+    region_id: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Rebuild quantile sketches from stored records (one-off bootstrap for existing data).
+    """
+    count = analytics_service.rebuild_quantile_sketches(db, signal_id, region_id)
+    return {"status": "success", "sketches_rebuilt": count}
+
+@router.post("/deviations/backfill")
+def run_backfill(
+    methods: List[str] = Query(["zscore"]),
+    signal_id: Optional[str] = Query(None),
+    region_id: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None, description="Only emit anomalies at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only emit anomalies at or before this time"),
+    window: int = Query(30, ge=2, description="Trailing baseline window in points"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Replay full series history through the chosen detectors and bulk-write historical anomalies.
+    Methods: zscore, cusum, ewma, sudden_drop, changepoint.
+    """
+    invalid = [m for m in methods if m not in analytics_service.BACKFILL_DESCRIPTIONS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Unknown methods: {', '.join(invalid)}")
+    result = analytics_service.run_historical_backfill(db, methods, signal_id, region_id, start, end, window)
+    return {"status": "success", **result}
+
+@router.post("/changepoints/run")
+def run_changepoints(
+    method: str = Query("binseg", pattern="^(binseg|pelt)$"),
+    signal_id: Optional[str] = Query(None),
+    region_id: Optional[str] = Query(None),
+    penalty: Optional[float] = Query(None, gt=0, description="Defaults to 2*log(n) per series"),
+    min_size: int = Query(5, ge=2, description="Minimum segment length in points"),
+    persist: bool = Query(False, description="Record each changepoint as an anomaly event"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Locate all structural breaks over full series history.
+    Methods: binseg (binary segmentation), pelt.
+    """
+    result = analytics_service.run_changepoint_detection(db, method, signal_id, region_id, penalty, min_size, persist)
+    return {"status": "success", **result}
+
+@router.post("/rollups/refresh")
+def refresh_rollups(
+    signal_id: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None, description="Only refresh days from this time onwards"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Rematerialize daily signal aggregates for every region's subtree.
+    """
+    count = analytics_service.refresh_signal_rollups(db, [signal_id] if signal_id else None, start)
+    return {"status": "success", "rollups_written": count}
+
+@router.get("/rollups/series")
+def read_rollup_series(
+    signal_id: str,
+    region_id: str,
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Daily series of a signal aggregated over a region and all regions beneath it.
+    """
+    return analytics_service.get_rollup_series(db, signal_id, region_id, start, end)
+
+@router.post("/rollups/deviations/run")
+def run_rollup_deviations(
+    region_type: RegionType = Query(RegionType.DISTRICT),
+    signal_id: Optional[str] = Query(None),
+    threshold: float = Query(3.0, gt=0),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Z-score detection on rolled-up series for all regions of a level (e.g. every district).
+    """
+    count = analytics_service.run_rollup_deviation_detection(db, region_type, signal_id, threshold)
+    return {"status": "success", "anomalies_detected": count}
+
+@router.post("/health/refresh")
+def refresh_health(
+    region_id: Optional[str] = Query(None),
+    window_days: int = Query(7, ge=1),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Recompute policy health snapshots (e.g. nightly, to pick up new citizen reports).
+    """
+    count = health_service.refresh_health_snapshots(db, [region_id] if region_id else None, window_days)
+    return {"status": "success", "snapshots_refreshed": count}
+
+@router.get("/health/history")
+def read_health_history(
+    region_id: str,
+    sector_id: str,
+    window_days: int = Query(7, ge=1),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Policy health score history for a Region+Sector, one point per stored snapshot.
+    """
+    return health_service.get_health_history(db, region_id, sector_id, window_days, start, end)
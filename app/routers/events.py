@@ -0,0 +1,152 @@
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, Set
+
+from ..config import settings
+from ..db import SessionLocal
+from ..models import Role
+from ..services import event_service, region_service
+from ..security.jwt import get_current_admin_user, get_current_user
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+def _region_filter(region_id: Optional[str]) -> Optional[Set[str]]:
+    """
+    Region filters cover the region's whole subtree, so a district screen also
+    sees events raised for its taluks, blocks and wards.
+    """
+    if not region_id:
+        return None
+    subtree = region_service.get_region_tree().subtree_of(region_id)
+    if not subtree:
+        raise ValueError("Region not found")
+    return {n.id for n in subtree}
+
+def _subscribe(region_ids: Optional[Set[str]], sector_id: Optional[str], last_event_id: int):
+    # Called only where the matching unsubscribe is guaranteed by a finally block
+    return event_service.bus.subscribe(asyncio.get_running_loop(), region_ids, sector_id, last_event_id)
+
+def _is_admin_token(token: str) -> bool:
+    db = SessionLocal()
+    try:
+        user = get_current_user(token, db)
+        return user.is_active and user.role == Role.ADMIN
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+async def _next_event(subscription):
+    """
+    Next event for the subscriber, None when it was cut off,
+    or the string "heartbeat" if nothing arrived within the heartbeat interval.
+    """
+    try:
+        return await asyncio.wait_for(subscription.queue.get(), timeout=settings.EVENT_HEARTBEAT_SECONDS)
+    except asyncio.TimeoutError:
+        return "heartbeat"
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    region_id: Optional[str] = None,
+    sector_id: Optional[str] = None,
+    last_event_id: Optional[int] = Query(None, description="Resume after this event id (for clients that cannot set Last-Event-ID)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Server-sent events for alert.created, alert.reviewed and anomaly.detected,
+    optionally filtered to a region subtree and/or a sector.
+    Reconnecting with Last-Event-ID replays what was missed from the in-memory buffer.
+    """
+    if last_event_id is None and last_event_id_header:
+        try:
+            last_event_id = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    try:
+        region_ids = _region_filter(region_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if last_event_id is None:
+        # Replay whatever is published before the body starts streaming
+        last_event_id = event_service.bus.last_event_id
+
+    async def event_stream():
+        # Subscribing here ties the subscription to the body: a client gone before
+        # the body is iterated never registers one
+        subscription, backlog, missed = _subscribe(region_ids, sector_id, last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            if missed:
+                yield event_service.format_sse(event_service.reset_event())
+            for event in backlog:
+                yield event_service.format_sse(event)
+            while True:
+                event = await _next_event(subscription)
+                if event == "heartbeat":
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield event_service.format_sse(event)
+        finally:
+            event_service.bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def events_websocket(
+    websocket: WebSocket,
+    token: str,
+    region_id: Optional[str] = None,
+    sector_id: Optional[str] = None,
+    last_event_id: Optional[int] = None
+):
+    """
+    WebSocket variant of /events/stream for clients that prefer it.
+    Browsers cannot set headers on WebSockets, so the bearer token is passed as a query parameter.
+    Each message is one event as JSON; {"type": "ping"} is sent while idle.
+    """
+    if not await run_in_threadpool(_is_admin_token, token):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    try:
+        region_ids = _region_filter(region_id)
+    except ValueError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if last_event_id is None:
+        last_event_id = event_service.bus.last_event_id
+
+    await websocket.accept()
+    subscription, backlog, missed = _subscribe(region_ids, sector_id, last_event_id)
+    try:
+        if missed:
+            await websocket.send_json(event_service.reset_event())
+        for event in backlog:
+            await websocket.send_json(event)
+        while True:
+            event = await _next_event(subscription)
+            if event == "heartbeat":
+                await websocket.send_json({"type": "ping"})
+                continue
+            if event is None:
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                break
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_service.bus.unsubscribe(subscription)
@@ -2,22 +2,30 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..db import get_db
 from ..services import explain_service
+from ..llm import gemini_client
 from ..security.jwt import get_current_admin_user
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
 @router.post("/{alert_id}/explain")
-def explain_alert_endpoint(
+async def explain_alert_endpoint(
     alert_id: str,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin_user)
 ):
     """
     Generates an AI-powered explanation for a specific alert.
-    Returns a JSON object with the explanation text.
+    Returns a JSON object with the explanation text and whether it was served from cache.
     """
     try:
-        explanation = explain_service.explain_alert(db, alert_id)
-        return {"alert_id": alert_id, "explanation": explanation}
+        explanation, cached = await explain_service.explain_alert_async(db, alert_id)
+        return {"alert_id": alert_id, "explanation": explanation, "cached": cached}
     except ValueError:
          raise HTTPException(status_code=404, detail="Alert not found")
+
+@router.get("/explanations/llm-metrics")
+def llm_metrics(current_user = Depends(get_current_admin_user)):
+    """
+    LLM client health: call counters, latency percentiles and circuit breaker state.
+    """
+    return {**gemini_client.gemini.metrics.snapshot(), "circuit": gemini_client.gemini.breaker.state}
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..db import get_db
+from ..models import RegionType
+from ..schemas.fusion import HeatmapResponse
+from ..services import health_service
+from ..security.jwt import get_current_admin_user
+
+router = APIRouter(prefix="/fusion", tags=["fusion"])
+
+@router.get("/heatmap", response_model=HeatmapResponse)
+def read_heatmap(
+    region_type: RegionType = Query(RegionType.DISTRICT),
+    parent_id: Optional[str] = Query(None, description="Limit rows to regions under this region"),
+    window_days: int = Query(7, ge=1),
+    include_descendants: bool = Query(False, description="Fold each region's subtree into its cell"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Policy health score for every Region x Sector cell, computed in one batch.
+    """
+    return health_service.get_health_heatmap(db, region_type, parent_id, window_days, include_descendants)
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
 from typing import Optional
 
 from ..db import get_db
-from ..services.nlp_service import NLPService
+from ..services.nlp_service import NLPService, TOPIC_JOB
+from ..services import dedup_service
 from ..security.jwt import get_current_admin_user
 
 router = APIRouter(prefix="/nlp", tags=["nlp"])
@@ -22,30 +22,92 @@ def run_nlp_pipeline(
     processed_count = NLPService.run_batch_classification(db, limit)
     return {"status": "success", "records_processed": processed_count}
 
+@router.post("/backlog/run", status_code=202)
+def run_nlp_backlog(
+    background_tasks: BackgroundTasks,
+    chunk_size: Optional[int] = Query(None, ge=100, le=50000),
+    workers: Optional[int] = Query(None, ge=0, le=16),
+    max_rows: Optional[int] = Query(None, ge=1, description="Stop (resumably) after this many rows"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Starts draining the whole classification backlog (Issues and TextRecords) in the background.
+    Progress is visible at /nlp/backlog/status.
+    """
+    if NLPService.is_backlog_running(db):
+        raise HTTPException(status_code=409, detail="NLP backlog job is already running")
+    background_tasks.add_task(NLPService.run_backlog_job_detached, chunk_size, workers, max_rows)
+    return {"status": "started"}
+
+@router.get("/backlog/status")
+def nlp_backlog_status(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Checkpoint of the last backlog run plus the rows still waiting for classification.
+    """
+    status = NLPService.get_backlog_status(db)
+    if status is None:
+        return {"status": "never_run"}
+    return status
+
+@router.post("/topics/train", status_code=202)
+def train_topic_model(
+    background_tasks: BackgroundTasks,
+    rebuild: bool = Query(False, description="Discard the current model and recluster every document"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Updates the persisted topic model with documents added since the last training run,
+    then assigns cluster ids to documents that have none.
+    """
+    if NLPService._is_job_running(db, TOPIC_JOB):
+        raise HTTPException(status_code=409, detail="Topic model training is already running")
+    background_tasks.add_task(NLPService.train_topic_model_detached, None, rebuild)
+    return {"status": "started"}
+
+@router.get("/topics")
+def get_topic_model(current_user = Depends(get_current_admin_user)):
+    """
+    Clusters of the current topic model with their top terms.
+    """
+    info = NLPService.get_topic_model_info()
+    if info is None:
+        return {"status": "untrained"}
+    return info
+
+@router.get("/issues/{issue_id}/duplicates")
+def get_issue_duplicates(
+    issue_id: str,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Canonical issue of the given issue and every issue linked to it as a near-duplicate.
+    """
+    try:
+        return dedup_service.get_duplicates(db, issue_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.get("/insights")
 def get_nlp_insights(
     region_id: Optional[str] = None,
     policy_id: Optional[str] = None,
-    days: int = Query(30, description="Lookback window in days"),
+    days: int = Query(30, ge=1, description="Lookback window in whole days, plus today so far"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin_user)
 ):
     """
     Retrieves aggregated NLP insights including:
-    - Topic Clusters (TF-IDF + KMeans)
+    - Topic Clusters (persisted topic model)
     - Keyword Surges (vs previous period)
     - Failure Type Distribution
     - Sentiment Trends
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    insights = NLPService.get_aggregated_insights(
-        db, 
-        start_date, 
-        end_date, 
-        region_id, 
-        policy_id
-    )
+    insights = NLPService.get_recent_insights(db, days, region_id, policy_id)
     
     return insights
@@ -1,35 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException
 from typing import List
-from ..db import get_db
 from ..schemas.region import RegionResponse
 from ..services import region_service
 
+# Served entirely from the in-memory region tree cache; no database session needed
 router = APIRouter(prefix="/regions", tags=["regions"])
 
 @router.get("/districts", response_model=List[RegionResponse])
-def read_districts(db: Session = Depends(get_db)):
+def read_districts():
     """List all Districts in Tamil Nadu"""
-    return region_service.get_districts(db)
+    return region_service.get_districts()
 
 @router.get("/taluks", response_model=List[RegionResponse])
-def read_taluks(district_id: str, db: Session = Depends(get_db)):
+def read_taluks(district_id: str):
     """List Taluks within a District"""
-    return region_service.get_taluks(db, district_id)
+    return region_service.get_taluks(district_id)
 
 @router.get("/blocks", response_model=List[RegionResponse])
-def read_blocks(taluk_id: str, db: Session = Depends(get_db)):
+def read_blocks(taluk_id: str):
     """List Blocks within a Taluk"""
-    return region_service.get_blocks(db, taluk_id)
+    return region_service.get_blocks(taluk_id)
 
 @router.get("/panchayats", response_model=List[RegionResponse])
-def read_panchayats(block_id: str, db: Session = Depends(get_db)):
+def read_panchayats(block_id: str):
     """List Panchayats/Wards within a Block"""
-    return region_service.get_panchayats(db, block_id)
+    return region_service.get_panchayats(block_id)
 
 @router.get("/{region_id}", response_model=RegionResponse)
-def read_region(region_id: str, db: Session = Depends(get_db)):
-    region = region_service.get_region(db, region_id)
+def read_region(region_id: str):
+    region = region_service.get_region(region_id)
     if not region:
         raise HTTPException(status_code=404, detail="Region not found")
     return region
+
+@router.get("/{region_id}/children", response_model=List[RegionResponse])
+def read_region_children(region_id: str):
+    """List direct children of any region"""
+    if not region_service.get_region(region_id):
+        raise HTTPException(status_code=404, detail="Region not found")
+    return region_service.get_children(region_id)
+
+@router.get("/{region_id}/ancestors", response_model=List[RegionResponse])
+def read_region_ancestors(region_id: str):
+    """List ancestors of a region, from its parent up to the State"""
+    if not region_service.get_region(region_id):
+        raise HTTPException(status_code=404, detail="Region not found")
+    return region_service.get_ancestors(region_id)
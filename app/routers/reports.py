@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -13,21 +13,29 @@ def export_csv_data(
     status: Optional[str] = None,
     urgency: Optional[str] = None,
     region_id: Optional[str] = None,
-    db: Session = Depends(get_db),
+    gzip: bool = Query(False, description="Send a gzip-compressed .csv.gz file"),
     current_user = Depends(get_current_admin_user)
 ):
     """
     Download raw issue data as CSV based on optional filters.
+    Rows are streamed as they are read, so large exports start downloading immediately.
     """
     filters = {}
     if status: filters['status'] = status
     if urgency: filters['urgency'] = urgency
     if region_id: filters['region_id'] = region_id
     
-    csv_file = report_service.generate_csv_export(db, filters)
+    try:
+        chunks = report_service.stream_csv_export(filters, compress=gzip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    response = StreamingResponse(iter([csv_file.getvalue()]), media_type="text/csv")
-    response.headers["Content-Disposition"] = "attachment; filename=civic_data_export.csv"
+    if gzip:
+        response = StreamingResponse(chunks, media_type="application/gzip")
+        response.headers["Content-Disposition"] = "attachment; filename=civic_data_export.csv.gz"
+    else:
+        response = StreamingResponse(chunks, media_type="text/csv")
+        response.headers["Content-Disposition"] = "attachment; filename=civic_data_export.csv"
     return response
 
 @router.get("/export/pdf")
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+from ..db import get_db
+from ..schemas.search import SearchResponse
+from ..services import search_service
+from ..security.jwt import get_current_admin_user
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("", response_model=SearchResponse)
+def search_reports(
+    q: str = Query(..., min_length=1, description="Words that must all appear; matched as substrings of 3+ characters on SQLite"),
+    region_id: Optional[str] = Query(None, description="Limit to this region and everything under it"),
+    doc_type: Optional[str] = Query(None, pattern="^(issue|text_record)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Full-text search over citizen issues and text records, best matches first.
+    """
+    try:
+        return search_service.search(db, q, region_id, doc_type, start, end, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
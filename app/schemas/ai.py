@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 
 class IssueAnalysisRequest(BaseModel):
     description: str
@@ -12,8 +13,37 @@ class IssueAnalysisResponse(BaseModel):
     confidence: float
     recommended_actions: List[str]
 
+class IssueAnalysisBatchRequest(BaseModel):
+    descriptions: List[str]
+
+class IssueAnalysisBatchResponse(BaseModel):
+    results: List[IssueAnalysisResponse]
+
 class AdminInsightsRequest(BaseModel):
     issues: List[Dict[str, Any]]
 
 class AdminInsightsResponse(BaseModel):
-    insight: str
\ No newline at end of file
+    insight: str
+
+class TrendCount(BaseModel):
+    count: int
+    share: float # Of all issues in the current window
+    previous: int # Same length window just before
+    delta: int
+    change_pct: Optional[float] = None # None when there was nothing to compare against
+
+class CategoryTrend(TrendCount):
+    category: str
+
+class InsightsPeriod(BaseModel):
+    start: datetime
+    end: datetime
+
+class AdminInsightsSummaryResponse(BaseModel):
+    region_id: Optional[str] = None
+    window_days: int
+    period: InsightsPeriod
+    total_issues: TrendCount
+    urgency_mix: Dict[str, TrendCount]
+    category_distribution: List[CategoryTrend]
+    insight: str
@@ -39,3 +39,21 @@ class AlertReviewRequest(BaseModel):
 class AlertGenerateRequest(BaseModel):
     region_id: str
     sector_id: str
+
+class AlertSweepRequest(BaseModel):
+    region_id: Optional[str] = None # Sweep this region's subtree; whole state if omitted
+    sector_ids: Optional[List[str]] = None # All sectors if omitted
+    workers: Optional[int] = None
+
+class AlertSweepSummary(BaseModel):
+    regions: int
+    sectors: int
+    pairs_total: int
+    pairs_evaluated: int # Pairs with an anomaly in the window; others cannot raise an alert
+    unhealthy: int
+    alerts_created: int
+    alerts_existing: int # Unhealthy pairs whose anomaly already had an open alert
+    recommendations_created: int
+    alert_ids: List[str] # Newly created alerts
+    workers: int
+    timings: Dict[str, float]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List
+
+class HeatmapAxis(BaseModel):
+    id: str
+    name: str
+
+class HeatmapResponse(BaseModel):
+    window_days: int
+    regions: List[HeatmapAxis] # Rows
+    sectors: List[HeatmapAxis] # Columns
+    scores: List[List[float]]
+    severity: List[List[str]]
+    confidence: List[List[str]]
+    anomaly_counts: List[List[int]]
+    issue_counts: List[int] # Per region
+    sentiment_scores: List[float] # Per region
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class SearchHit(BaseModel):
+    doc_type: str # "issue" or "text_record"
+    doc_id: str
+    region_id: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    score: float
+
+class SearchResponse(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: List[SearchHit]
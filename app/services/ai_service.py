@@ -1,56 +1,119 @@
-from typing import List
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import case, event, func
+from sqlalchemy.orm import Session
+from ..cache import TTLCache
+from ..config import settings
+from ..models import Issue, RegionClosure, Urgency
 from ..schemas.ai import IssueAnalysisResponse
+from . import region_service
 
-def analyze_issue_deterministic(description: str) -> IssueAnalysisResponse:
+DEFAULT_CATEGORY = "Other"
+DEFAULT_URGENCY = "Low"
+DEFAULT_CONFIDENCE = 0.70
+DEFAULT_ACTIONS = ["Review by General Administration"]
+
+# Triage rules in priority order: the first category with a keyword hit wins. Its
+# escalations are then applied in order, each overriding urgency (and confidence)
+# and optionally putting an action first.
+TRIAGE_RULES = [
+    {
+        "category": "Water Supply",
+        "keywords": ["water", "leak", "pipe", "tap", "drinking", "supply"],
+        "actions": ["Check local valve pressure", "Assign to Water Board Engineer", "Verify recent maintenance logs"],
+        "escalations": [
+            {"keywords": ["burst", "flood", "dirty", "contaminated", "no water"], "urgency": "High", "confidence": 0.90},
+            {"keywords": ["burst"], "urgency": "Critical", "action": "Dispatch Emergency Repair Crew"},
+        ],
+    },
+    {
+        "category": "Roads",
+        "keywords": ["road", "pothole", "tar", "asphalt", "bump", "street"],
+        "actions": ["Schedule Site Inspection", "Check road warranty status"],
+        "escalations": [
+            {"keywords": ["accident", "deep", "sinkhole", "danger"], "urgency": "High", "confidence": 0.85},
+        ],
+    },
+    {
+        "category": "Sanitation",
+        "keywords": ["garbage", "trash", "waste", "bin", "dustbin", "smell", "stink"],
+        "actions": ["Notify Waste Management Contractor", "Schedule extra clearance round"],
+        "escalations": [
+            {"keywords": ["dead", "overflow"], "urgency": "High"},
+        ],
+    },
+    {
+        "category": "Electricity",
+        "keywords": ["light", "dark", "pole", "electricity", "power", "current", "wire"],
+        "actions": ["Check Streetlight Grid", "Assign to TNEB"],
+        "escalations": [
+            {"keywords": ["spark", "shock", "fire", "hanging"], "urgency": "Critical", "confidence": 0.95, "action": "Cut Power Supply to Sector"},
+        ],
+    },
+    {
+        "category": "Traffic",
+        "keywords": ["traffic", "jam", "signal", "blocked", "congestion"],
+        "actions": ["Notify Traffic Police", "Check Signal Timing"],
+        "urgency": "Medium",
+    },
+]
+
+def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+    # Longest first, so the alternation tries "dustbin" before "bin"; a hit is all that matters
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+class TriageRuleTable:
     """
-    Analyzes the issue description using rule-based keywords to determine category and urgency.
-    This serves as a safe, deterministic fallback or initial implementation before full LLM integration.
+    TRIAGE_RULES compiled once: each rule and escalation becomes a single regex over
+    its keywords, so a description costs one C-level scan per rule tried instead of
+    one `in` test per keyword. Keywords match as substrings of the lowercased text,
+    exactly as the original if/elif chain did, and rules are tried in the same order.
     """
-    text = description.lower()
-    
-    # Defaults
-    category = "Other"
-    urgency = "Low"
-    confidence = 0.70
-    actions = ["Review by General Administration"]
-    
-    # Rule-based Classification
-    if any(w in text for w in ["water", "leak", "pipe", "tap", "drinking", "supply"]):
-        category = "Water Supply"
-        actions = ["Check local valve pressure", "Assign to Water Board Engineer", "Verify recent maintenance logs"]
-        if any(w in text for w in ["burst", "flood", "dirty", "contaminated", "no water"]):
-            urgency = "High"
-            confidence = 0.90
-            if "burst" in text:
-                urgency = "Critical"
-                actions.insert(0, "Dispatch Emergency Repair Crew")
-
-    elif any(w in text for w in ["road", "pothole", "tar", "asphalt", "bump", "street"]):
-        category = "Roads"
-        actions = ["Schedule Site Inspection", "Check road warranty status"]
-        if any(w in text for w in ["accident", "deep", "sinkhole", "danger"]):
-            urgency = "High"
-            confidence = 0.85
-    
-    elif any(w in text for w in ["garbage", "trash", "waste", "bin", "dustbin", "smell", "stink"]):
-        category = "Sanitation"
-        actions = ["Notify Waste Management Contractor", "Schedule extra clearance round"]
-        if "dead" in text or "overflow" in text:
-            urgency = "High"
-
-    elif any(w in text for w in ["light", "dark", "pole", "electricity", "power", "current", "wire"]):
-        category = "Electricity"
-        actions = ["Check Streetlight Grid", "Assign to TNEB"]
-        if any(w in text for w in ["spark", "shock", "fire", "hanging"]):
-            urgency = "Critical"
-            actions.insert(0, "Cut Power Supply to Sector")
-            confidence = 0.95
-
-    elif any(w in text for w in ["traffic", "jam", "signal", "blocked", "congestion"]):
-        category = "Traffic"
-        actions = ["Notify Traffic Police", "Check Signal Timing"]
-        urgency = "Medium"
 
+    def __init__(self, rules: List[Dict]):
+        self.rules = []
+        for rule in rules:
+            escalations = [
+                (_keyword_pattern(esc["keywords"]), esc["urgency"], esc.get("confidence"), esc.get("action"))
+                for esc in rule.get("escalations", [])
+            ]
+            self.rules.append((
+                _keyword_pattern(rule["keywords"]), rule["category"], rule.get("urgency", DEFAULT_URGENCY),
+                tuple(rule["actions"]), escalations
+            ))
+
+    def evaluate(self, text: str) -> Tuple[str, str, float, Tuple[str, ...]]:
+        """
+        (category, urgency, confidence, actions) for a description passed through
+        normalize_description.
+        """
+        for pattern, category, urgency, actions, escalations in self.rules:
+            if not pattern.search(text):
+                continue
+            confidence = DEFAULT_CONFIDENCE
+            for esc_pattern, esc_urgency, esc_confidence, esc_action in escalations:
+                if esc_pattern.search(text):
+                    urgency = esc_urgency
+                    confidence = esc_confidence or confidence
+                    if esc_action:
+                        actions = (esc_action,) + actions
+            return category, urgency, confidence, actions
+        return DEFAULT_CATEGORY, DEFAULT_URGENCY, DEFAULT_CONFIDENCE, tuple(DEFAULT_ACTIONS)
+
+triage_rules = TriageRuleTable(TRIAGE_RULES)
+
+def normalize_description(description: str) -> str:
+    # Only case is folded before caching: keywords match as substrings, so spacing and
+    # punctuation can change the result ("no water" vs "no, water")
+    return (description or "").lower()
+
+@lru_cache(maxsize=settings.AI_TRIAGE_CACHE_SIZE)
+def _triage(normalized: str) -> Tuple[str, str, float, Tuple[str, ...]]:
+    return triage_rules.evaluate(normalized)
+
+def _analysis_response(category: str, urgency: str, confidence: float, actions: Tuple[str, ...]) -> IssueAnalysisResponse:
     # Generate Summary and Title
     title = f"{category} Issue reported"
     summary = f"Citizen reported a {category.lower()} issue. Automated analysis suggests {urgency.lower()} priority intervention."
@@ -61,9 +124,39 @@ def analyze_issue_deterministic(description: str) -> IssueAnalysisResponse:
         title=title,
         summary=summary,
         confidence=confidence,
-        recommended_actions=actions
+        recommended_actions=list(actions)
     )
 
+def analyze_issue_deterministic(description: str) -> IssueAnalysisResponse:
+    """
+    Analyzes the issue description using rule-based keywords to determine category and urgency.
+    This serves as a safe, deterministic fallback or initial implementation before full LLM integration.
+    """
+    return _analysis_response(*_triage(normalize_description(description)))
+
+def analyze_issues_deterministic(descriptions: List[str]) -> List[IssueAnalysisResponse]:
+    """
+    Batch form of analyze_issue_deterministic, in input order. The rules only have a
+    handful of outcomes, so each distinct outcome's response is built once per batch.
+    """
+    responses: Dict[Tuple, IssueAnalysisResponse] = {}
+    results = []
+    for description in descriptions:
+        outcome = _triage(normalize_description(description))
+        response = responses.get(outcome)
+        if response is None:
+            response = responses[outcome] = _analysis_response(*outcome)
+        results.append(response)
+    return results
+
+def _insight_text(high_urgency: int, total: int) -> str:
+    ratio = high_urgency / total if total > 0 else 0
+
+    if ratio > 0.3:
+        return f"Alert: {int(ratio*100)}% of recent reports are High/Critical urgency. Immediate resource reallocation to rapid response teams is recommended."
+    else:
+        return "Operations are stable. Most reported issues are routine. Suggest focusing on preventive maintenance for Road infrastructure."
+
 def generate_admin_insights_mock(issues: List[dict]) -> str:
     """
     Generates a mock strategic insight based on issue counts.
@@ -73,10 +166,106 @@ def generate_admin_insights_mock(issues: List[dict]) -> str:
     
     # Simple counting
     high_urgency = sum(1 for i in issues if i.get('urgency') in ['High', 'Critical'])
-    total = len(issues)
-    ratio = high_urgency / total if total > 0 else 0
+    return _insight_text(high_urgency, len(issues))
 
-    if ratio > 0.3:
-        return f"Alert: {int(ratio*100)}% of recent reports are High/Critical urgency. Immediate resource reallocation to rapid response teams is recommended."
-    else:
-        return "Operations are stable. Most reported issues are routine. Suggest focusing on preventive maintenance for Road infrastructure."
\ No newline at end of file
+class AdminInsightsCache:
+    """
+    Process-wide TTL cache of server-side admin insights keyed by (region_id, window_days).
+    A new issue counts towards its region's subtree and every ancestor's, so inserts
+    drop those entries and the statewide ones; the TTL bounds staleness from writers
+    in other processes.
+    """
+    _cache = TTLCache(max_entries=1000)
+
+    @classmethod
+    def get(cls, key: Tuple[Optional[str], int]) -> Optional[Dict[str, Any]]:
+        return cls._cache.get(key)
+
+    @classmethod
+    def put(cls, key: Tuple[Optional[str], int], result: Dict[str, Any], ttl: float):
+        cls._cache.put(key, result, ttl)
+
+    @classmethod
+    def invalidate_region(cls, region_id: Optional[str]):
+        region_ids = {None, region_id}
+        if region_id:
+            region_ids.update(a.id for a in region_service.get_ancestors(region_id))
+        cls._cache.invalidate(lambda key: key[0] in region_ids)
+
+    @classmethod
+    def clear(cls):
+        cls._cache.clear()
+
+@event.listens_for(Issue, "after_insert")
+def _invalidate_admin_insights_on_issue(mapper, connection, target):
+    AdminInsightsCache.invalidate_region(target.region_id)
+
+def _trend(count: int, previous: int, total: int) -> Dict[str, Any]:
+    return {
+        "count": count,
+        "share": round(count / total, 3) if total else 0.0,
+        "previous": previous,
+        "delta": count - previous,
+        "change_pct": round((count - previous) / previous * 100, 1) if previous else None
+    }
+
+def get_admin_insights(db: Session, region_id: Optional[str] = None, window_days: int = 30) -> Dict[str, Any]:
+    """
+    Urgency mix, category distribution and their change against the previous window of
+    equal length, for issues in a region's subtree (or statewide). Both windows come from
+    one GROUP BY over (urgency, category) on the issues (region_id, created_at) index.
+    Near-duplicates of an earlier issue are not counted.
+    """
+    key = (region_id, window_days)
+    cached = AdminInsightsCache.get(key)
+    if cached is not None:
+        return cached
+
+    if region_id and region_service.get_region(region_id) is None:
+        raise ValueError("Region not found")
+
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=window_days)
+    prev_start = start_date - timedelta(days=window_days)
+    in_current = Issue.created_at >= start_date
+
+    query = db.query(
+        Issue.urgency, Issue.category,
+        func.sum(case((in_current, 1), else_=0)),
+        func.sum(case((in_current, 0), else_=1))
+    )
+    if region_id:
+        query = query.join(RegionClosure, RegionClosure.descendant_id == Issue.region_id).filter(
+            RegionClosure.ancestor_id == region_id
+        )
+    rows = query.filter(
+        Issue.created_at >= prev_start,
+        Issue.created_at <= end_date,
+        Issue.canonical_issue_id == None
+    ).group_by(Issue.urgency, Issue.category).all()
+
+    urgency_counts = {u.value: [0, 0] for u in Urgency}
+    category_counts: Dict[str, List[int]] = {}
+    for urgency, category, current, previous in rows:
+        urgency = urgency.value if urgency else Urgency.MEDIUM.value
+        for counts in (urgency_counts[urgency], category_counts.setdefault(category or "Uncategorized", [0, 0])):
+            counts[0] += current or 0
+            counts[1] += previous or 0
+
+    total = sum(c for c, _ in urgency_counts.values())
+    previous_total = sum(p for _, p in urgency_counts.values())
+    high_urgency = urgency_counts[Urgency.HIGH.value][0] + urgency_counts[Urgency.CRITICAL.value][0]
+    result = {
+        "region_id": region_id,
+        "window_days": window_days,
+        "period": {"start": start_date, "end": end_date},
+        "total_issues": _trend(total, previous_total, total),
+        "urgency_mix": {u: _trend(c, p, total) for u, (c, p) in urgency_counts.items()},
+        "category_distribution": [
+            {"category": category, **_trend(c, p, total)}
+            for category, (c, p) in sorted(category_counts.items(), key=lambda item: (-item[1][0], item[0]))
+        ],
+        "insight": _insight_text(high_urgency, total) if total else "No data available for analysis."
+    }
+    AdminInsightsCache.put(key, result, settings.ADMIN_INSIGHTS_CACHE_TTL_SECONDS)
+    return result
@@ -1,20 +1,44 @@
-from sqlalchemy.orm import Session
-from datetime import datetime
-from typing import List, Optional
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from sqlalchemy import or_, and_
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+import base64
 import json
+import time
 
-from ..models import Alert, AlertStatus, Recommendation, User, AnomalyEvent, SignalDefinition
+from ..db import SessionLocal
+from ..config import settings
+from ..models import (
+    Alert, AlertStatus, Recommendation, User, AnomalyEvent, SignalDefinition, PolicyHealthSnapshot,
+    Region, Sector, generate_uuid
+)
 from ..analytics.fusion import FusionEngine
-from ..schemas.alerts import AlertResponse, EvidenceSchema
+from ..schemas.alerts import AlertResponse, EvidenceSchema, AlertSweepSummary
+from . import health_service, region_service, event_service
+
+ALERT_SCORE_THRESHOLD = 70
+
+def _publish_alert_created(alert_id: str, anomaly_id: str, region_id: str, sector_id: str, fusion_result: Dict[str, Any]):
+    event_service.publish(event_service.ALERT_CREATED, region_id, sector_id, {
+        "alert_id": alert_id,
+        "anomaly_id": anomaly_id,
+        "policy_health_score": fusion_result["score"],
+        "severity_label": fusion_result["severity"],
+        "confidence": fusion_result["confidence"]
+    })
 
 def generate_alert_for_sector(db: Session, region_id: str, sector_id: str) -> Optional[Alert]:
     """
     Runs Fusion Engine. If health score is low, creates or updates an Alert.
     """
     fusion_result = FusionEngine.calculate_policy_health(db, region_id, sector_id)
+    # Every evaluation also becomes the newest health snapshot for this context
+    health_service.record_snapshot(db, region_id, sector_id, fusion_result)
+    db.commit()
     
     # Threshold for Alert Generation
-    if fusion_result['score'] < 70:
+    if fusion_result['score'] < ALERT_SCORE_THRESHOLD:
         # Check if open alert exists for this context
         # We need to find an alert linked to an anomaly in this sector/region
         # This is complex with current schema. We simplify:
@@ -51,89 +75,229 @@ def generate_alert_for_sector(db: Session, region_id: str, sector_id: str) -> Op
             db.add(rec)
         
         db.commit()
+        _publish_alert_created(new_alert.id, primary_anomaly.id, region_id, sector_id, fusion_result)
         return new_alert
     
     return None
 
-def get_alerts_enriched(db: Session, region_id: Optional[str] = None) -> List[AlertResponse]:
+def _evaluate_pairs(pairs: List[Tuple[str, str]], window_days: int) -> List[Dict[str, Any]]:
     """
-    Fetches alerts and enriches them with on-the-fly Fusion data.
+    Worker body for the sweep: fuses a chunk of (region, sector) pairs on its own session
+    and returns plain dicts so nothing ORM-bound crosses threads.
     """
-    query = db.query(Alert).join(AnomalyEvent).join(SignalDefinition)
-    
+    db = SessionLocal()
+    try:
+        results = []
+        for region_id, sector_id in pairs:
+            fusion_result = FusionEngine.calculate_policy_health(db, region_id, sector_id, window_days)
+            fusion_result.pop("primary_anomaly", None)
+            results.append({"region_id": region_id, "sector_id": sector_id, **fusion_result})
+        return results
+    finally:
+        db.close()
+
+def sweep_alerts(
+    db: Session,
+    region_id: Optional[str] = None,
+    sector_ids: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    window_days: int = 7
+) -> AlertSweepSummary:
+    """
+    Statewide (or subtree) version of generate_alert_for_sector.
+    Every region x sector pair is enumerated, but only pairs with an anomaly in the window
+    can produce an alert, so only those are fused - in parallel across a thread pool.
+    Snapshots, alerts and recommendations are then written in bulk, skipping anomalies
+    that already have an unresolved alert.
+    """
+    started = time.perf_counter()
+
     if region_id:
-        query = query.filter(AnomalyEvent.region_id == region_id)
-        
-    alerts_db = query.all()
-    results = []
-    
-    for alert in alerts_db:
-        # Re-run fusion to get latest score/evidence for display
-        # We derive sector_id and region_id from the linked anomaly
-        anomaly = alert.anomaly
-        signal = anomaly.signal
-        
-        fusion = FusionEngine.calculate_policy_health(
-            db, 
-            region_id=anomaly.region_id, 
-            sector_id=signal.sector_id
-        )
-        
-        # Recommendations
-        rec_texts = [r.content for r in alert.recommendations]
-        
-        results.append(AlertResponse(
-            id=alert.id,
-            status=alert.status.value,
-            created_at=alert.created_at,
-            policy_health_score=fusion['score'],
-            severity_label=fusion['severity'],
-            confidence=fusion['confidence'],
-            evidence=EvidenceSchema(
-                numeric_anomalies=fusion['evidence']['numeric_anomalies'],
-                nlp_insights=fusion['evidence']['nlp_insights'],
-                sentiment_score=fusion['evidence']['sentiment_score'],
-                total_reports=fusion['evidence']['total_reports']
-            ),
-            recommendations=rec_texts,
-            region_id=anomaly.region_id,
-            sector_id=signal.sector_id
-        ))
-        
-    return results
+        if region_service.get_region(region_id) is None:
+            raise ValueError("Region not found")
+        region_ids = [n.id for n in region_service.get_region_tree().subtree_of(region_id)]
+    else:
+        region_ids = [r[0] for r in db.query(Region.id).all()]
+    if sector_ids is None:
+        sector_ids = [s[0] for s in db.query(Sector.id).all()]
 
-def get_alert_detail(db: Session, alert_id: str) -> Optional[AlertResponse]:
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
-    if not alert:
-        return None
-        
-    anomaly = alert.anomaly
-    signal = anomaly.signal
-    
-    fusion = FusionEngine.calculate_policy_health(
-        db, 
-        region_id=anomaly.region_id, 
-        sector_id=signal.sector_id
+    start_date = datetime.now() - timedelta(days=window_days)
+    candidates_query = db.query(AnomalyEvent.region_id, SignalDefinition.sector_id).join(
+        SignalDefinition, SignalDefinition.id == AnomalyEvent.signal_id
+    ).filter(
+        AnomalyEvent.timestamp >= start_date,
+        SignalDefinition.sector_id.in_(sector_ids)
     )
-    
+    if region_id:
+        candidates_query = candidates_query.filter(AnomalyEvent.region_id.in_(region_ids))
+    pairs = sorted(set(candidates_query.distinct().all()))
+    enumerated = time.perf_counter()
+
+    # Fan out in contiguous chunks, a few per worker to even out skew
+    workers = max(1, workers or settings.ALERT_SWEEP_WORKERS)
+    chunk_size = max(1, -(-len(pairs) // (workers * 4)))
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+    results: List[Dict[str, Any]] = []
+    if chunks:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk_results in pool.map(lambda c: _evaluate_pairs(c, window_days), chunks):
+                results.extend(chunk_results)
+    evaluated = time.perf_counter()
+
+    now = datetime.now()
+    health_service.store_snapshots(db, {(r["region_id"], r["sector_id"]): r for r in results}, window_days)
+
+    unhealthy = [r for r in results if r["score"] < ALERT_SCORE_THRESHOLD and r["primary_anomaly_id"]]
+    anomaly_ids = list({r["primary_anomaly_id"] for r in unhealthy})
+    already_open = set()
+    for i in range(0, len(anomaly_ids), 500):
+        already_open.update(a[0] for a in db.query(Alert.anomaly_id).filter(
+            Alert.anomaly_id.in_(anomaly_ids[i:i + 500]),
+            Alert.status != AlertStatus.RESOLVED
+        ).all())
+
+    alert_rows, rec_rows, created = [], [], []
+    for r in unhealthy:
+        if r["primary_anomaly_id"] in already_open:
+            continue
+        already_open.add(r["primary_anomaly_id"])
+        alert_id = generate_uuid()
+        alert_rows.append({"id": alert_id, "anomaly_id": r["primary_anomaly_id"], "status": AlertStatus.NEW, "created_at": now})
+        for r_text in FusionEngine.generate_recommendations(r["severity"], r["evidence"]):
+            rec_rows.append({"id": generate_uuid(), "alert_id": alert_id, "content": r_text})
+        created.append((alert_id, r))
+
+    db.bulk_insert_mappings(Alert, alert_rows)
+    db.bulk_insert_mappings(Recommendation, rec_rows)
+    db.commit()
+    for alert_id, r in created:
+        _publish_alert_created(alert_id, r["primary_anomaly_id"], r["region_id"], r["sector_id"], r)
+    finished = time.perf_counter()
+
+    return AlertSweepSummary(
+        regions=len(region_ids),
+        sectors=len(sector_ids),
+        pairs_total=len(region_ids) * len(sector_ids),
+        pairs_evaluated=len(results),
+        unhealthy=len(unhealthy),
+        alerts_created=len(alert_rows),
+        alerts_existing=len(unhealthy) - len(alert_rows),
+        recommendations_created=len(rec_rows),
+        alert_ids=[row["id"] for row in alert_rows],
+        workers=workers,
+        timings={
+            "enumerate_seconds": round(enumerated - started, 3),
+            "evaluate_seconds": round(evaluated - enumerated, 3),
+            "persist_seconds": round(finished - evaluated, 3),
+            "total_seconds": round(finished - started, 3)
+        }
+    )
+
+def _build_alert_response(alert: Alert, snapshot: PolicyHealthSnapshot) -> AlertResponse:
+    anomaly = alert.anomaly
     return AlertResponse(
         id=alert.id,
         status=alert.status.value,
         created_at=alert.created_at,
-        policy_health_score=fusion['score'],
-        severity_label=fusion['severity'],
-        confidence=fusion['confidence'],
+        policy_health_score=snapshot.score,
+        severity_label=snapshot.severity,
+        confidence=snapshot.confidence,
         evidence=EvidenceSchema(
-            numeric_anomalies=fusion['evidence']['numeric_anomalies'],
-            nlp_insights=fusion['evidence']['nlp_insights'],
-            sentiment_score=fusion['evidence']['sentiment_score'],
-            total_reports=fusion['evidence']['total_reports']
+            numeric_anomalies=snapshot.evidence['numeric_anomalies'],
+            nlp_insights=snapshot.evidence['nlp_insights'],
+            sentiment_score=snapshot.evidence['sentiment_score'],
+            total_reports=snapshot.evidence['total_reports']
         ),
         recommendations=[r.content for r in alert.recommendations],
         region_id=anomaly.region_id,
-        sector_id=signal.sector_id
+        sector_id=anomaly.signal.sector_id
     )
 
+def encode_cursor(created_at: datetime, alert_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{alert_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        ts, alert_id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), alert_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _alerts_with_context(db: Session):
+    # contains_eager fills alert.anomaly and anomaly.signal from the explicit joins,
+    # which filters and ordering also use, instead of adding a second aliased join
+    return db.query(Alert).join(Alert.anomaly).join(AnomalyEvent.signal).options(
+        contains_eager(Alert.anomaly).contains_eager(AnomalyEvent.signal),
+        selectinload(Alert.recommendations)
+    )
+
+def get_alerts_enriched(
+    db: Session,
+    region_id: Optional[str] = None,
+    status: Optional[AlertStatus] = None,
+    sector_id: Optional[str] = None,
+    severity: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[AlertResponse], Optional[str]]:
+    """
+    Fetches one page of alerts, newest first, enriched with the latest policy health snapshot.
+    Pages by keyset on (created_at, id); returns the cursor for the next page, or None.
+    """
+    query = _alerts_with_context(db)
+    
+    if region_id:
+        query = query.filter(AnomalyEvent.region_id == region_id)
+    if status:
+        query = query.filter(Alert.status == status)
+    if sector_id:
+        query = query.filter(SignalDefinition.sector_id == sector_id)
+    if severity:
+        latest = health_service.latest_snapshot_subquery()
+        query = query.join(PolicyHealthSnapshot, and_(
+            PolicyHealthSnapshot.region_id == AnomalyEvent.region_id,
+            PolicyHealthSnapshot.sector_id == SignalDefinition.sector_id,
+            PolicyHealthSnapshot.window_days == 7
+        )).join(latest, and_(
+            latest.c.region_id == PolicyHealthSnapshot.region_id,
+            latest.c.sector_id == PolicyHealthSnapshot.sector_id,
+            latest.c.computed_at == PolicyHealthSnapshot.computed_at
+        )).filter(PolicyHealthSnapshot.severity == severity)
+    if cursor:
+        after_ts, after_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Alert.created_at < after_ts,
+            and_(Alert.created_at == after_ts, Alert.id < after_id)
+        ))
+        
+    # Fetch one extra row to learn whether another page exists
+    alerts_db = query.order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit + 1).all()
+    has_more = len(alerts_db) > limit
+    alerts_db = alerts_db[:limit]
+
+    # Anomaly and signal were populated by the joins above, so this issues no per-alert queries;
+    # snapshot reads do not commit, so nothing here is expired either
+    contexts = {(a.anomaly.region_id, a.anomaly.signal.sector_id) for a in alerts_db}
+    snapshots = health_service.get_latest_snapshots(db, contexts)
+    
+    results = [
+        _build_alert_response(alert, snapshots[(alert.anomaly.region_id, alert.anomaly.signal.sector_id)])
+        for alert in alerts_db
+    ]
+    next_cursor = encode_cursor(alerts_db[-1].created_at, alerts_db[-1].id) if has_more else None
+    return results, next_cursor
+
+def get_alert_detail(db: Session, alert_id: str) -> Optional[AlertResponse]:
+    alert = _alerts_with_context(db).filter(Alert.id == alert_id).first()
+    if not alert:
+        return None
+        
+    anomaly = alert.anomaly
+    snapshot = health_service.get_latest_snapshot(db, anomaly.region_id, anomaly.signal.sector_id)
+    return _build_alert_response(alert, snapshot)
+
 def review_alert(db: Session, alert_id: str, user_id: str, action: str, comments: str):
     alert = db.query(Alert).filter(Alert.id == alert_id).first()
     if not alert:
@@ -150,4 +314,11 @@ def review_alert(db: Session, alert_id: str, user_id: str, action: str, comments
     # Optionally we could add a recommendation note.
     
     db.commit()
+    anomaly = alert.anomaly
+    event_service.publish(
+        event_service.ALERT_REVIEWED,
+        anomaly.region_id if anomaly else None,
+        anomaly.signal.sector_id if anomaly and anomaly.signal else None,
+        {"alert_id": alert.id, "action": action, "status": alert.status.value, "reviewed_by": user_id}
+    )
     return True
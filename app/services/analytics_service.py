@@ -1,10 +1,17 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta
-from typing import List, Optional
-from ..models import NumericRecord, BaselineStats, AnomalyEvent, SignalDefinition
+from sqlalchemy import func, insert, select, and_, case, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta, timezone, date, time
+from typing import List, Optional, Dict, Tuple
+import numpy as np
+from ..models import NumericRecord, BaselineStats, AnomalyEvent, SignalDefinition, QuantileSketch, SignalRollup, RegionClosure, Region, RegionType, generate_uuid
 from ..analytics.baseline import BaselineModel
 from ..analytics.deviations import DeviationDetector
+from ..analytics.replay import ReplayDetector
+from ..analytics.changepoints import ChangepointEngine
+from ..analytics.sketches import KLLSketch
+from . import health_service, event_service
 import logging
 
 logger = logging.getLogger("civic_radar")
@@ -72,32 +79,142 @@ def run_baseline_computation(db: Session, signal_id: Optional[str] = None, regio
     db.commit()
     return count
 
+def _locked_sketch_rows(db: Session, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], QuantileSketch]:
+    # Locked in key order so concurrent ingests touching several series cannot deadlock
+    rows = db.query(QuantileSketch).filter(
+        tuple_(QuantileSketch.signal_id, QuantileSketch.region_id).in_(keys)
+    ).order_by(QuantileSketch.signal_id, QuantileSketch.region_id).with_for_update().all()
+    return {(r.signal_id, r.region_id): r for r in rows}
+
+def update_quantile_sketches(db: Session, sketches: Dict[Tuple[str, str], KLLSketch]):
+    """
+    Merges per-series sketches built from newly ingested values into the persisted ones.
+    Rows are read with SELECT ... FOR UPDATE, so concurrent ingests into the same series
+    merge one after the other instead of overwriting each other (SQLite, which ignores
+    FOR UPDATE, already serializes writers). Does not commit; callers commit together
+    with the records they ingested.
+    """
+    if not sketches:
+        return
+    keys = sorted(sketches)
+    existing = _locked_sketch_rows(db, keys)
+
+    created, raced = set(), []
+    for key in keys:
+        if key in existing:
+            continue
+        fresh = sketches[key]
+        try:
+            # The unique index decides between ingests creating the same series at once
+            with db.begin_nested():
+                db.add(QuantileSketch(signal_id=key[0], region_id=key[1], data=fresh.to_bytes(), count=fresh.count))
+            created.add(key)
+        except IntegrityError:
+            raced.append(key)
+    if raced:
+        existing.update(_locked_sketch_rows(db, raced))
+
+    for key in keys:
+        if key in created:
+            continue
+        row = existing[key]
+        merged = KLLSketch.from_bytes(row.data)
+        merged.merge(sketches[key])
+        row.data = merged.to_bytes()
+        row.count = merged.count
+
+def rebuild_quantile_sketches(db: Session, signal_id: Optional[str] = None, region_id: Optional[str] = None):
+    """
+    Rebuilds sketches from all stored numeric records in one streaming pass.
+    Only needed to bootstrap series ingested before sketches existed.
+    """
+    query = db.query(NumericRecord.signal_id, NumericRecord.region_id, NumericRecord.value)
+    if signal_id:
+        query = query.filter(NumericRecord.signal_id == signal_id)
+    if region_id:
+        query = query.filter(NumericRecord.region_id == region_id)
+
+    sketches: Dict[Tuple[str, str], KLLSketch] = {}
+    for s_id, r_id, value in query.yield_per(10000):
+        sketches.setdefault((s_id, r_id), KLLSketch()).update(value)
+
+    delete_query = db.query(QuantileSketch)
+    if signal_id:
+        delete_query = delete_query.filter(QuantileSketch.signal_id == signal_id)
+    if region_id:
+        delete_query = delete_query.filter(QuantileSketch.region_id == region_id)
+    delete_query.delete(synchronize_session=False)
+
+    update_quantile_sketches(db, sketches)
+    db.commit()
+    return len(sketches)
+
+def get_robust_baselines(db: Session, signal_id: Optional[str] = None, region_id: Optional[str] = None) -> List[Dict]:
+    """
+    Median/IQR/MAD baselines read from the persisted sketches, without touching raw records.
+    """
+    query = db.query(QuantileSketch)
+    if signal_id:
+        query = query.filter(QuantileSketch.signal_id == signal_id)
+    if region_id:
+        query = query.filter(QuantileSketch.region_id == region_id)
+
+    results = []
+    for row in query.all():
+        stats = KLLSketch.from_bytes(row.data).robust_stats()
+        if stats:
+            results.append({"signal_id": row.signal_id, "region_id": row.region_id, **stats})
+    return results
+
 def run_deviation_detection(
     db: Session, 
     method: str = "zscore", 
     signal_id: Optional[str] = None,
-    region_id: Optional[str] = None
+    region_id: Optional[str] = None,
+    baseline_type: str = "mean"
 ):
     """
     Runs anomaly detection against computed baselines.
+    baseline_type "mean" uses BaselineStats (mean/std_dev); "robust" uses the
+    quantile sketches, with median as centre and a MAD-derived sigma as scale.
     """
-    # Get baselines
+    # Get baselines as (signal_id, region_id, centre, scale)
     query = db.query(BaselineStats)
     if signal_id:
         query = query.filter(BaselineStats.signal_id == signal_id)
     if region_id:
         query = query.filter(BaselineStats.region_id == region_id)
-        
-    baselines = query.all()
+
+    if baseline_type == "robust":
+        baselines = []
+        collapsed = set()
+        for b in get_robust_baselines(db, signal_id, region_id):
+            # 1.4826 * MAD estimates sigma for normal data; fall back to IQR if MAD collapses
+            scale = 1.4826 * b["mad"] or b["iqr"] / 1.349
+            if scale > 0:
+                baselines.append((b["signal_id"], b["region_id"], b["median"], scale))
+            else:
+                collapsed.add((b["signal_id"], b["region_id"]))
+        if collapsed:
+            # Over 75% of the series shares one value (common for counts), so the
+            # robust scale is 0; such series use the mean/std baseline instead
+            baselines += [
+                (b.signal_id, b.region_id, b.mean, b.std_dev) for b in query.all()
+                if (b.signal_id, b.region_id) in collapsed and b.std_dev
+            ]
+    else:
+        baselines = [(b.signal_id, b.region_id, b.mean, b.std_dev) for b in query.all()]
+
     anomalies_detected = 0
+    touched_regions = set()
     
-    for baseline in baselines:
+    for b_signal_id, b_region_id, b_mean, b_std in baselines:
         # Fetch recent data (window depends on method)
         limit = 50 if method in ["cusum", "ewma", "changepoint"] else 1
         
         records = db.query(NumericRecord).filter(
-            NumericRecord.signal_id == baseline.signal_id,
-            NumericRecord.region_id == baseline.region_id
+            NumericRecord.signal_id == b_signal_id,
+            NumericRecord.region_id == b_region_id
         ).order_by(NumericRecord.timestamp.desc()).limit(limit).all()
         
         if not records:
@@ -112,15 +229,15 @@ def run_deviation_detection(
         desc = ""
         
         if method == "zscore":
-            severity = DeviationDetector.zscore(latest_record.value, baseline.mean, baseline.std_dev)
-            desc = f"Z-Score anomaly. Value: {latest_record.value}, Mean: {baseline.mean:.2f}"
+            severity = DeviationDetector.zscore(latest_record.value, b_mean, b_std)
+            desc = f"Z-Score anomaly. Value: {latest_record.value}, Mean: {b_mean:.2f}"
             
         elif method == "cusum":
-            severity = DeviationDetector.cusum(values, baseline.mean, baseline.std_dev)
+            severity = DeviationDetector.cusum(values, b_mean, b_std)
             desc = f"CUSUM drift detected."
             
         elif method == "ewma":
-            severity = DeviationDetector.ewma(values, baseline.mean, baseline.std_dev)
+            severity = DeviationDetector.ewma(values, b_mean, b_std)
             desc = f"EWMA shift detected."
             
         elif method == "sudden_drop":
@@ -134,21 +251,423 @@ def run_deviation_detection(
         if severity:
             # Check if anomaly already exists for this record to prevent dups
             exists = db.query(AnomalyEvent).filter(
-                AnomalyEvent.signal_id == baseline.signal_id,
-                AnomalyEvent.region_id == baseline.region_id,
+                AnomalyEvent.signal_id == b_signal_id,
+                AnomalyEvent.region_id == b_region_id,
                 AnomalyEvent.timestamp == latest_record.timestamp
             ).first()
             
             if not exists:
                 event = AnomalyEvent(
-                    signal_id=baseline.signal_id,
-                    region_id=baseline.region_id,
+                    signal_id=b_signal_id,
+                    region_id=b_region_id,
                     timestamp=latest_record.timestamp,
                     severity=severity,
                     description=desc
                 )
                 db.add(event)
                 anomalies_detected += 1
+                touched_regions.add(b_region_id)
                 
+    _commit_anomalies(db, touched_regions)
+    return anomalies_detected
+
+def _commit_anomalies(db: Session, region_ids: set, publish: bool = True):
+    """
+    Commits new anomaly events and refreshes the policy health snapshots of the
+    affected regions. Unless `publish` is off (historical
+    backfills), each new anomaly is also pushed to the event stream.
+    """
+    added = [o for o in db.new if isinstance(o, AnomalyEvent)]
+    db.flush()
+    new_anomalies = db.info.pop("new_anomalies", []) + [
+        {c: getattr(o, c) for c in ("id", "signal_id", "region_id", "timestamp", "severity", "description")}
+        for o in added
+    ]
+    db.commit()
+    if publish and new_anomalies:
+        signal_ids = {a["signal_id"] for a in new_anomalies}
+        sector_by_signal = dict(db.query(SignalDefinition.id, SignalDefinition.sector_id).filter(
+            SignalDefinition.id.in_(signal_ids)
+        ).all())
+        event_service.publish_anomalies(new_anomalies, sector_by_signal)
+    health_service.refresh_health_snapshots(db, region_ids)
+
+def _bulk_insert_new_anomalies(db: Session, signal_id: str, region_id: str, events: List[tuple]) -> int:
+    """
+    Bulk-inserts (timestamp, severity, description) events for one series,
+    skipping timestamps that already have an AnomalyEvent. Returns rows written.
+    """
+    if not events:
+        return 0
+    timestamps = [e[0] for e in events]
+    existing = {r[0] for r in db.query(AnomalyEvent.timestamp).filter(
+        AnomalyEvent.signal_id == signal_id,
+        AnomalyEvent.region_id == region_id,
+        AnomalyEvent.timestamp >= min(timestamps),
+        AnomalyEvent.timestamp <= max(timestamps)
+    ).all()}
+
+    rows = [
+        {
+            "id": generate_uuid(),
+            "signal_id": signal_id,
+            "region_id": region_id,
+            "timestamp": ts,
+            "severity": severity,
+            "description": desc
+        }
+        for ts, severity, desc in events if ts not in existing
+    ]
+    if rows:
+        db.bulk_insert_mappings(AnomalyEvent, rows)
+        # Picked up by _commit_anomalies for the event stream
+        db.info.setdefault("new_anomalies", []).extend(rows)
+    return len(rows)
+
+BACKFILL_DESCRIPTIONS = {
+    "zscore": "Z-Score anomaly (backfill).",
+    "cusum": "CUSUM drift detected (backfill).",
+    "ewma": "EWMA shift detected (backfill).",
+    "sudden_drop": "Sudden drop detected (backfill).",
+    "changepoint": "Structural changepoint detected (backfill).",
+}
+
+def _naive_utc(ts: Optional[datetime]) -> Optional[datetime]:
+    # Timestamps are stored without an offset; aware inputs are converted to UTC to compare with them
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+def run_historical_backfill(
+    db: Session,
+    methods: List[str],
+    signal_id: Optional[str] = None,
+    region_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    window: int = 30
+):
+    """
+    Replays each series' full history through the chosen detectors and writes
+    an AnomalyEvent for every flagged point within [start, end].
+    History before `start` is still read so trailing baselines are warm at the range start.
+    Existing events for the same signal/region/timestamp are left untouched.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    distinct_pairs = db.query(NumericRecord.signal_id, NumericRecord.region_id).distinct()
+    if signal_id:
+        distinct_pairs = distinct_pairs.filter(NumericRecord.signal_id == signal_id)
+    if region_id:
+        distinct_pairs = distinct_pairs.filter(NumericRecord.region_id == region_id)
+
+    pairs = distinct_pairs.all()
+    series_scanned = 0
+    anomalies_detected = 0
+    touched_regions = set()
+
+    for s_id, r_id in pairs:
+        query = db.query(NumericRecord.timestamp, NumericRecord.value).filter(
+            NumericRecord.signal_id == s_id,
+            NumericRecord.region_id == r_id
+        )
+        if end:
+            query = query.filter(NumericRecord.timestamp <= end)
+        rows = query.order_by(NumericRecord.timestamp).all()
+        if not rows:
+            continue
+        series_scanned += 1
+
+        timestamps = [r[0] for r in rows]
+        values = np.fromiter((r[1] for r in rows), dtype=float, count=len(rows))
+
+        in_range = np.ones(len(rows), dtype=bool)
+        if start:
+            if timestamps[0].tzinfo is not None:
+                # Postgres returns aware timestamps; numpy has no timezone-aware datetime64
+                stamps = np.array([_naive_utc(ts) for ts in timestamps], dtype="datetime64[us]")
+            else:
+                stamps = np.array(timestamps, dtype="datetime64[us]")
+            in_range = stamps >= np.datetime64(start, "us")
+
+        # A point flagged by several methods keeps the first method's event,
+        # mirroring the one-event-per-timestamp rule of run_deviation_detection
+        flagged = {}
+        for method in methods:
+            if method == "zscore":
+                severity = ReplayDetector.zscore(values, window)
+            elif method == "cusum":
+                severity = ReplayDetector.cusum(values, window)
+            elif method == "ewma":
+                severity = ReplayDetector.ewma(values, window)
+            elif method == "sudden_drop":
+                severity = ReplayDetector.sudden_drop(values, window)
+            elif method == "changepoint":
+                severity = ReplayDetector.changepoint(values)
+            else:
+                continue
+
+            for idx in np.flatnonzero(~np.isnan(severity) & in_range):
+                flagged.setdefault(int(idx), (float(severity[idx]), BACKFILL_DESCRIPTIONS[method]))
+
+        if not flagged:
+            continue
+
+        events = [
+            (timestamps[idx], severity, desc)
+            for idx, (severity, desc) in sorted(flagged.items())
+        ]
+        written = _bulk_insert_new_anomalies(db, s_id, r_id, events)
+        if written:
+            anomalies_detected += written
+            touched_regions.add(r_id)
+
+    _commit_anomalies(db, touched_regions, publish=False)
+    logger.info(f"Backfill scanned {series_scanned} series, wrote {anomalies_detected} anomalies.")
+    return {"series_scanned": series_scanned, "anomalies_detected": anomalies_detected}
+
+def run_changepoint_detection(
+    db: Session,
+    method: str = "binseg",
+    signal_id: Optional[str] = None,
+    region_id: Optional[str] = None,
+    penalty: Optional[float] = None,
+    min_size: int = 5,
+    persist: bool = False
+):
+    """
+    Locates every structural break over each series' full history.
+    Returns changepoint timestamps and magnitudes per series and, if `persist`
+    is set, records each one as an AnomalyEvent with severity in sigma units.
+    """
+    distinct_pairs = db.query(NumericRecord.signal_id, NumericRecord.region_id).distinct()
+    if signal_id:
+        distinct_pairs = distinct_pairs.filter(NumericRecord.signal_id == signal_id)
+    if region_id:
+        distinct_pairs = distinct_pairs.filter(NumericRecord.region_id == region_id)
+
+    series = []
+    anomalies_detected = 0
+    touched_regions = set()
+
+    for s_id, r_id in distinct_pairs.all():
+        rows = db.query(NumericRecord.timestamp, NumericRecord.value).filter(
+            NumericRecord.signal_id == s_id,
+            NumericRecord.region_id == r_id
+        ).order_by(NumericRecord.timestamp).all()
+        if not rows:
+            continue
+
+        values = np.fromiter((r[1] for r in rows), dtype=float, count=len(rows))
+        found = ChangepointEngine.detect(values, method, penalty, min_size)
+        if not found:
+            continue
+
+        changepoints = []
+        for cp in found:
+            ts = rows[cp["index"]][0]
+            changepoints.append({
+                "timestamp": ts,
+                "mean_before": cp["mean_before"],
+                "mean_after": cp["mean_after"],
+                "magnitude": cp["magnitude"],
+                "magnitude_sigma": cp["magnitude_sigma"]
+            })
+        series.append({"signal_id": s_id, "region_id": r_id, "changepoints": changepoints})
+
+        if persist:
+            events = [
+                (
+                    cp["timestamp"],
+                    cp["magnitude_sigma"],
+                    f"Structural changepoint detected ({method}). Mean {cp['mean_before']:.2f} -> {cp['mean_after']:.2f}"
+                )
+                for cp in changepoints
+            ]
+            written = _bulk_insert_new_anomalies(db, s_id, r_id, events)
+            if written:
+                anomalies_detected += written
+                touched_regions.add(r_id)
+
+    if persist:
+        _commit_anomalies(db, touched_regions, publish=False)
+    return {"series": series, "anomalies_detected": anomalies_detected}
+
+def refresh_signal_rollups(db: Session, signal_ids: Optional[List[str]] = None, start: Optional[datetime] = None):
+    """
+    Rematerializes daily subtree aggregates for every region from numeric records,
+    using one INSERT ... SELECT over the region closure table. Ingests keep the rollups
+    current with apply_rollup_deltas; this rebuilds them (optionally scoped) from scratch.
+    """
+    delete_query = db.query(SignalRollup)
+    if signal_ids:
+        delete_query = delete_query.filter(SignalRollup.signal_id.in_(signal_ids))
+    if start:
+        delete_query = delete_query.filter(SignalRollup.bucket >= start.date())
+    delete_query.delete(synchronize_session=False)
+
+    bucket = func.date(NumericRecord.timestamp)
+    source = select(
+        NumericRecord.signal_id,
+        RegionClosure.ancestor_id,
+        bucket,
+        func.sum(NumericRecord.value),
+        func.count(NumericRecord.value),
+        func.min(NumericRecord.value),
+        func.max(NumericRecord.value)
+    ).join(
+        RegionClosure, RegionClosure.descendant_id == NumericRecord.region_id
+    ).group_by(NumericRecord.signal_id, RegionClosure.ancestor_id, bucket)
+    if signal_ids:
+        source = source.where(NumericRecord.signal_id.in_(signal_ids))
+    if start:
+        # Whole days, so the first bucket is not left partially aggregated
+        source = source.where(NumericRecord.timestamp >= datetime.combine(start.date(), time.min))
+
+    result = db.execute(insert(SignalRollup).from_select(
+        ["signal_id", "region_id", "bucket", "value_sum", "value_count", "value_min", "value_max"],
+        source
+    ))
     db.commit()
+    return result.rowcount
+
+def add_rollup_value(deltas: Dict[Tuple[str, str, date], List[float]], signal_id: str, region_id: str, timestamp: datetime, value: float):
+    """
+    Folds one ingested value into per-(signal, region, day) [sum, count, min, max] deltas
+    for apply_rollup_deltas.
+    """
+    delta = deltas.get((signal_id, region_id, timestamp.date()))
+    if delta is None:
+        deltas[(signal_id, region_id, timestamp.date())] = [value, 1, value, value]
+    else:
+        delta[0] += value
+        delta[1] += 1
+        delta[2] = min(delta[2], value)
+        delta[3] = max(delta[3], value)
+
+def apply_rollup_deltas(db: Session, deltas: Dict[Tuple[str, str, date], List[float]]):
+    """
+    Adds newly ingested values to the daily rollups of their region and every ancestor
+    with one upsert, so an ingest only touches the buckets it affects instead of
+    re-aggregating the signal's history. The caller commits, together with the records.
+    """
+    if not deltas:
+        return
+    region_ids = {region_id for _, region_id, _ in deltas}
+    ancestors: Dict[str, List[str]] = {}
+    for ancestor_id, descendant_id in db.query(RegionClosure.ancestor_id, RegionClosure.descendant_id).filter(
+        RegionClosure.descendant_id.in_(region_ids)
+    ):
+        ancestors.setdefault(descendant_id, []).append(ancestor_id)
+
+    expanded: Dict[Tuple[str, str, date], List[float]] = {}
+    for (signal_id, region_id, day), (value_sum, value_count, value_min, value_max) in deltas.items():
+        # A region missing from the closure table still rolls up into itself
+        for target in ancestors.get(region_id) or [region_id]:
+            current = expanded.get((signal_id, target, day))
+            if current is None:
+                expanded[(signal_id, target, day)] = [value_sum, value_count, value_min, value_max]
+            else:
+                current[0] += value_sum
+                current[1] += value_count
+                current[2] = min(current[2], value_min)
+                current[3] = max(current[3], value_max)
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(SignalRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["signal_id", "region_id", "bucket"],
+        set_={
+            "value_sum": SignalRollup.value_sum + stmt.excluded.value_sum,
+            "value_count": SignalRollup.value_count + stmt.excluded.value_count,
+            "value_min": case((stmt.excluded.value_min < SignalRollup.value_min, stmt.excluded.value_min), else_=SignalRollup.value_min),
+            "value_max": case((stmt.excluded.value_max > SignalRollup.value_max, stmt.excluded.value_max), else_=SignalRollup.value_max)
+        }
+    )
+    db.execute(stmt, [
+        {"signal_id": signal_id, "region_id": region_id, "bucket": day, "value_sum": v[0], "value_count": v[1], "value_min": v[2], "value_max": v[3]}
+        for (signal_id, region_id, day), v in expanded.items()
+    ])
+
+def get_rollup_series(
+    db: Session,
+    signal_id: str,
+    region_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Daily series of a signal aggregated over a region and all its descendants.
+    """
+    query = db.query(SignalRollup).filter(
+        SignalRollup.signal_id == signal_id,
+        SignalRollup.region_id == region_id
+    )
+    if start:
+        query = query.filter(SignalRollup.bucket >= start.date())
+    if end:
+        query = query.filter(SignalRollup.bucket <= end.date())
+
+    return [
+        {
+            "date": r.bucket,
+            "mean": r.value_sum / r.value_count,
+            "min": r.value_min,
+            "max": r.value_max,
+            "count": r.value_count
+        }
+        for r in query.order_by(SignalRollup.bucket).all()
+    ]
+
+def run_rollup_deviation_detection(
+    db: Session,
+    region_type: RegionType = RegionType.DISTRICT,
+    signal_id: Optional[str] = None,
+    threshold: float = 3.0
+):
+    """
+    Z-score detection on rolled-up series for every region of a level.
+    Each series' baseline (mean/std_dev of its daily means) and latest day are read
+    from the materialized rollups in a single query, so no raw records are scanned.
+    """
+    daily_mean = SignalRollup.value_sum / SignalRollup.value_count
+    keys = (SignalRollup.signal_id, SignalRollup.region_id)
+
+    stats = db.query(
+        *keys,
+        func.avg(daily_mean).label("mean"),
+        func.avg(daily_mean * daily_mean).label("mean_sq"),
+        func.count().label("n"),
+        func.max(SignalRollup.bucket).label("latest")
+    ).join(Region, Region.id == SignalRollup.region_id).filter(Region.type == region_type)
+    if signal_id:
+        stats = stats.filter(SignalRollup.signal_id == signal_id)
+    stats = stats.group_by(*keys).subquery()
+
+    rows = db.query(SignalRollup, stats.c.mean, stats.c.mean_sq, stats.c.n).join(stats, and_(
+        SignalRollup.signal_id == stats.c.signal_id,
+        SignalRollup.region_id == stats.c.region_id,
+        SignalRollup.bucket == stats.c.latest
+    )).all()
+
+    anomalies_detected = 0
+    touched_regions = set()
+    for latest, mean, mean_sq, n in rows:
+        if n < 2:
+            continue
+        # Sample std_dev from the first two moments
+        std_dev = max(mean_sq - mean * mean, 0.0) * n / (n - 1)
+        std_dev = std_dev ** 0.5
+        value = latest.value_sum / latest.value_count
+        severity = DeviationDetector.zscore(value, mean, std_dev, threshold)
+        if severity:
+            desc = f"Rolled-up Z-Score anomaly. Daily mean: {value:.2f}, Mean: {mean:.2f}"
+            written = _bulk_insert_new_anomalies(
+                db, latest.signal_id, latest.region_id,
+                [(datetime.combine(latest.bucket, time.min), severity, desc)]
+            )
+            if written:
+                anomalies_detected += written
+                touched_regions.add(latest.region_id)
+
+    _commit_anomalies(db, touched_regions)
     return anomalies_detected
@@ -0,0 +1,186 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+import threading
+import time
+import joblib
+import numpy as np
+
+from ..config import settings
+from ..models import Issue
+from ..analytics.minhash import MinHasher, MinHashLSH
+
+logger = logging.getLogger("civic_radar")
+
+# Scope for issues without a region; everything else only matches within its region
+NO_REGION_SCOPE = "*"
+
+# One (doc id, signature, scope, timestamp) entry per new canonical issue
+Canonical = Tuple[str, np.ndarray, str, float]
+
+_hasher = MinHasher()
+_index: Optional[MinHashLSH] = None
+_index_mtime: Optional[float] = None
+# Canonicals indexed since the last save, replayed onto a newer file from another process
+_unsaved: List[Canonical] = []
+_index_lock = threading.Lock()
+
+def _window_seconds() -> float:
+    return settings.DEDUP_WINDOW_DAYS * 86400.0
+
+def _file_mtime() -> Optional[float]:
+    try:
+        return os.stat(settings.DEDUP_INDEX_PATH).st_mtime
+    except OSError:
+        return None
+
+def _new_index() -> MinHashLSH:
+    return MinHashLSH(num_perm=_hasher.num_perm, threshold=settings.DEDUP_THRESHOLD)
+
+def _load_index() -> MinHashLSH:
+    # Re-read when another process (e.g. the backlog script) saved a newer index,
+    # keeping whatever this process indexed since its own last save
+    global _index, _index_mtime
+    mtime = _file_mtime()
+    if mtime is not None and mtime != _index_mtime:
+        _index = joblib.load(settings.DEDUP_INDEX_PATH)
+        _index_mtime = mtime
+        for canonical in _unsaved:
+            _index.insert(*canonical)
+    elif _index is None:
+        _index = _new_index()
+    return _index
+
+def save_index():
+    """
+    Writes the in-memory index to disk, dropping canonical issues too old to be
+    matched again. Callers save once per batch or job rather than per issue.
+    """
+    global _index_mtime
+    with _index_lock:
+        if _index is None:
+            return
+        # Merges a newer file first so another process's canonicals are not overwritten
+        index = _load_index()
+        # Classification order is not time order, so keep twice the window
+        index.prune(time.time() - 2 * _window_seconds())
+        path = settings.DEDUP_INDEX_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        joblib.dump(index, tmp_path)
+        os.replace(tmp_path, path)
+        _index_mtime = os.stat(path).st_mtime
+        _unsaved.clear()
+
+def link_duplicates(
+    issues: Iterable[Tuple[str, Optional[str], Optional[datetime], str]]
+) -> Tuple[Dict[str, str], List[Canonical]]:
+    """
+    Checks newly classified (id, region_id, created_at, text) issues, in order, against
+    the LSH index of canonical issues in the same region and time window. Returns
+    {duplicate id: canonical id} and the issues without a match, which become canonical
+    themselves; repeats within one batch are linked to them too. The shared index is
+    left untouched: pass the canonicals to index_canonicals once the links are
+    committed. Each lookup reads a fixed number of buckets, independent of how many
+    issues are indexed.
+    """
+    window = _window_seconds()
+    links = {}
+    canonicals: List[Canonical] = []
+    batch = _new_index()
+    with _index_lock:
+        index = _load_index()
+        for issue_id, region_id, created_at, text in issues:
+            signature = _hasher.signature(text)
+            if signature is None:
+                continue
+            ts = (created_at or datetime.now()).timestamp()
+            scope = region_id or NO_REGION_SCOPE
+            matches = [
+                (m[0], m[1], source.timestamps[m[0]])
+                for source in (index, batch)
+                for m in source.query(signature, scope, ts, window) if m[0] != issue_id
+            ]
+            if matches:
+                links[issue_id] = min(matches, key=lambda m: (-m[1], m[2]))[0]
+            else:
+                batch.insert(issue_id, signature, scope, ts)
+                canonicals.append((issue_id, signature, scope, ts))
+    return links, canonicals
+
+def index_canonicals(canonicals: List[Canonical]):
+    """
+    Adds committed canonical issues to the shared index. A rolled-back batch never
+    calls this, so its issues cannot become canonical for later ones.
+    """
+    with _index_lock:
+        index = _load_index()
+        for canonical in canonicals:
+            index.insert(*canonical)
+        _unsaved.extend(canonicals)
+
+def rebuild_duplicate_links(db: Session, chunk_size: int = 2000) -> Dict[str, int]:
+    """
+    Starts a fresh index and replays every classified issue in creation order,
+    rewriting canonical_issue_id. For databases classified before detection existed
+    or after changing DEDUP_THRESHOLD / DEDUP_WINDOW_DAYS.
+    """
+    global _index, _index_mtime
+    with _index_lock:
+        _index = _new_index()
+        # Treat the current file as already loaded, so the replay does not pick it up again
+        _index_mtime = _file_mtime()
+        _unsaved.clear()
+    db.query(Issue).filter(Issue.canonical_issue_id != None).update(
+        {Issue.canonical_issue_id: None}, synchronize_session=False
+    )
+    db.commit()
+
+    checked = linked = 0
+    last = None
+    while True:
+        query = db.query(Issue.id, Issue.region_id, Issue.created_at, Issue.title, Issue.description).filter(
+            Issue.sentiment_score != None
+        )
+        if last:
+            query = query.filter(or_(
+                Issue.created_at > last[0], and_(Issue.created_at == last[0], Issue.id > last[1])
+            ))
+        rows = query.order_by(Issue.created_at, Issue.id).limit(chunk_size).all()
+        if not rows:
+            break
+        links, canonicals = link_duplicates((r.id, r.region_id, r.created_at, f"{r.title} {r.description}") for r in rows)
+        if links:
+            db.bulk_update_mappings(Issue, [{"id": i, "canonical_issue_id": c} for i, c in links.items()])
+            db.commit()
+        index_canonicals(canonicals)
+        checked += len(rows)
+        linked += len(links)
+        last = (rows[-1].created_at, rows[-1].id)
+        if last[0]:
+            # Replay is in time order, so older canonicals can no longer match
+            with _index_lock:
+                _index.prune(last[0].timestamp() - _window_seconds())
+
+    save_index()
+    logger.info(f"Duplicate links rebuilt: {linked} of {checked} issues are duplicates.")
+    return {"checked": checked, "duplicates": linked, "indexed": len(_index)}
+
+def get_duplicates(db: Session, issue_id: str) -> Dict[str, Any]:
+    issue = db.query(Issue.id, Issue.canonical_issue_id).filter(Issue.id == issue_id).first()
+    if not issue:
+        raise ValueError("Issue not found")
+    canonical_id = issue.canonical_issue_id or issue.id
+    duplicates: List[str] = [
+        r[0] for r in db.query(Issue.id).filter(Issue.canonical_issue_id == canonical_id).order_by(Issue.created_at)
+    ]
+    return {
+        "issue_id": issue_id,
+        "canonical_issue_id": canonical_id,
+        "is_duplicate": issue.canonical_issue_id is not None,
+        "duplicate_count": len(duplicates),
+        "duplicates": duplicates
+    }
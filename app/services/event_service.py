@@ -0,0 +1,150 @@
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+import json
+import logging
+
+from ..config import settings
+
+logger = logging.getLogger("civic_radar")
+
+ALERT_CREATED = "alert.created"
+ALERT_REVIEWED = "alert.reviewed"
+ANOMALY_DETECTED = "anomaly.detected"
+STREAM_RESET = "stream.reset"
+
+class Subscription:
+    """
+    One connected client. Events are handed over to its event loop thread-safely,
+    since publishers run on worker threads. A client that falls behind is cut off
+    (None is queued) and is expected to reconnect with its last event id.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, region_ids: Optional[Set[str]], sector_id: Optional[str]):
+        self.loop = loop
+        self.region_ids = region_ids
+        self.sector_id = sector_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENT_QUEUE_SIZE)
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.region_ids is not None and event["region_id"] not in self.region_ids:
+            return False
+        if self.sector_id is not None and event["sector_id"] != self.sector_id:
+            return False
+        return True
+
+    def _deliver(self, event: Dict[str, Any]):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Event subscriber fell behind; closing its stream.")
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    def deliver(self, event: Dict[str, Any]):
+        try:
+            self.loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:
+            # Loop already closed; the stream is going away anyway
+            pass
+
+class EventBus:
+    """
+    In-process pub/sub with a bounded replay buffer.
+    Event ids are sequential per process, so with several workers each one
+    keeps its own stream and clients must stick to one worker.
+    """
+
+    def __init__(self, buffer_size: int):
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscription] = set()
+
+    def publish(self, type: str, region_id: Optional[str], sector_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            event = {
+                "id": self._next_id,
+                "type": type,
+                "region_id": region_id,
+                "sector_id": sector_id,
+                "created_at": datetime.now().isoformat(),
+                "data": data
+            }
+            self._next_id += 1
+            self._buffer.append(event)
+            subscribers = [s for s in self._subscribers if s.matches(event)]
+        for s in subscribers:
+            s.deliver(event)
+        return event
+
+    def subscribe(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        region_ids: Optional[Set[str]] = None,
+        sector_id: Optional[str] = None,
+        last_event_id: Optional[int] = None
+    ) -> Tuple[Subscription, List[Dict[str, Any]], bool]:
+        """
+        Registers a subscriber and returns it with the buffered events it missed since
+        `last_event_id`. Both happen under the publish lock, so nothing is lost or repeated
+        between replay and live delivery. The flag is True when events older than the
+        buffer were missed and the client should refetch state before applying the replay.
+        """
+        subscription = Subscription(loop, region_ids, sector_id)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is None:
+                return subscription, [], False
+            oldest = self._buffer[0]["id"] if self._buffer else self._next_id
+            missed = last_event_id + 1 < oldest
+            backlog = [e for e in self._buffer if e["id"] > last_event_id and subscription.matches(e)]
+        return subscription, backlog, missed
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def last_event_id(self) -> int:
+        with self._lock:
+            return self._next_id - 1
+
+bus = EventBus(settings.EVENT_BUFFER_SIZE)
+
+def publish(type: str, region_id: Optional[str], sector_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+    return bus.publish(type, region_id, sector_id, data)
+
+def publish_anomalies(anomalies: Iterable[Dict[str, Any]], sector_by_signal: Dict[str, str]):
+    """
+    Emits one anomaly.detected event per newly committed anomaly.
+    """
+    for a in anomalies:
+        publish(ANOMALY_DETECTED, a["region_id"], sector_by_signal.get(a["signal_id"]), {
+            "anomaly_id": a["id"],
+            "signal_id": a["signal_id"],
+            "timestamp": a["timestamp"].isoformat() if a["timestamp"] else None,
+            "severity": a["severity"],
+            "description": a["description"]
+        })
+
+def format_sse(event: Dict[str, Any]) -> str:
+    # Events without an id (resets) leave the client's Last-Event-ID untouched
+    id_line = f"id: {event['id']}\n" if event["id"] is not None else ""
+    return f"{id_line}event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+def reset_event() -> Dict[str, Any]:
+    """
+    Sent ahead of the replay when the client's last event id fell out of the buffer.
+    """
+    return {
+        "id": None,
+        "type": STREAM_RESET,
+        "region_id": None,
+        "sector_id": None,
+        "created_at": datetime.now().isoformat(),
+        "data": {"message": "Events were missed; reload alerts before resuming."}
+    }
@@ -1,38 +1,99 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+
+from ..config import settings
+from ..db import SessionLocal
+from ..models import AlertExplanation
+from ..schemas.alerts import AlertResponse
 from ..services import alert_service
 from ..llm import gemini_client
 
-def explain_alert(db: Session, alert_id: str) -> str:
+logger = logging.getLogger("civic_radar")
+
+# Bump whenever the prompt template below changes so stored explanations are not reused
+PROMPT_VERSION = 1
+
+class ExplanationLRU:
     """
-    Generates a natural language explanation for why an alert was triggered.
-    Uses Gemini if available, otherwise constructs a deterministic fallback string.
+    Process-wide LRU in front of the alert_explanations table.
+    Keys are content hashes, so entries never go stale and need no invalidation.
     """
-    # 1. Fetch rich alert data (re-using existing service to get fusion evidence)
-    alert_data = alert_service.get_alert_detail(db, alert_id)
-    if not alert_data:
-        raise ValueError("Alert not found")
+    _entries: "OrderedDict[str, str]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, key: str) -> Optional[str]:
+        with cls._lock:
+            explanation = cls._entries.get(key)
+            if explanation is not None:
+                cls._entries.move_to_end(key)
+            return explanation
 
-    # 2. Prepare Data for Prompt
-    numeric_evidence = "\n- ".join(alert_data.evidence.numeric_anomalies) if alert_data.evidence.numeric_anomalies else "No specific numeric deviations."
-    nlp_evidence = "\n- ".join(alert_data.evidence.nlp_insights) if alert_data.evidence.nlp_insights else "No specific text patterns."
-    recs = "\n- ".join(alert_data.recommendations) if alert_data.recommendations else "No specific recommendations."
+    @classmethod
+    def put(cls, key: str, explanation: str):
+        if settings.EXPLANATION_LRU_SIZE <= 0:
+            return
+        with cls._lock:
+            cls._entries[key] = explanation
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > settings.EXPLANATION_LRU_SIZE:
+                cls._entries.popitem(last=False)
 
-    # 3. Construct Prompt
-    prompt = f"""
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+def _prompt_inputs(alert_data: AlertResponse) -> Dict[str, Any]:
+    """
+    Everything the prompt depends on. Alert ids and timestamps are deliberately left out
+    so that alerts with identical evidence share one explanation.
+    """
+    return {
+        "severity": alert_data.severity_label,
+        "score": alert_data.policy_health_score,
+        "confidence": alert_data.confidence,
+        "numeric_anomalies": list(alert_data.evidence.numeric_anomalies),
+        "nlp_insights": list(alert_data.evidence.nlp_insights),
+        "sentiment_score": alert_data.evidence.sentiment_score,
+        "recommendations": list(alert_data.recommendations)
+    }
+
+def explanation_key(inputs: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {"prompt_version": PROMPT_VERSION, "model": gemini_client.MODEL_NAME, "inputs": inputs},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def build_prompt(inputs: Dict[str, Any]) -> str:
+    numeric_evidence = "\n- ".join(inputs["numeric_anomalies"]) if inputs["numeric_anomalies"] else "No specific numeric deviations."
+    nlp_evidence = "\n- ".join(inputs["nlp_insights"]) if inputs["nlp_insights"] else "No specific text patterns."
+    recs = "\n- ".join(inputs["recommendations"]) if inputs["recommendations"] else "No specific recommendations."
+
+    return f"""
     You are a Policy Analyst for the Tamil Nadu State Government.
     Explain the following Civic Alert to a District Collector in a professional, concise manner (max 3 sentences).
 
     Alert Context:
-    - Severity: {alert_data.severity_label}
-    - Health Score: {alert_data.policy_health_score}/100
-    - Confidence: {alert_data.confidence}
+    - Severity: {inputs["severity"]}
+    - Health Score: {inputs["score"]}/100
+    - Confidence: {inputs["confidence"]}
 
     Evidence Collected:
     - Numeric Data:
     - {numeric_evidence}
     - Citizen Feedback (NLP):
     - {nlp_evidence}
-    - Sentiment Score: {alert_data.evidence.sentiment_score}
+    - Sentiment Score: {inputs["sentiment_score"]}
 
     System Recommendations:
     - {recs}
@@ -41,16 +102,88 @@ def explain_alert(db: Session, alert_id: str) -> str:
     Summarize the root cause of this alert and justify the severity level based on the evidence.
     """
 
-    # 4. Call Gemini
-    explanation = gemini_client.generate_alert_explanation(prompt)
+def fallback_explanation(inputs: Dict[str, Any]) -> str:
+    return (
+        f"Alert triggered with {inputs['severity']} severity (Score: {inputs['score']}). "
+        f"Primary factors include {len(inputs['numeric_anomalies'])} numeric deviations and "
+        f"a sentiment score of {inputs['sentiment_score']}. "
+        f"Review attached evidence for details."
+    )
+
+def _lookup(db: Session, key: str) -> Optional[str]:
+    explanation = ExplanationLRU.get(key)
+    if explanation is not None:
+        return explanation
+    row = db.query(AlertExplanation.explanation).filter(AlertExplanation.key == key).first()
+    if row:
+        ExplanationLRU.put(key, row[0])
+        return row[0]
+    return None
+
+def _store(db: Session, key: str, explanation: str):
+    db.add(AlertExplanation(key=key, explanation=explanation, model=gemini_client.MODEL_NAME))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request generated the same explanation first; either text will do
+        db.rollback()
+    ExplanationLRU.put(key, explanation)
 
-    # 5. Fallback if Gemini fails or no key
+def _prepare(db: Session, alert_id: str) -> Tuple[Dict[str, Any], str, Optional[str]]:
+    alert_data = alert_service.get_alert_detail(db, alert_id)
+    if not alert_data:
+        raise ValueError("Alert not found")
+    inputs = _prompt_inputs(alert_data)
+    key = explanation_key(inputs)
+    return inputs, key, _lookup(db, key)
+
+async def explain_alert_async(db: Session, alert_id: str) -> Tuple[str, bool]:
+    """
+    Explanation for an alert and whether it came from the cache.
+    Only model output is stored; the deterministic fallback is rebuilt on each
+    call so the alert is retried against the model next time.
+    Waits on the model without holding a worker thread; only the database work
+    runs in the threadpool.
+    """
+    inputs, key, cached = await run_in_threadpool(_prepare, db, alert_id)
+    if cached is not None:
+        return cached, True
+
+    explanation = await gemini_client.generate_alert_explanation_async(build_prompt(inputs))
     if not explanation:
-        explanation = (
-            f"Alert triggered with {alert_data.severity_label} severity (Score: {alert_data.policy_health_score}). "
-            f"Primary factors include {len(alert_data.evidence.numeric_anomalies)} numeric deviations and "
-            f"a sentiment score of {alert_data.evidence.sentiment_score}. "
-            f"Review attached evidence for details."
-        )
-
-    return explanation
+        return fallback_explanation(inputs), False
+
+    await run_in_threadpool(_store, db, key, explanation)
+    return explanation, False
+
+async def explain_alert(db: Session, alert_id: str) -> str:
+    """
+    Generates a natural language explanation for why an alert was triggered.
+    Uses Gemini if available, otherwise constructs a deterministic fallback string.
+    """
+    return (await explain_alert_async(db, alert_id))[0]
+
+async def _pregenerate_one(alert_id: str) -> bool:
+    db = SessionLocal()
+    try:
+        _, cached = await explain_alert_async(db, alert_id)
+        return not cached
+    except ValueError:
+        return False
+    finally:
+        db.close()
+
+async def pregenerate_explanations(alert_ids: List[str]) -> int:
+    """
+    Background task run after alerts are created: fills the cache so the first
+    explain request is answered without waiting on the model. Alerts are explained
+    concurrently (the LLM client caps in-flight calls), each on its own session.
+    Returns how many alerts were not already cached.
+    """
+    if not gemini_client.gemini.api_key:
+        return 0
+    results = await asyncio.gather(*(_pregenerate_one(a) for a in alert_ids), return_exceptions=True)
+    for r in results:
+        if isinstance(r, Exception):
+            logger.error(f"Explanation pre-generation failed: {r}")
+    return sum(1 for r in results if r is True)
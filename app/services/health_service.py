@@ -0,0 +1,278 @@
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, and_, select, update, event
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from ..models import PolicyHealthSnapshot, AnomalyEvent, Issue, SignalDefinition, Sector, RegionType
+from ..analytics.fusion import FusionEngine
+from ..schemas.fusion import HeatmapResponse, HeatmapAxis
+from . import region_service
+
+SNAPSHOT_FIELDS = ("score", "severity", "confidence", "evidence", "primary_anomaly_id")
+
+def _snapshot_from_result(region_id: str, sector_id: str, fusion_result: Dict[str, Any], window_days: int) -> PolicyHealthSnapshot:
+    return PolicyHealthSnapshot(
+        region_id=region_id,
+        sector_id=sector_id,
+        window_days=window_days,
+        score=fusion_result['score'],
+        severity=fusion_result['severity'],
+        confidence=fusion_result['confidence'],
+        evidence=fusion_result['evidence'],
+        primary_anomaly_id=fusion_result.get('primary_anomaly_id'),
+        computed_at=datetime.now(),
+        stale=False
+    )
+
+def _unchanged(snapshot: Optional[PolicyHealthSnapshot], fusion_result: Dict[str, Any]) -> bool:
+    return snapshot is not None and all(getattr(snapshot, f) == fusion_result.get(f) for f in SNAPSHOT_FIELDS)
+
+def store_snapshots(
+    db: Session,
+    results: Dict[Tuple[str, str], Dict[str, Any]],
+    window_days: int = 7
+) -> int:
+    """
+    Stores already computed fusion results as the newest snapshots of their contexts.
+    A result identical to the context's newest snapshot only clears its stale flag,
+    so the history gains a row per change rather than per refresh.
+    Does not commit; returns the number of rows appended.
+    """
+    if not results:
+        return 0
+    latest = _latest_rows(db, results.keys(), window_days)
+    appended = 0
+    for (region_id, sector_id), fusion_result in results.items():
+        current = latest.get((region_id, sector_id))
+        if current is not None:
+            current.stale = False
+        if not _unchanged(current, fusion_result):
+            db.add(_snapshot_from_result(region_id, sector_id, fusion_result, window_days))
+            appended += 1
+    return appended
+
+def record_snapshot(
+    db: Session,
+    region_id: str,
+    sector_id: str,
+    fusion_result: Dict[str, Any],
+    window_days: int = 7
+):
+    """
+    Stores an already computed fusion result for its context. Does not commit.
+    """
+    store_snapshots(db, {(region_id, sector_id): fusion_result}, window_days)
+
+def mark_snapshots_stale(connection, region_ids: Iterable[str], sector_ids: Optional[Iterable[str]] = None):
+    """
+    Flags the newest snapshots of the given regions (optionally only some sectors) as
+    out of date; history rows are left alone. Takes a Session or a Connection, so it
+    can run inside flush events. Does not commit.
+    """
+    region_ids = [r for r in set(region_ids) if r]
+    if not region_ids:
+        return
+    newer = aliased(PolicyHealthSnapshot)
+    newest = select(func.max(newer.computed_at)).where(
+        newer.region_id == PolicyHealthSnapshot.region_id,
+        newer.sector_id == PolicyHealthSnapshot.sector_id,
+        newer.window_days == PolicyHealthSnapshot.window_days
+    ).scalar_subquery()
+    stmt = update(PolicyHealthSnapshot).where(
+        PolicyHealthSnapshot.region_id.in_(region_ids),
+        PolicyHealthSnapshot.stale == False,
+        PolicyHealthSnapshot.computed_at == newest
+    )
+    if sector_ids is not None:
+        stmt = stmt.where(PolicyHealthSnapshot.sector_id.in_(list(sector_ids)))
+    connection.execute(stmt.values(stale=True))
+
+@event.listens_for(Issue, "after_insert")
+def _mark_stale_on_issue(mapper, connection, target):
+    # Issue volume and sentiment feed every sector's score for the region
+    if target.region_id:
+        mark_snapshots_stale(connection, [target.region_id])
+
+def refresh_health_snapshot(db: Session, region_id: str, sector_id: str, window_days: int = 7):
+    fusion_result = FusionEngine.calculate_policy_health(db, region_id, sector_id, window_days)
+    record_snapshot(db, region_id, sector_id, fusion_result, window_days)
+    db.commit()
+
+def refresh_health_snapshots(db: Session, region_ids: Optional[Iterable[str]] = None, window_days: int = 7) -> int:
+    """
+    Recomputes snapshots for every (region, sector) context that has recent anomalies
+    or an existing snapshot, optionally limited to the given regions.
+    """
+    region_ids = list(region_ids) if region_ids is not None else None
+    if region_ids is not None and not region_ids:
+        return 0
+
+    start_date = datetime.now() - timedelta(days=window_days)
+    anomaly_contexts = db.query(AnomalyEvent.region_id, SignalDefinition.sector_id).join(
+        SignalDefinition, SignalDefinition.id == AnomalyEvent.signal_id
+    ).filter(AnomalyEvent.timestamp >= start_date)
+    snapshot_contexts = db.query(PolicyHealthSnapshot.region_id, PolicyHealthSnapshot.sector_id).filter(
+        PolicyHealthSnapshot.window_days == window_days
+    )
+    if region_ids is not None:
+        anomaly_contexts = anomaly_contexts.filter(AnomalyEvent.region_id.in_(region_ids))
+        snapshot_contexts = snapshot_contexts.filter(PolicyHealthSnapshot.region_id.in_(region_ids))
+
+    contexts = set(anomaly_contexts.distinct().all()) | set(snapshot_contexts.distinct().all())
+    store_snapshots(db, {
+        (region_id, sector_id): FusionEngine.calculate_policy_health(db, region_id, sector_id, window_days)
+        for region_id, sector_id in contexts if region_id and sector_id
+    }, window_days)
+
+    db.commit()
+    return len(contexts)
+
+def refresh_stale_snapshots(db: Session, region_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Recomputes the contexts whose newest snapshot is marked stale, optionally limited
+    to the given regions, and commits. Pipelines call this after committing writes
+    that feed the fusion score, so reads can serve the persisted rows.
+    """
+    region_ids = {r for r in region_ids if r} if region_ids is not None else None
+    if region_ids is not None and not region_ids:
+        return 0
+    windows = db.query(PolicyHealthSnapshot.window_days).filter(PolicyHealthSnapshot.stale == True)
+    if region_ids is not None:
+        windows = windows.filter(PolicyHealthSnapshot.region_id.in_(region_ids))
+
+    refreshed = 0
+    for (window_days,) in windows.distinct().all():
+        latest = latest_snapshot_subquery(window_days, region_ids)
+        contexts = db.query(PolicyHealthSnapshot.region_id, PolicyHealthSnapshot.sector_id).join(latest, and_(
+            PolicyHealthSnapshot.region_id == latest.c.region_id,
+            PolicyHealthSnapshot.sector_id == latest.c.sector_id,
+            PolicyHealthSnapshot.computed_at == latest.c.computed_at
+        )).filter(PolicyHealthSnapshot.window_days == window_days, PolicyHealthSnapshot.stale == True).all()
+        store_snapshots(db, {
+            (region_id, sector_id): FusionEngine.calculate_policy_health(db, region_id, sector_id, window_days)
+            for region_id, sector_id in contexts
+        }, window_days)
+        refreshed += len(contexts)
+    db.commit()
+    return refreshed
+
+def latest_snapshot_subquery(window_days: int = 7, region_ids: Optional[Iterable[str]] = None):
+    """
+    (region_id, sector_id, computed_at) of the newest snapshot per context.
+    """
+    stmt = select(
+        PolicyHealthSnapshot.region_id,
+        PolicyHealthSnapshot.sector_id,
+        func.max(PolicyHealthSnapshot.computed_at).label("computed_at")
+    ).where(
+        PolicyHealthSnapshot.window_days == window_days
+    ).group_by(PolicyHealthSnapshot.region_id, PolicyHealthSnapshot.sector_id)
+    if region_ids is not None:
+        stmt = stmt.where(PolicyHealthSnapshot.region_id.in_(list(region_ids)))
+    return stmt.subquery()
+
+def _latest_rows(
+    db: Session,
+    contexts: Iterable[Tuple[str, str]],
+    window_days: int = 7
+) -> Dict[Tuple[str, str], PolicyHealthSnapshot]:
+    contexts = set(contexts)
+    if not contexts:
+        return {}
+    latest = latest_snapshot_subquery(window_days, {c[0] for c in contexts})
+    rows = db.query(PolicyHealthSnapshot).join(latest, and_(
+        PolicyHealthSnapshot.region_id == latest.c.region_id,
+        PolicyHealthSnapshot.sector_id == latest.c.sector_id,
+        PolicyHealthSnapshot.computed_at == latest.c.computed_at
+    )).filter(PolicyHealthSnapshot.window_days == window_days).all()
+    return {(r.region_id, r.sector_id): r for r in rows if (r.region_id, r.sector_id) in contexts}
+
+def get_latest_snapshot(db: Session, region_id: str, sector_id: str, window_days: int = 7) -> PolicyHealthSnapshot:
+    """
+    Newest snapshot for a context. See get_latest_snapshots.
+    """
+    return get_latest_snapshots(db, [(region_id, sector_id)], window_days)[(region_id, sector_id)]
+
+def get_latest_snapshots(
+    db: Session,
+    contexts: Iterable[Tuple[str, str]],
+    window_days: int = 7
+) -> Dict[Tuple[str, str], PolicyHealthSnapshot]:
+    """
+    Newest persisted snapshot for each (region_id, sector_id) in one query, as the
+    alert filters see it. Pipelines refresh stale rows after their commits
+    (refresh_stale_snapshots), so reads do not recompute them. Only contexts with no
+    snapshot yet are computed live and returned unsaved; reads never write.
+    """
+    contexts = set(contexts)
+    snapshots = _latest_rows(db, contexts, window_days)
+    for region_id, sector_id in contexts:
+        if (region_id, sector_id) not in snapshots:
+            fusion_result = FusionEngine.calculate_policy_health(db, region_id, sector_id, window_days)
+            snapshots[(region_id, sector_id)] = _snapshot_from_result(region_id, sector_id, fusion_result, window_days)
+    return snapshots
+
+def get_health_history(
+    db: Session,
+    region_id: str,
+    sector_id: str,
+    window_days: int = 7,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    query = db.query(
+        PolicyHealthSnapshot.computed_at,
+        PolicyHealthSnapshot.score,
+        PolicyHealthSnapshot.severity,
+        PolicyHealthSnapshot.confidence
+    ).filter(
+        PolicyHealthSnapshot.region_id == region_id,
+        PolicyHealthSnapshot.sector_id == sector_id,
+        PolicyHealthSnapshot.window_days == window_days
+    )
+    if start:
+        query = query.filter(PolicyHealthSnapshot.computed_at >= start)
+    if end:
+        query = query.filter(PolicyHealthSnapshot.computed_at <= end)
+
+    return [
+        {"computed_at": ts, "score": score, "severity": severity, "confidence": confidence}
+        for ts, score, severity, confidence in query.order_by(PolicyHealthSnapshot.computed_at).all()
+    ]
+
+def get_health_heatmap(
+    db: Session,
+    region_type: RegionType = RegionType.DISTRICT,
+    parent_id: Optional[str] = None,
+    window_days: int = 7,
+    include_descendants: bool = False
+) -> HeatmapResponse:
+    """
+    Health score matrix for every region of a level (optionally under one parent) x every sector.
+    """
+    tree = region_service.get_region_tree()
+    if parent_id:
+        regions = [r for r in tree.subtree_of(parent_id) if r.type == region_type]
+    else:
+        regions = list(tree.of_type(region_type))
+    sectors = db.query(Sector.id, Sector.name).order_by(Sector.name).all()
+
+    matrix = FusionEngine.calculate_health_matrix(
+        db,
+        [r.id for r in regions],
+        [s.id for s in sectors],
+        window_days,
+        include_descendants
+    )
+
+    return HeatmapResponse(
+        window_days=window_days,
+        regions=[HeatmapAxis(id=r.id, name=r.name) for r in regions],
+        sectors=[HeatmapAxis(id=s.id, name=s.name or s.id) for s in sectors],
+        scores=matrix["score"].tolist(),
+        severity=matrix["severity"].tolist(),
+        confidence=matrix["confidence"].tolist(),
+        anomaly_counts=matrix["anomaly_count"].tolist(),
+        issue_counts=matrix["issue_count"].tolist(),
+        sentiment_scores=matrix["sentiment_score"].tolist()
+    )
@@ -9,6 +9,12 @@ from fastapi import UploadFile, HTTPException
 from ..models import NumericRecord, TextRecord, SignalDefinition, Sector, Region
 from ..datasets.registry import registry
 from ..schemas.ingest import IngestResult, DirectNumericIngest, DirectTextIngest
+from ..analytics.sketches import KLLSketch
+from ..analytics.nlp import NLPProcessor
+from ..analytics.topics import TopicModelStore
+from .analytics_service import update_quantile_sketches, add_rollup_value, apply_rollup_deltas
+from .nlp_service import NLPService
+from . import health_service
 
 logger = logging.getLogger("civic_radar")
 
@@ -63,6 +69,13 @@ def handle_upload(file: UploadFile):
         
     return {"status": "uploaded", "dataset_id": dataset_id}
 
+def _finish_text_batch(db: Session, records: list):
+    # Topic ids and daily term counts, one vectorize + predict call and one upsert per batch
+    for record, cluster in zip(records, TopicModelStore.assign([r.value for r in records])):
+        record.topic_cluster = cluster
+    NLPService.record_terms(db, ((r.region_id, r.timestamp, r.value) for r in records))
+    records.clear()
+
 def load_dataset_into_db(db: Session, dataset_id: str) -> IngestResult:
     dataset = registry.get_dataset(dataset_id)
     if not dataset:
@@ -106,6 +119,10 @@ def load_dataset_into_db(db: Session, dataset_id: str) -> IngestResult:
 
     # Cache regions to avoid N+1 queries
     existing_region_ids = {r[0] for r in db.query(Region.id).all()}
+    # Per-series quantile sketches, merged into the persisted ones once at the end
+    sketches = {}
+    # Daily rollup deltas, applied once at the end like the sketches
+    rollup_deltas = {}
 
     # 3. Ingest Numeric
     try:
@@ -122,6 +139,8 @@ def load_dataset_into_db(db: Session, dataset_id: str) -> IngestResult:
                 value=row.value
             )
             db.add(record)
+            sketches.setdefault((row.signal_id, row.region_id), KLLSketch()).update(row.value)
+            add_rollup_value(rollup_deltas, row.signal_id, row.region_id, row.timestamp, row.value)
             success_count += 1
             
             if success_count % 1000 == 0:
@@ -132,6 +151,7 @@ def load_dataset_into_db(db: Session, dataset_id: str) -> IngestResult:
         pass
 
     # 4. Ingest Text
+    pending_texts = []
     try:
         for row in dataset.stream_text_data():
             total_records += 1
@@ -143,18 +163,26 @@ def load_dataset_into_db(db: Session, dataset_id: str) -> IngestResult:
                 signal_id=row.signal_id,
                 region_id=row.region_id,
                 timestamp=row.timestamp,
-                value=row.value
+                value=row.value,
+                **NLPProcessor.analyze(row.value)
             )
             db.add(record)
+            pending_texts.append(record)
             success_count += 1
             
             if success_count % 1000 == 0:
+                _finish_text_batch(db, pending_texts)
                 db.commit()
     except Exception as e:
         logger.error(f"Error streaming text data: {e}")
         pass
+    _finish_text_batch(db, pending_texts)
 
+    update_quantile_sketches(db, sketches)
+    apply_rollup_deltas(db, rollup_deltas)
     db.commit()
+    # Picks up contexts left stale by complaints since the last pipeline run
+    health_service.refresh_stale_snapshots(db)
 
     score = (success_count / total_records * 100) if total_records > 0 else 100.0
     
@@ -180,6 +208,10 @@ def ingest_numeric_single(db: Session, data: DirectNumericIngest):
         value=data.value
     )
     db.add(record)
+    update_quantile_sketches(db, {(data.signal_id, data.region_id): KLLSketch.from_values([data.value])})
+    rollup_deltas = {}
+    add_rollup_value(rollup_deltas, data.signal_id, data.region_id, data.timestamp, data.value)
+    apply_rollup_deltas(db, rollup_deltas)
     db.commit()
     return {"status": "ok", "id": record.id}
 
@@ -193,8 +225,11 @@ def ingest_text_single(db: Session, data: DirectTextIngest):
         signal_id=data.signal_id,
         region_id=data.region_id,
         timestamp=data.timestamp,
-        value=data.value
+        value=data.value,
+        topic_cluster=TopicModelStore.assign([data.value])[0],
+        **NLPProcessor.analyze(data.value)
     )
     db.add(record)
+    NLPService.record_terms(db, [(data.region_id, data.timestamp, data.value)])
     db.commit()
     return {"status": "ok", "id": record.id}
@@ -5,6 +5,8 @@ import codecs
 from datetime import datetime
 from ..models import NGOReportUploadLog, NumericRecord, SignalDefinition, Region, User
 from ..schemas.ngo_report import NGOReportUploadResponse
+from ..analytics.sketches import KLLSketch
+from .analytics_service import update_quantile_sketches, add_rollup_value, apply_rollup_deltas
 import logging
 
 logger = logging.getLogger("civic_radar")
@@ -27,6 +29,8 @@ def process_upload(db: Session, user: User, file: UploadFile):
     db.commit()
 
     affected_regions = set()
+    sketches = {}
+    rollup_deltas = {}
     rows_processed = 0
     errors = 0
     
@@ -75,10 +79,14 @@ def process_upload(db: Session, user: User, file: UploadFile):
                 value=value_float
             )
             db.add(record)
+            sketches.setdefault((sig_id, reg_id), KLLSketch()).update(value_float)
+            add_rollup_value(rollup_deltas, sig_id, reg_id, ts, value_float)
             affected_regions.add(reg_id)
             rows_processed += 1
         
         # 2. Update Log and Commit
+        update_quantile_sketches(db, sketches)
+        apply_rollup_deltas(db, rollup_deltas)
         upload_log.status = "DONE" if errors == 0 else "DONE_WITH_ERRORS"
         db.commit()
         
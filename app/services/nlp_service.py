@@ -1,11 +1,112 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from datetime import datetime, timedelta
-from typing import Optional, List
+from sqlalchemy import and_, or_, func, case, event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import json
+import logging
+import os
+import time
 
-from ..models import Issue, TextRecord
+from ..cache import TTLCache
+from ..config import settings
+from ..db import SessionLocal
+from ..models import Issue, TextRecord, JobCheckpoint, TermDailyCount, RegionClosure
 from ..analytics.nlp import NLPProcessor
+from ..analytics.topics import TopicModel, TopicModelStore
+from . import dedup_service, health_service, region_service
+from .ai_service import AdminInsightsCache
+
+logger = logging.getLogger("civic_radar")
+
+BACKLOG_JOB = "nlp_backlog"
+TOPIC_JOB = "topic_model"
+# A running checkpoint not updated for this long is treated as a crashed run
+JOB_STALE_AFTER = timedelta(minutes=10)
+# Rows fetched per round trip when streaming unclassified texts into aggregates
+STREAM_CHUNK_SIZE = 1000
+
+# Text sources in processing order: (model, timestamp column, text columns)
+TEXT_SOURCES = {
+    "issues": (Issue, Issue.created_at, (Issue.title, Issue.description)),
+    "text_records": (TextRecord, TextRecord.timestamp, (TextRecord.value,)),
+}
+
+class NLPInsightsCache:
+    """
+    Process-wide cache of insights aggregates over completed days, keyed by
+    (region_id, policy_id, days), each covering the region's subtree. An entry is only
+    valid on the day it was computed, since the window slides at midnight; today's
+    partial bucket is never cached. Texts landing on an earlier day invalidate their
+    region, its ancestors and the all-regions entries; the TTL bounds staleness from
+    writers in other processes.
+    """
+    _cache = TTLCache(max_entries=1000)
+
+    @classmethod
+    def get(cls, key: Tuple[Optional[str], Optional[str], int], day: date) -> Optional[Dict[str, Any]]:
+        entry = cls._cache.get(key)
+        if entry is None or entry[0] != day:
+            return None
+        return entry[1]
+
+    @classmethod
+    def put(cls, key: Tuple[Optional[str], Optional[str], int], day: date, aggregates: Dict[str, Any], ttl: float):
+        cls._cache.put(key, (day, aggregates), ttl)
+
+    @classmethod
+    def invalidate_region(cls, region_id: Optional[str]):
+        # Entries cover a region's subtree, so a text also affects every ancestor's entries
+        region_ids = {None, region_id}
+        if region_id:
+            region_ids.update(a.id for a in region_service.get_ancestors(region_id))
+        cls._cache.invalidate(lambda key: key[0] in region_ids)
+
+    @classmethod
+    def clear(cls):
+        cls._cache.clear()
+
+@event.listens_for(Issue, "after_insert")
+@event.listens_for(TextRecord, "after_insert")
+def _invalidate_insights_on_text(mapper, connection, target):
+    # Texts stamped today only touch the live bucket, which is never cached
+    ts = target.created_at if isinstance(target, Issue) else target.timestamp
+    if isinstance(ts, datetime) and ts.date() < date.today():
+        NLPInsightsCache.invalidate_region(target.region_id)
+
+def _term_counts(docs: Iterable[Tuple[Optional[str], Optional[datetime], str]]) -> Counter:
+    """
+    (region_id, timestamp, text) documents -> Counter keyed by (region_id, day, term).
+    """
+    counts = Counter()
+    for region_id, ts, text in docs:
+        if ts is None:
+            continue
+        day = ts.date()
+        for term, n in NLPProcessor.extract_terms(text).items():
+            counts[(region_id, day, term)] += n
+    return counts
+
+def _classify_chunk(source: str, rows: List[Tuple]) -> Tuple[List[Dict[str, Any]], Counter]:
+    """
+    Process-pool worker: (id, region_id, timestamp, *text columns) rows ->
+    bulk UPDATE mappings and the chunk's daily term counts.
+    """
+    analyzed_at = datetime.now().isoformat()
+    texts = [" ".join(filter(None, row[3:])) for row in rows]
+    analyses = NLPProcessor.analyze_batch(texts)
+    mappings = []
+    for row, analysis, cluster in zip(rows, analyses, TopicModelStore.assign(texts)):
+        mapping = {"id": row[0], **analysis}
+        if cluster is not None:
+            mapping["topic_cluster"] = cluster
+        if source == "issues":
+            mapping["ai_analysis"] = json.dumps({**analysis, "analyzed_at": analyzed_at})
+        mappings.append(mapping)
+    return mappings, _term_counts((row[1], row[2], text) for row, text in zip(rows, texts))
 
 class NLPService:
     
@@ -13,32 +114,626 @@ class NLPService:
     def run_batch_classification(db: Session, limit: int = 100):
         """
         Classify unanalyzed issues/records with Language, Failure Type, and Sentiment.
-        Updates the DB records in place (using ai_analysis column for storage).
+        Updates the typed columns in place; issues also keep the ai_analysis JSON copy.
         """
         # 1. Process Issues
-        issues = db.query(Issue).filter(Issue.ai_analysis == None).limit(limit).all()
+        # Creation order, so duplicates link to the earliest issue
+        issues = db.query(Issue).filter(Issue.sentiment_score == None).order_by(Issue.created_at, Issue.id).limit(limit).all()
         count = 0
         
-        for issue in issues:
-            full_text = f"{issue.title} {issue.description}"
-            
-            lang = NLPProcessor.detect_language(full_text)
-            sentiment = NLPProcessor.compute_sentiment(full_text)
-            fail_type = NLPProcessor.categorize_failure_type(full_text)
-            
-            analysis_data = {
-                "language": lang,
-                "sentiment_score": sentiment,
-                "failure_type": fail_type,
-                "analyzed_at": datetime.now().isoformat()
-            }
-            
-            issue.ai_analysis = json.dumps(analysis_data)
+        texts = [f"{i.title} {i.description}" for i in issues]
+        analyses = NLPProcessor.analyze_batch(texts)
+        links, canonicals = dedup_service.link_duplicates((i.id, i.region_id, i.created_at, t) for i, t in zip(issues, texts))
+        for issue, analysis, cluster in zip(issues, analyses, TopicModelStore.assign(texts)):
+            issue.language = analysis["language"]
+            issue.sentiment_score = analysis["sentiment_score"]
+            issue.failure_type = analysis["failure_type"]
+            if cluster is not None:
+                issue.topic_cluster = cluster
+            issue.canonical_issue_id = links.get(issue.id)
+            issue.ai_analysis = json.dumps({**analysis, "analyzed_at": datetime.now().isoformat()})
             count += 1
-        
+        # Repeated complaints only count once
+        NLPService.record_terms(db, ((i.region_id, i.created_at, t) for i, t in zip(issues, texts) if i.id not in links))
+
+        # 2. Process TextRecords with the remaining budget
+        if count < limit:
+            records = db.query(TextRecord).filter(TextRecord.sentiment_score == None).limit(limit - count).all()
+            texts = [r.value for r in records]
+            for record, analysis, cluster in zip(records, NLPProcessor.analyze_batch(texts), TopicModelStore.assign(texts)):
+                record.language = analysis["language"]
+                record.sentiment_score = analysis["sentiment_score"]
+                record.failure_type = analysis["failure_type"]
+                if cluster is not None:
+                    record.topic_cluster = cluster
+                count += 1
+            NLPService.record_terms(db, ((r.region_id, r.timestamp, t) for r, t in zip(records, texts)))
+
+        duplicate_regions = {i.region_id for i in issues if i.id in links}
+        health_service.mark_snapshots_stale(db, duplicate_regions)
         db.commit()
+        if issues:
+            dedup_service.index_canonicals(canonicals)
+            dedup_service.save_index()
+            NLPService._invalidate_duplicate_regions(duplicate_regions)
+            # New complaints marked these regions' health snapshots stale on insert
+            health_service.refresh_stale_snapshots(db, {i.region_id for i in issues})
         return count
 
+    @staticmethod
+    def _invalidate_duplicate_regions(region_ids: Iterable[Optional[str]]):
+        # Issues counted while unclassified drop out of the insights once linked;
+        # their health snapshots are marked stale in the linking transaction
+        for region_id in set(region_ids):
+            NLPInsightsCache.invalidate_region(region_id)
+            AdminInsightsCache.invalidate_region(region_id)
+
+    @staticmethod
+    def _unclassified_chunks(db: Session, source: str, cursor: Any, chunk_size: int):
+        """
+        Streams unclassified rows of one source as keyset-paginated chunks. Issues go
+        in (created_at, id) order, so each is checked for duplicates only against
+        earlier ones; text records go in id order.
+        Each chunk is its own short query, so committing a chunk's results never
+        invalidates an open cursor (Postgres closes server-side cursors on commit,
+        SQLite blocks commits behind an open reader).
+        """
+        model, ts_col, text_cols = TEXT_SOURCES[source]
+        by_time = model is Issue
+        if by_time and not isinstance(cursor, list):
+            # Checkpoints written before issues were streamed in time order hold a bare id
+            cursor = None
+        while True:
+            query = db.query(model.id, model.region_id, ts_col, *text_cols).filter(model.sentiment_score == None)
+            if by_time:
+                if cursor:
+                    last_ts, last_id = datetime.fromisoformat(cursor[0]), cursor[1]
+                    query = query.filter(or_(ts_col > last_ts, and_(ts_col == last_ts, model.id > last_id)))
+                query = query.order_by(ts_col, model.id)
+            else:
+                if cursor:
+                    query = query.filter(model.id > cursor)
+                query = query.order_by(model.id)
+            rows = [tuple(r) for r in query.limit(chunk_size).all()]
+            if not rows:
+                return
+            yield rows
+            cursor = NLPService._chunk_cursor(source, rows)
+
+    @staticmethod
+    def _chunk_cursor(source: str, rows: List[Tuple]) -> Any:
+        # JSON-safe resume position after the last of (id, region_id, timestamp, ...) rows
+        if TEXT_SOURCES[source][0] is Issue:
+            return [rows[-1][2].isoformat(), rows[-1][0]]
+        return rows[-1][0]
+
+    @staticmethod
+    def get_backlog_status(db: Session) -> Optional[Dict[str, Any]]:
+        checkpoint = db.get(JobCheckpoint, BACKLOG_JOB)
+        if not checkpoint:
+            return None
+        remaining = {
+            source: db.query(func.count(model.id)).filter(model.sentiment_score == None).scalar()
+            for source, (model, _, _) in TEXT_SOURCES.items()
+        }
+        return {
+            "status": checkpoint.status,
+            "cursor": checkpoint.cursor,
+            "processed": checkpoint.processed,
+            "started_at": checkpoint.started_at,
+            "updated_at": checkpoint.updated_at,
+            "remaining": remaining
+        }
+
+    @staticmethod
+    def _is_job_running(db: Session, name: str) -> bool:
+        checkpoint = db.get(JobCheckpoint, name)
+        return bool(
+            checkpoint and checkpoint.status == "running"
+            and checkpoint.updated_at and checkpoint.updated_at > datetime.now() - JOB_STALE_AFTER
+        )
+
+    @staticmethod
+    def is_backlog_running(db: Session) -> bool:
+        return NLPService._is_job_running(db, BACKLOG_JOB)
+
+    @staticmethod
+    def _claim_job(db: Session, name: str) -> Tuple[JobCheckpoint, Optional[str]]:
+        """
+        Marks a job's checkpoint running and returns it with the status it had before.
+        The claim is a single conditional UPDATE (an INSERT for a first run) whose
+        rowcount decides the winner, so of two concurrent starts only one proceeds.
+        """
+        now = datetime.now()
+        checkpoint = db.get(JobCheckpoint, name)
+        previous = checkpoint.status if checkpoint else None
+        if checkpoint is None:
+            dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+            stmt = dialect.insert(JobCheckpoint).values(
+                name=name, status="running", processed=0, started_at=now, updated_at=now
+            ).on_conflict_do_nothing(index_elements=["name"])
+            claimed = db.execute(stmt).rowcount
+        else:
+            claimed = db.query(JobCheckpoint).filter(
+                JobCheckpoint.name == name,
+                or_(
+                    JobCheckpoint.status != "running",
+                    JobCheckpoint.updated_at == None,
+                    JobCheckpoint.updated_at <= now - JOB_STALE_AFTER
+                )
+            ).update(
+                {"status": "running", "processed": 0, "started_at": now, "updated_at": now},
+                synchronize_session=False
+            )
+        db.commit()
+        if not claimed:
+            raise ValueError("already running")
+        return db.get(JobCheckpoint, name), previous
+
+    @staticmethod
+    def run_backlog_job(
+        db: Session,
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_rows: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Drains the classification backlog of Issue and TextRecord rows.
+        Chunks are classified in a process pool while the next ones are read; results
+        are written back in order with bulk UPDATEs, and the checkpoint advances with
+        each committed chunk. A run stopped by `max_rows`, an error or a crash resumes
+        from its checkpoint next time.
+        """
+        chunk_size = chunk_size or settings.NLP_BACKLOG_CHUNK_SIZE
+        workers = settings.NLP_BACKLOG_WORKERS if workers is None else workers
+        # The calling process reads and writes while workers classify; on a machine
+        # without a spare core the pool only adds pickling overhead
+        workers = min(workers, max((os.cpu_count() or 1) - 1, 0))
+
+        try:
+            checkpoint, previous = NLPService._claim_job(db, BACKLOG_JOB)
+        except ValueError:
+            raise ValueError("NLP backlog job is already running")
+        resume_from = dict(checkpoint.cursor or {}) if previous != "completed" else {}
+        checkpoint.cursor = resume_from
+        db.commit()
+
+        started = time.perf_counter()
+        counts = {source: 0 for source in TEXT_SOURCES}
+        issue_regions = set()
+        budget = max_rows
+
+        def write(source: str, rows: List[Tuple], result: Tuple[List[Dict[str, Any]], Counter]):
+            mappings, term_counts = result
+            links, canonicals = {}, []
+            if source == "issues":
+                # Duplicate detection is stateful and order-dependent, so it runs here rather than in workers
+                docs = [(row[0], row[1], row[2], " ".join(filter(None, row[3:]))) for row in rows]
+                issue_regions.update(d[1] for d in docs)
+                links, canonicals = dedup_service.link_duplicates(docs)
+                if links:
+                    for mapping in mappings:
+                        mapping["canonical_issue_id"] = links.get(mapping["id"])
+                    term_counts.subtract(_term_counts((d[1], d[2], d[3]) for d in docs if d[0] in links))
+                    term_counts = +term_counts
+            duplicate_regions = {row[1] for row in rows if row[0] in links}
+            db.bulk_update_mappings(TEXT_SOURCES[source][0], mappings)
+            NLPService._store_term_counts(db, term_counts)
+            health_service.mark_snapshots_stale(db, duplicate_regions)
+            counts[source] += len(mappings)
+            checkpoint.cursor = {**checkpoint.cursor, source: NLPService._chunk_cursor(source, rows)}
+            checkpoint.processed += len(mappings)
+            db.commit()
+            # Only committed canonicals may match later issues
+            dedup_service.index_canonicals(canonicals)
+            NLPService._invalidate_duplicate_regions(duplicate_regions)
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"NLP backlog: {source} +{len(mappings)} ({checkpoint.processed} total, "
+                f"{checkpoint.processed / elapsed:.0f} rows/s)"
+            )
+
+        # Spawned workers avoid forking a threaded server process
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) if workers > 0 else None
+        try:
+            for source in TEXT_SOURCES:
+                pending = deque()
+                for rows in NLPService._unclassified_chunks(db, source, resume_from.get(source), chunk_size):
+                    if budget is not None:
+                        rows = rows[:budget]
+                        budget -= len(rows)
+                    if pool:
+                        pending.append((rows, pool.submit(_classify_chunk, source, rows)))
+                        # Keep each worker busy with one chunk queued behind it
+                        while len(pending) > 2 * workers:
+                            chunk, future = pending.popleft()
+                            write(source, chunk, future.result())
+                    else:
+                        write(source, rows, _classify_chunk(source, rows))
+                    if budget == 0:
+                        break
+                while pending:
+                    chunk, future = pending.popleft()
+                    write(source, chunk, future.result())
+                if budget == 0:
+                    break
+        except Exception:
+            db.rollback()
+            checkpoint.status = "failed"
+            db.commit()
+            raise
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+            dedup_service.save_index()
+
+        if budget == 0:
+            checkpoint.status = "paused"
+        else:
+            checkpoint.status = "completed"
+            checkpoint.cursor = None
+        db.commit()
+        health_service.refresh_stale_snapshots(db, issue_regions)
+
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        return {
+            "status": checkpoint.status,
+            "processed": counts,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(total / elapsed, 1) if elapsed > 0 else None,
+            "resumed_from": resume_from or None
+        }
+
+    @staticmethod
+    def run_backlog_job_detached(chunk_size: Optional[int] = None, workers: Optional[int] = None, max_rows: Optional[int] = None):
+        """
+        Background-task entry point: runs the backlog job on its own session.
+        """
+        db = SessionLocal()
+        try:
+            summary = NLPService.run_backlog_job(db, chunk_size, workers, max_rows)
+            logger.info(f"NLP backlog job finished: {summary}")
+        except Exception as e:
+            logger.error(f"NLP backlog job failed: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _clustered_chunks(db: Session, source: str, cursor: Optional[List], chunk_size: int):
+        """
+        Streams (timestamp, id, *text columns) rows of one source newer than the
+        (timestamp, id) cursor, as keyset-paginated chunks in timestamp order.
+        """
+        model, ts_col, text_cols = TEXT_SOURCES[source]
+        last_ts, last_id = (datetime.fromisoformat(cursor[0]), cursor[1]) if cursor else (None, None)
+        while True:
+            query = db.query(ts_col, model.id, *text_cols).filter(ts_col != None)
+            if last_ts is not None:
+                query = query.filter(or_(ts_col > last_ts, and_(ts_col == last_ts, model.id > last_id)))
+            rows = query.order_by(ts_col, model.id).limit(chunk_size).all()
+            if not rows:
+                return
+            yield rows
+            last_ts, last_id = rows[-1][0], rows[-1][1]
+
+    @staticmethod
+    def _assign_topic_clusters(db: Session, model: TopicModel, chunk_size: int, reassign: bool = False) -> int:
+        """
+        Writes cluster ids for rows that have none yet (all rows with `reassign`),
+        in id-ordered chunks committed one at a time.
+        """
+        assigned = 0
+        for table, _, text_cols in TEXT_SOURCES.values():
+            after_id = None
+            while True:
+                query = db.query(table.id, *text_cols)
+                if not reassign:
+                    query = query.filter(table.topic_cluster == None)
+                if after_id:
+                    query = query.filter(table.id > after_id)
+                rows = query.order_by(table.id).limit(chunk_size).all()
+                if not rows:
+                    break
+                clusters = model.predict([" ".join(filter(None, row[1:])) for row in rows])
+                db.bulk_update_mappings(table, [{"id": row[0], "topic_cluster": c} for row, c in zip(rows, clusters)])
+                db.commit()
+                assigned += len(rows)
+                after_id = rows[-1][0]
+        return assigned
+
+    @staticmethod
+    def train_topic_model(db: Session, batch_size: Optional[int] = None, rebuild: bool = False) -> Dict[str, Any]:
+        """
+        Background job: feeds documents added since the last run to the persisted topic
+        model with partial_fit, saves it, then assigns cluster ids to rows that lack one.
+        Training follows created_at / timestamp, so text records backfilled with older
+        timestamps are assigned a cluster but not trained on. `rebuild` starts a fresh
+        model (e.g. after TOPIC_CLUSTERS changes) and reassigns every row.
+        """
+        batch_size = batch_size or settings.TOPIC_TRAIN_BATCH_SIZE
+        try:
+            checkpoint, _ = NLPService._claim_job(db, TOPIC_JOB)
+        except ValueError:
+            raise ValueError("Topic model training is already running")
+        cursor = {} if rebuild else dict(checkpoint.cursor or {})
+
+        started = time.perf_counter()
+        model = None if rebuild else TopicModelStore.get()
+        if model is None or model.num_clusters != settings.TOPIC_CLUSTERS:
+            model, cursor, rebuild = TopicModel(settings.TOPIC_CLUSTERS), {}, True
+
+        trained = {source: 0 for source in TEXT_SOURCES}
+        try:
+            for source in TEXT_SOURCES:
+                for rows in NLPService._clustered_chunks(db, source, cursor.get(source), batch_size):
+                    if model.partial_fit([" ".join(filter(None, row[2:])) for row in rows]):
+                        trained[source] += len(rows)
+                    cursor[source] = [rows[-1][0].isoformat(), rows[-1][1]]
+
+            if not model.is_fitted:
+                checkpoint.status = "completed"
+                db.commit()
+                return {"status": "skipped", "reason": f"fewer than {model.num_clusters} documents", "trained": trained}
+
+            assigned = 0
+            if rebuild:
+                # A fresh model numbers its clusters from scratch, so every row is reassigned
+                # before it is published; until then readers keep the old model and ids
+                assigned = NLPService._assign_topic_clusters(db, model, batch_size, reassign=True)
+            # The model file is written before the cursor moves, so a crash only repeats training
+            TopicModelStore.put(model)
+            # Cached cluster counts predate the new centroids
+            NLPInsightsCache.clear()
+            checkpoint.cursor = cursor
+            checkpoint.processed = sum(trained.values())
+            db.commit()
+
+            if not rebuild:
+                assigned = NLPService._assign_topic_clusters(db, model, batch_size)
+        except Exception:
+            db.rollback()
+            checkpoint.status = "failed"
+            db.commit()
+            raise
+
+        checkpoint.status = "completed"
+        db.commit()
+        elapsed = time.perf_counter() - started
+        logger.info(f"Topic model trained on {sum(trained.values())} new documents, {assigned} assigned in {elapsed:.1f}s")
+        return {
+            "status": "completed",
+            "rebuilt": rebuild,
+            "trained": trained,
+            "documents_seen": model.documents_seen,
+            "assigned": assigned,
+            "elapsed_seconds": round(elapsed, 2)
+        }
+
+    @staticmethod
+    def train_topic_model_detached(batch_size: Optional[int] = None, rebuild: bool = False):
+        """
+        Background-task entry point: trains the topic model on its own session.
+        """
+        db = SessionLocal()
+        try:
+            summary = NLPService.train_topic_model(db, batch_size, rebuild)
+            logger.info(f"Topic model training finished: {summary}")
+        except Exception as e:
+            logger.error(f"Topic model training failed: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_topic_model_info() -> Optional[Dict[str, Any]]:
+        model = TopicModelStore.get()
+        if model is None or not model.is_fitted:
+            return None
+        return {
+            "num_clusters": model.num_clusters,
+            "documents_seen": model.documents_seen,
+            "clusters": [{"cluster_id": c, "top_terms": model.top_terms(c, 10)} for c in range(model.num_clusters)]
+        }
+
+    @staticmethod
+    def _store_term_counts(db: Session, counts: Counter):
+        """
+        Adds (region_id, day, term) counts to the daily term table for the region,
+        each of its ancestors and ALL_REGIONS, with one upsert. The caller commits.
+        """
+        if not counts:
+            return
+        region_ids = {region_id for region_id, _, _ in counts if region_id}
+        ancestors: Dict[str, List[str]] = {}
+        if region_ids:
+            for ancestor_id, descendant_id in db.query(RegionClosure.ancestor_id, RegionClosure.descendant_id).filter(
+                RegionClosure.descendant_id.in_(region_ids)
+            ):
+                ancestors.setdefault(descendant_id, []).append(ancestor_id)
+
+        expanded = Counter()
+        for (region_id, day, term), n in counts.items():
+            # A region missing from the closure table still counts for itself
+            for target in ancestors.get(region_id) or ([region_id] if region_id else []):
+                expanded[(target, day, term)] += n
+            expanded[(TermDailyCount.ALL_REGIONS, day, term)] += n
+
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(TermDailyCount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["region_id", "day", "term"],
+            set_={"count": TermDailyCount.count + stmt.excluded["count"]}
+        )
+        db.execute(stmt, [
+            {"region_id": region_id, "day": day, "term": term, "count": n}
+            for (region_id, day, term), n in expanded.items()
+        ])
+
+    @staticmethod
+    def record_terms(db: Session, docs: Iterable[Tuple[Optional[str], Optional[datetime], str]]):
+        """
+        Counts the terms of newly classified (region_id, timestamp, text) documents
+        into the daily term table. Call once per document, in the classifying transaction.
+        """
+        NLPService._store_term_counts(db, _term_counts(docs))
+
+    @staticmethod
+    def rebuild_term_counts(db: Session, chunk_size: Optional[int] = None) -> int:
+        """
+        Recounts the daily term table from every classified document, e.g. after
+        upgrading a database whose texts were classified before the table existed.
+        """
+        chunk_size = chunk_size or settings.NLP_BACKLOG_CHUNK_SIZE
+        db.query(TermDailyCount).delete(synchronize_session=False)
+        documents = 0
+        for model, ts_col, text_cols in TEXT_SOURCES.values():
+            after_id = None
+            while True:
+                query = db.query(model.id, model.region_id, ts_col, *text_cols).filter(
+                    model.sentiment_score != None, *NLPService._unique_filters(model)
+                )
+                if after_id:
+                    query = query.filter(model.id > after_id)
+                rows = query.order_by(model.id).limit(chunk_size).all()
+                if not rows:
+                    break
+                NLPService.record_terms(db, ((row[1], row[2], " ".join(filter(None, row[3:]))) for row in rows))
+                documents += len(rows)
+                after_id = rows[-1][0]
+        db.commit()
+        return documents
+
+    @staticmethod
+    def _keyword_surges(db: Session, start_day: date, end_day: date, region_id: Optional[str] = None, top_n: int = 10) -> List[Dict]:
+        """
+        Surging terms of [start_day, end_day] against the same number of days before it,
+        summed from the daily term table in one GROUP BY. Rows are pre-aggregated per
+        region subtree, so any region level reads only its own day buckets.
+        Only classified documents are counted.
+        """
+        prev_start = start_day - (end_day - start_day) - timedelta(days=1)
+        in_current = TermDailyCount.day >= start_day
+        current = func.sum(case((in_current, TermDailyCount.count), else_=0))
+        previous = func.sum(case((in_current, 0), else_=TermDailyCount.count))
+
+        rows = db.query(TermDailyCount.term, current, previous).filter(
+            TermDailyCount.region_id == (region_id or TermDailyCount.ALL_REGIONS),
+            TermDailyCount.day >= prev_start,
+            TermDailyCount.day <= end_day
+        ).group_by(TermDailyCount.term).order_by(current.desc()).limit(100).all()
+
+        curr_freq = {term: curr for term, curr, _ in rows if curr > 0}
+        prev_freq = {term: prev for term, _, prev in rows}
+        return NLPProcessor.surges_from_counts(curr_freq, prev_freq, top_n)
+
+    @staticmethod
+    def _unique_filters(model) -> List:
+        # Issues linked to a canonical issue repeat an earlier complaint
+        return [Issue.canonical_issue_id == None] if model is Issue else []
+
+    @staticmethod
+    def _window_filters(model, ts_col, start_date: datetime, end_date: datetime, region_id: Optional[str]) -> List:
+        filters = [ts_col >= start_date, ts_col <= end_date, *NLPService._unique_filters(model)]
+        if region_id:
+            # The region's whole subtree, matching the daily term table the surges read
+            # (a region missing from the closure table still counts for itself)
+            subtree = select(RegionClosure.descendant_id).where(RegionClosure.ancestor_id == region_id)
+            filters.append(or_(model.region_id == region_id, model.region_id.in_(subtree)))
+        return filters
+
+    @staticmethod
+    def _topic_clusters(cluster_counts: Counter) -> List[Dict]:
+        topic_model = TopicModelStore.get()
+        if topic_model is None or not topic_model.is_fitted:
+            return []
+        return [
+            {"cluster_id": c, "top_terms": topic_model.top_terms(c), "count": cluster_counts[c]}
+            for c in sorted(cluster_counts) if c < topic_model.num_clusters
+        ]
+
+    @staticmethod
+    def _window_aggregates(db: Session, start_date: datetime, end_date: datetime, region_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        The additive parts of the insights over a window, so that windows can be merged.
+        Classified rows are aggregated with GROUP BY. Rows still missing a classification
+        or topic are streamed in chunks and folded into the same counters, so memory does
+        not grow with the window.
+        """
+        failure_counts = Counter()
+        sentiment_sum = 0.0
+        cluster_counts = Counter()
+        classified = 0
+        topic_model = TopicModelStore.get()
+        if topic_model is not None and not topic_model.is_fitted:
+            topic_model = None
+
+        for model, ts_col, text_cols in TEXT_SOURCES.values():
+            filters = NLPService._window_filters(model, ts_col, start_date, end_date, region_id)
+
+            grouped = db.query(model.failure_type, func.count(), func.sum(model.sentiment_score)).filter(
+                *filters, model.sentiment_score != None
+            ).group_by(model.failure_type).all()
+            for failure_type, count, total in grouped:
+                failure_counts[failure_type] += count
+                sentiment_sum += total or 0.0
+                classified += count
+
+            pending = model.sentiment_score == None
+            if topic_model is not None:
+                for cluster_id, count in db.query(model.topic_cluster, func.count()).filter(
+                    *filters, model.topic_cluster != None
+                ).group_by(model.topic_cluster).all():
+                    cluster_counts[cluster_id] += count
+                pending = or_(pending, model.topic_cluster == None)
+
+            for chunk in NLPService._stream_rows(
+                db.query(model.sentiment_score == None, model.topic_cluster == None, *text_cols).filter(*filters, pending)
+            ):
+                unclassified = [" ".join(filter(None, row[2:])) for row in chunk if row[0]]
+                for analysis in NLPProcessor.analyze_batch(unclassified):
+                    failure_counts[analysis["failure_type"]] += 1
+                    sentiment_sum += analysis["sentiment_score"]
+                if topic_model is not None:
+                    cluster_counts.update(topic_model.predict([" ".join(filter(None, row[2:])) for row in chunk if row[1]]))
+
+        return {
+            "failure_counts": failure_counts,
+            "sentiment_sum": sentiment_sum,
+            "cluster_counts": cluster_counts,
+            "classified_documents": classified
+        }
+
+    @staticmethod
+    def _stream_rows(query, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[Tuple]]:
+        """
+        Rows of a column query in lists of at most `chunk_size`, fetched with yield_per
+        so only one chunk is held in memory at a time.
+        """
+        chunk = []
+        for row in query.yield_per(chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _insights_response(aggregates: Dict[str, Any], surges: List[Dict], start_date: datetime, end_date: datetime):
+        total_documents = sum(aggregates["failure_counts"].values())
+        if not total_documents:
+            return {"message": "No data for this period"}
+        return {
+            "period": {"start": start_date, "end": end_date},
+            "total_documents": total_documents,
+            "average_sentiment": round(aggregates["sentiment_sum"] / total_documents, 2),
+            "failure_distribution": dict(aggregates["failure_counts"]),
+            "topic_clusters": NLPService._topic_clusters(aggregates["cluster_counts"]),
+            # Surges come from the daily term table, which only counts classified documents
+            "classified_documents": aggregates["classified_documents"],
+            "keyword_surges": surges
+        }
+
     @staticmethod
     def get_aggregated_insights(
         db: Session, 
@@ -50,58 +745,42 @@ class NLPService:
         """
         Aggregates NLP metrics: Failure Distribution, Sentiment Trend, Topic Clusters, Surges.
         """
-        # Fetch relevant text data
-        # We combine Issue descriptions and TextRecords for a holistic view
-        
-        # 1. Fetch Issues
-        query = db.query(Issue).filter(Issue.created_at >= start_date, Issue.created_at <= end_date)
-        if region_id:
-            query = query.filter(Issue.region_id == region_id)
+        # Issues and TextRecords are combined for a holistic view
         # Note: policy_id filtering would require a join with Sector/Policy, omitted for brevity/schema constraints
-            
-        issues = query.all()
-        issue_texts = [f"{i.title} {i.description}" for i in issues]
-        
-        # 2. Fetch TextRecords
-        t_query = db.query(TextRecord).filter(TextRecord.timestamp >= start_date, TextRecord.timestamp <= end_date)
-        if region_id:
-            t_query = t_query.filter(TextRecord.region_id == region_id)
-        text_records = t_query.all()
-        record_texts = [r.value for r in text_records]
-        
-        all_texts = issue_texts + record_texts
-        
-        if not all_texts:
-            return {"message": "No data for this period"}
+        aggregates = NLPService._window_aggregates(db, start_date, end_date, region_id)
+        # Keyword surges against the previous period of equal length
+        surges = NLPService._keyword_surges(db, start_date.date(), end_date.date(), region_id)
+        return NLPService._insights_response(aggregates, surges, start_date, end_date)
 
-        # 3. Calculate Failure Distribution (using on-the-fly categorization for current set)
-        failures = []
-        sentiments = []
-        for text in all_texts:
-            failures.append(NLPProcessor.categorize_failure_type(text))
-            sentiments.append(NLPProcessor.compute_sentiment(text))
-            
-        failure_dist = dict(Counter(failures))
-        avg_sentiment = sum(sentiments) / len(sentiments) if sentiments else 0
-
-        # 4. Topic Clustering
-        clusters = NLPProcessor.cluster_topics(all_texts, num_clusters=min(5, len(all_texts)))
-        
-        # 5. Keyword Surges
-        # Get previous period data
-        duration = end_date - start_date
-        prev_start = start_date - duration
-        
-        prev_issues = db.query(Issue).filter(Issue.created_at >= prev_start, Issue.created_at < start_date).all()
-        prev_texts = [f"{i.title} {i.description}" for i in prev_issues]
-        
-        surges = NLPProcessor.compute_keyword_surge(all_texts, prev_texts)
+    @staticmethod
+    def get_recent_insights(
+        db: Session,
+        days: int,
+        region_id: Optional[str] = None,
+        policy_id: Optional[str] = None
+    ):
+        """
+        Insights for the last `days` whole days plus today so far. Aggregates over the
+        completed days come from NLPInsightsCache; only today's bucket is computed live.
+        Keyword surges are already read from the daily term table.
+        """
+        now = datetime.now()
+        today_start = datetime.combine(now.date(), dt_time.min)
+        start_date = today_start - timedelta(days=days)
+        key = (region_id, policy_id, days)
 
-        return {
-            "period": {"start": start_date, "end": end_date},
-            "total_documents": len(all_texts),
-            "average_sentiment": round(avg_sentiment, 2),
-            "failure_distribution": failure_dist,
-            "topic_clusters": clusters,
-            "keyword_surges": surges
+        completed = NLPInsightsCache.get(key, now.date())
+        if completed is None:
+            # Window filters are inclusive, so stop at the last instant of yesterday
+            completed = NLPService._window_aggregates(db, start_date, today_start - timedelta(microseconds=1), region_id)
+            NLPInsightsCache.put(key, now.date(), completed, settings.NLP_INSIGHTS_CACHE_TTL_SECONDS)
+
+        live = NLPService._window_aggregates(db, today_start, now, region_id)
+        merged = {
+            "failure_counts": completed["failure_counts"] + live["failure_counts"],
+            "sentiment_sum": completed["sentiment_sum"] + live["sentiment_sum"],
+            "cluster_counts": completed["cluster_counts"] + live["cluster_counts"],
+            "classified_documents": completed["classified_documents"] + live["classified_documents"]
         }
+        surges = NLPService._keyword_surges(db, start_date.date(), now.date(), region_id)
+        return NLPService._insights_response(merged, surges, start_date, now)
@@ -1,34 +1,188 @@
 from sqlalchemy.orm import Session
-from ..models import Region, RegionType
+from sqlalchemy import insert, select, literal
+from typing import List, Dict, Tuple, Optional, Any, NamedTuple
+import threading
+from ..db import SessionLocal
+from ..models import Region, RegionType, RegionClosure
 
-def get_districts(db: Session):
-    return db.query(Region).filter(Region.type == RegionType.DISTRICT).all()
+class RegionNode(NamedTuple):
+    id: str
+    name: str
+    type: RegionType
+    parent_id: Optional[str]
+    geometry: Any
 
-def get_taluks(db: Session, district_id: str):
-    return db.query(Region).filter(
-        Region.type == RegionType.TALUK,
-        Region.parent_id == district_id
-    ).all()
+class RegionTree:
+    """
+    Immutable snapshot of the region hierarchy.
+    Children, ancestors and subtrees are precomputed so every lookup is a dict access.
+    """
 
-def get_blocks(db: Session, taluk_id: str):
-    return db.query(Region).filter(
-        Region.type == RegionType.BLOCK,
-        Region.parent_id == taluk_id
-    ).all()
+    def __init__(self, nodes: List[RegionNode]):
+        self.by_id: Dict[str, RegionNode] = {n.id: n for n in nodes}
 
-def get_panchayats(db: Session, block_id: str):
-    return db.query(Region).filter(
-        Region.type == RegionType.PANCHAYAT_WARD,
-        Region.parent_id == block_id
-    ).all()
+        by_type: Dict[RegionType, List[RegionNode]] = {}
+        children: Dict[str, List[RegionNode]] = {}
+        for n in nodes:
+            by_type.setdefault(n.type, []).append(n)
+            if n.parent_id in self.by_id:
+                children.setdefault(n.parent_id, []).append(n)
+        self.by_type: Dict[RegionType, Tuple[RegionNode, ...]] = {t: tuple(v) for t, v in by_type.items()}
+        self.children: Dict[str, Tuple[RegionNode, ...]] = {k: tuple(v) for k, v in children.items()}
 
-def get_region(db: Session, region_id: str):
-    return db.query(Region).filter(Region.id == region_id).first()
+        # Ancestors ordered parent-first; a cycle in parent_id stops the walk
+        self.ancestors: Dict[str, Tuple[RegionNode, ...]] = {}
+        subtree: Dict[str, List[RegionNode]] = {n.id: [n] for n in nodes}
+        for n in nodes:
+            chain, seen = [], {n.id}
+            parent = self.by_id.get(n.parent_id)
+            while parent and parent.id not in seen:
+                chain.append(parent)
+                subtree[parent.id].append(n)
+                seen.add(parent.id)
+                parent = self.by_id.get(parent.parent_id)
+            self.ancestors[n.id] = tuple(chain)
+        self.subtree: Dict[str, Tuple[RegionNode, ...]] = {k: tuple(v) for k, v in subtree.items()}
+
+    def get(self, region_id: str) -> Optional[RegionNode]:
+        return self.by_id.get(region_id)
+
+    def children_of(self, region_id: str, type: Optional[RegionType] = None) -> Tuple[RegionNode, ...]:
+        kids = self.children.get(region_id, ())
+        if type is None:
+            return kids
+        return tuple(k for k in kids if k.type == type)
+
+    def of_type(self, type: RegionType) -> Tuple[RegionNode, ...]:
+        return self.by_type.get(type, ())
+
+    def ancestors_of(self, region_id: str) -> Tuple[RegionNode, ...]:
+        return self.ancestors.get(region_id, ())
+
+    def subtree_of(self, region_id: str) -> Tuple[RegionNode, ...]:
+        return self.subtree.get(region_id, ())
+
+# Process-wide cache. Each worker process holds its own copy,
+# so invalidation only reaches the process that created the region.
+_tree: Optional[RegionTree] = None
+_tree_generation = 0
+_tree_lock = threading.Lock()
+
+def load_region_tree(db: Session) -> RegionTree:
+    """
+    Builds a fresh snapshot from the regions table and installs it as the cache,
+    unless the cache was invalidated while the snapshot was being read.
+    """
+    global _tree
+    generation = _tree_generation
+    rows = db.query(Region.id, Region.name, Region.type, Region.parent_id, Region.geometry).all()
+    tree = RegionTree([RegionNode(*r) for r in rows])
+    with _tree_lock:
+        if generation == _tree_generation:
+            _tree = tree
+    return tree
+
+def get_region_tree() -> RegionTree:
+    """
+    Cached region tree, rebuilt on first use after invalidation.
+    """
+    tree = _tree
+    if tree is not None:
+        return tree
+    with _tree_lock:
+        if _tree is not None:
+            return _tree
+    db = SessionLocal()
+    try:
+        return load_region_tree(db)
+    finally:
+        db.close()
+
+def invalidate_region_tree():
+    global _tree, _tree_generation
+    with _tree_lock:
+        _tree = None
+        _tree_generation += 1
+
+def get_districts():
+    return get_region_tree().of_type(RegionType.DISTRICT)
+
+def get_taluks(district_id: str):
+    return get_region_tree().children_of(district_id, RegionType.TALUK)
+
+def get_blocks(taluk_id: str):
+    return get_region_tree().children_of(taluk_id, RegionType.BLOCK)
+
+def get_panchayats(block_id: str):
+    return get_region_tree().children_of(block_id, RegionType.PANCHAYAT_WARD)
+
+def get_region(region_id: str) -> Optional[RegionNode]:
+    return get_region_tree().get(region_id)
+
+def get_children(region_id: str):
+    return get_region_tree().children_of(region_id)
+
+def get_ancestors(region_id: str):
+    return get_region_tree().ancestors_of(region_id)
+
+def get_subtree_ids(db: Session, region_id: str) -> List[str]:
+    """
+    Region itself plus all of its descendants, via the closure table.
+    """
+    return [r[0] for r in db.query(RegionClosure.descendant_id).filter(
+        RegionClosure.ancestor_id == region_id
+    ).all()]
+
+def get_ancestor_ids(db: Session, region_id: str) -> List[str]:
+    """
+    Ancestors of a region ordered from its parent up to the root.
+    """
+    return [r[0] for r in db.query(RegionClosure.ancestor_id).filter(
+        RegionClosure.descendant_id == region_id,
+        RegionClosure.depth > 0
+    ).order_by(RegionClosure.depth).all()]
+
+def rebuild_closure(db: Session) -> int:
+    """
+    Rebuilds the closure table from Region.parent_id.
+    Needed after regions are inserted outside create_region (e.g. seed scripts).
+    """
+    parents = dict(db.query(Region.id, Region.parent_id).all())
+    rows = []
+    for region_id in parents:
+        rows.append({"ancestor_id": region_id, "descendant_id": region_id, "depth": 0})
+        ancestor, depth, seen = parents[region_id], 1, {region_id}
+        while ancestor and ancestor in parents and ancestor not in seen:
+            rows.append({"ancestor_id": ancestor, "descendant_id": region_id, "depth": depth})
+            seen.add(ancestor)
+            ancestor, depth = parents[ancestor], depth + 1
+
+    db.query(RegionClosure).delete(synchronize_session=False)
+    if rows:
+        db.bulk_insert_mappings(RegionClosure, rows)
+    db.commit()
+    invalidate_region_tree()
+    return len(rows)
 
 # Admin helper
 def create_region(db: Session, name: str, type: RegionType, parent_id: str = None):
     region = Region(name=name, type=type, parent_id=parent_id)
     db.add(region)
+    db.flush()
+
+    # Closure rows: self at depth 0, then every ancestor of the parent one level deeper
+    db.add(RegionClosure(ancestor_id=region.id, descendant_id=region.id, depth=0))
+    if parent_id:
+        db.execute(insert(RegionClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(
+                RegionClosure.ancestor_id,
+                literal(region.id),
+                RegionClosure.depth + 1
+            ).where(RegionClosure.descendant_id == parent_id)
+        ))
+
     db.commit()
     db.refresh(region)
+    invalidate_region_tree()
     return region
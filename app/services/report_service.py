@@ -2,52 +2,89 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 import csv
 import io
+import zlib
 from datetime import datetime
+from typing import Iterator, List, Optional
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from ..db import SessionLocal
 from ..models import Issue, IssueStatus, Urgency, Alert
 
-def generate_csv_export(db: Session, filters: dict = None) -> io.StringIO:
-    """
-    Generates a raw CSV dump of Issues based on filters.
-    """
-    query = db.query(Issue)
-    
-    # Apply basic filters if provided
+CSV_HEADER = ['ID', 'Title', 'Description', 'Category', 'Urgency', 'Status', 'Location', 'Reporter ID', 'Created At']
+CSV_COLUMNS = (
+    Issue.id, Issue.title, Issue.description, Issue.category, Issue.urgency,
+    Issue.status, Issue.location, Issue.reporter_id, Issue.created_at
+)
+# Rows fetched per round trip and encoded per yielded chunk
+CSV_CHUNK_ROWS = 1000
+
+def _csv_filters(filters: Optional[dict]) -> List:
+    clauses = []
     if filters:
-        if filters.get('status'):
-            query = query.filter(Issue.status == filters['status'])
-        if filters.get('urgency'):
-            query = query.filter(Issue.urgency == filters['urgency'])
+        try:
+            if filters.get('status'):
+                clauses.append(Issue.status == IssueStatus(filters['status']))
+            if filters.get('urgency'):
+                clauses.append(Issue.urgency == Urgency(filters['urgency']))
+        except ValueError as e:
+            raise ValueError(f"Invalid filter: {e}")
         if filters.get('region_id'):
-            query = query.filter(Issue.region_id == filters['region_id'])
+            clauses.append(Issue.region_id == filters['region_id'])
+    return clauses
 
-    issues = query.all()
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow(['ID', 'Title', 'Description', 'Category', 'Urgency', 'Status', 'Location', 'Reporter ID', 'Created At'])
-    
-    # Rows
-    for issue in issues:
-        writer.writerow([
-            issue.id,
-            issue.title,
-            issue.description,
-            issue.category,
-            issue.urgency.value,
-            issue.status.value,
-            issue.location,
-            issue.reporter_id,
-            issue.created_at.isoformat() if issue.created_at else ''
-        ])
-    
-    output.seek(0)
-    return output
+def stream_csv_export(filters: dict = None, compress: bool = False, chunk_size: int = CSV_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Raw CSV dump of Issues based on filters, as an iterator of encoded chunks for a
+    StreamingResponse. Filters are checked here, before anything is sent; rows are
+    then read lazily, so the header goes out at once and memory stays flat.
+    """
+    return _csv_chunks(_csv_filters(filters), compress, chunk_size)
+
+def _csv_chunks(clauses: List, compress: bool, chunk_size: int) -> Iterator[bytes]:
+    # wbits=31 writes a gzip container; each chunk is sync-flushed so it is sent right away
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def encode(final: bool = False) -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    writer.writerow(CSV_HEADER)
+    yield encode()
+
+    # The request's session may be closed before the body is sent, so the stream owns one
+    db = SessionLocal()
+    try:
+        # yield_per streams results (a server-side cursor on PostgreSQL) instead of buffering them all
+        rows = db.query(*CSV_COLUMNS).filter(*clauses).yield_per(chunk_size)
+        pending = 0
+        for issue_id, title, description, category, urgency, status, location, reporter_id, created_at in rows:
+            writer.writerow([
+                issue_id,
+                title,
+                description,
+                category,
+                urgency.value if urgency else '',
+                status.value if status else '',
+                location,
+                reporter_id,
+                created_at.isoformat() if created_at else ''
+            ])
+            pending += 1
+            if pending == chunk_size:
+                yield encode()
+                pending = 0
+    finally:
+        db.close()
+
+    yield encode(final=True)
 
 def generate_pdf_summary(db: Session, user_name: str) -> io.BytesIO:
     """
@@ -0,0 +1,222 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, bindparam, DateTime
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+
+from ..models import SearchDocument
+
+logger = logging.getLogger("civic_radar")
+
+DOC_TYPES = ("issue", "text_record")
+
+# (doc_type, source table, id, region, timestamp, title, body, columns whose change re-indexes)
+SEARCH_SOURCES = [
+    ("issue", "issues", "id", "region_id", "created_at", "title", "description", "title, description, region_id"),
+    ("text_record", "text_records", "id", "region_id", "timestamp", "NULL", "value", "value, region_id, timestamp"),
+]
+
+# The trigram tokenizer matches any 3+ character substring, which suits Tamil:
+# unicode61 would split words at vowel signs, and suffixes attach directly to stems
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        title, body, content='search_documents', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+for doc_type, table, id_col, region_col, ts_col, title_col, body_col, watched in SEARCH_SOURCES:
+    title_new = "NULL" if title_col == "NULL" else f"new.{title_col}"
+    SQLITE_DDL += [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO search_documents(doc_type, doc_id, region_id, ts, title, body)
+            VALUES ('{doc_type}', new.{id_col}, new.{region_col}, new.{ts_col}, {title_new}, new.{body_col});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE OF {watched} ON {table} BEGIN
+            UPDATE search_documents SET region_id = new.{region_col}, ts = new.{ts_col},
+                title = {title_new}, body = new.{body_col}
+            WHERE doc_type = '{doc_type}' AND doc_id = old.{id_col};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN
+            DELETE FROM search_documents WHERE doc_type = '{doc_type}' AND doc_id = old.{id_col};
+        END""",
+    ]
+
+# The 'simple' configuration neither stems nor drops stop words, so it treats
+# English and Tamil alike
+POSTGRES_DDL = [
+    """ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(body, ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_search_vector ON search_documents USING GIN (search_vector)",
+]
+for doc_type, table, id_col, region_col, ts_col, title_col, body_col, watched in SEARCH_SOURCES:
+    title_new = "NULL" if title_col == "NULL" else f"NEW.{title_col}"
+    POSTGRES_DDL += [
+        f"""CREATE OR REPLACE FUNCTION {table}_search_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM search_documents WHERE doc_type = '{doc_type}' AND doc_id = OLD.{id_col};
+                RETURN OLD;
+            END IF;
+            INSERT INTO search_documents(doc_type, doc_id, region_id, ts, title, body)
+            VALUES ('{doc_type}', NEW.{id_col}, NEW.{region_col}, NEW.{ts_col}, {title_new}, NEW.{body_col})
+            ON CONFLICT (doc_type, doc_id) DO UPDATE SET region_id = EXCLUDED.region_id, ts = EXCLUDED.ts,
+                title = EXCLUDED.title, body = EXCLUDED.body;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql""",
+        f"DROP TRIGGER IF EXISTS {table}_search_sync ON {table}",
+        f"""CREATE TRIGGER {table}_search_sync AFTER INSERT OR UPDATE OF {watched} OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_sync()""",
+    ]
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+def ensure_search_index(db: Session) -> int:
+    """
+    Creates the full-text index and the triggers that keep it in step with issues and
+    text records (idempotent; run at startup). When the index is empty it is filled
+    from the existing rows. Returns the number of documents backfilled.
+    """
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        statements = SQLITE_DDL
+    elif dialect == "postgresql":
+        statements = POSTGRES_DDL
+    else:
+        logger.warning(f"Full-text search is not supported on {dialect}.")
+        return 0
+
+    for statement in statements:
+        db.execute(text(statement))
+    db.commit()
+
+    if db.query(SearchDocument.id).first() is not None:
+        return 0
+    return rebuild_search_index(db)
+
+def rebuild_search_index(db: Session) -> int:
+    """
+    Repopulates search_documents (and through its triggers the FTS table) from scratch.
+    """
+    db.query(SearchDocument).delete(synchronize_session=False)
+    backfilled = 0
+    for doc_type, table, id_col, region_col, ts_col, title_col, body_col, _ in SEARCH_SOURCES:
+        result = db.execute(text(
+            f"INSERT INTO search_documents(doc_type, doc_id, region_id, ts, title, body) "
+            f"SELECT '{doc_type}', {id_col}, {region_col}, {ts_col}, {title_col}, {body_col} FROM {table}"
+        ))
+        backfilled += result.rowcount
+    db.commit()
+    logger.info(f"Search index rebuilt ({backfilled} documents).")
+    return backfilled
+
+def _sqlite_match_query(query: str) -> str:
+    """
+    User input -> FTS5 MATCH expression: every whitespace-separated term must occur,
+    each quoted so that FTS5 operators and punctuation are taken literally.
+    Trigram indexes cannot match terms shorter than three characters, so those are dropped.
+    """
+    terms = [t for t in query.split() if len(t) >= 3]
+    if not terms:
+        raise ValueError("Search terms must be at least 3 characters long")
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+def search(
+    db: Session,
+    query: str,
+    region_id: Optional[str] = None,
+    doc_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 20,
+    offset: int = 0
+) -> Dict[str, Any]:
+    """
+    Ranked full-text search over issues and text records. `region_id` covers the
+    region's whole subtree. Hits carry a snippet with matches in [brackets].
+    """
+    if doc_type is not None and doc_type not in DOC_TYPES:
+        raise ValueError(f"doc_type must be one of {', '.join(DOC_TYPES)}")
+
+    dialect = _dialect(db)
+    filters = []
+    params: Dict[str, Any] = {"limit": limit, "offset": offset}
+    if region_id:
+        filters.append("d.region_id IN (SELECT descendant_id FROM region_closure WHERE ancestor_id = :region_id)")
+        params["region_id"] = region_id
+    if doc_type:
+        filters.append("d.doc_type = :doc_type")
+        params["doc_type"] = doc_type
+    if start:
+        filters.append("d.ts >= :start")
+        params["start"] = start
+    if end:
+        filters.append("d.ts <= :end")
+        params["end"] = end
+    where = "".join(f" AND {f}" for f in filters)
+
+    if dialect == "sqlite":
+        params["q"] = _sqlite_match_query(query)
+        source = f"search_fts JOIN search_documents d ON d.id = search_fts.rowid WHERE search_fts MATCH :q{where}"
+        # bm25 is lower-is-better; negate so a higher score ranks first on both backends.
+        # Trigram snippets count characters, 64 being the maximum
+        columns = "-bm25(search_fts) AS score, snippet(search_fts, -1, '[', ']', '…', 64) AS snippet"
+        order = "bm25(search_fts)"
+    elif dialect == "postgresql":
+        if not query.strip():
+            raise ValueError("Search query must not be empty")
+        params["q"] = query
+        source = f"search_documents d, websearch_to_tsquery('simple', :q) q WHERE d.search_vector @@ q{where}"
+        columns = (
+            "ts_rank_cd(d.search_vector, q) AS score, "
+            "ts_headline('simple', coalesce(d.title || ' — ', '') || coalesce(d.body, ''), q, "
+            "'StartSel=[, StopSel=], MaxWords=30, MinWords=10') AS snippet"
+        )
+        order = "score DESC"
+    else:
+        raise ValueError(f"Full-text search is not supported on {dialect}")
+
+    def bind(sql: str):
+        statement = text(sql)
+        # Typed so timestamps are compared in the format the columns are stored in
+        for name in ("start", "end"):
+            if name in params:
+                statement = statement.bindparams(bindparam(name, type_=DateTime(timezone=True)))
+        return statement
+
+    total = db.execute(bind(f"SELECT count(*) FROM {source}"), params).scalar()
+    rows = db.execute(bind(
+        f"SELECT d.doc_type, d.doc_id, d.region_id, d.ts, d.title, {columns} "
+        f"FROM {source} ORDER BY {order} LIMIT :limit OFFSET :offset"
+    ).columns(ts=DateTime(timezone=True)), params).all()
+
+    return {
+        "query": query,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "results": [
+            {
+                "doc_type": r.doc_type,
+                "doc_id": r.doc_id,
+                "region_id": r.region_id,
+                "timestamp": r.ts,
+                "title": r.title,
+                "snippet": r.snippet,
+                # Significant figures: bm25 scores on small corpora are tiny, and fixed
+                # decimals would flatten them to 0.0
+                "score": float(f"{float(r.score):.4g}")
+            }
+            for r in rows
+        ]
+    }
@@ -0,0 +1,48 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analytics.changepoints import ChangepointEngine
+
+def make_series(rng, n: int, segment: int = 200) -> np.ndarray:
+    # Piecewise-constant mean with a new level every `segment` points
+    levels = rng.normal(0, 3, n // segment + 1)
+    return np.repeat(levels, segment)[:n] + rng.normal(0, 1, n)
+
+def time_call(fn, values, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(values)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_scaling(rng, lengths, repeats: int):
+    print(f"{'n':>10} {'binseg (ms)':>12} {'pelt (ms)':>12}")
+    for n in lengths:
+        values = make_series(rng, n)
+        binseg = time_call(ChangepointEngine.binary_segmentation, values, repeats)
+        pelt = time_call(ChangepointEngine.pelt, values, repeats) if n <= 100_000 else float("nan")
+        print(f"{n:>10} {binseg * 1000:>12.2f} {pelt * 1000:>12.2f}")
+
+def bench_fleet(rng, num_series: int, length: int):
+    series = [make_series(rng, length) for _ in range(num_series)]
+    start = time.perf_counter()
+    found = sum(len(ChangepointEngine.detect(s)) for s in series)
+    elapsed = time.perf_counter() - start
+    print(f"\n{num_series} series x {length} points: {elapsed:.2f}s ({found} changepoints)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark changepoint detection scaling")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--series", type=int, default=2000, help="Series count for the fleet run")
+    parser.add_argument("--length", type=int, default=3650, help="Points per series for the fleet run")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    bench_scaling(rng, [1_000, 10_000, 100_000, 1_000_000], args.repeats)
+    bench_fleet(rng, args.series, args.length)
@@ -0,0 +1,104 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analytics.nlp import NLPProcessor
+
+ENGLISH_FILLER = [
+    "the", "ration", "shop", "was", "not", "open", "for", "our", "village", "nothing", "repayment",
+    "know", "pension", "water", "supply", "officer", "today", "week", "madam", "please", "since",
+    "months", "and", "is", "we", "have", "been", "asking", "about", "card", "name", "list", "given",
+    "there", "this", "nobody", "payment", "notice", "street", "light", "school", "teacher"
+]
+TAMIL_FILLER = [
+    "கடை", "ஊர்", "தண்ணீர்", "இன்று", "அலுவலர்", "ரேஷன்", "அட்டை", "எங்கள்", "கிராமத்தில்",
+    "மாதமாக", "இல்லை", "வரவில்லை", "பெயர்", "பட்டியலில்", "மின்சாரம்", "பள்ளி"
+]
+
+def all_keywords():
+    keywords = [k for ks in NLPProcessor.FAILURE_KEYWORDS.values() for k in ks]
+    return keywords + NLPProcessor.SENTIMENT_POSITIVE + NLPProcessor.SENTIMENT_NEGATIVE
+
+def make_texts(rng, n: int, max_words: int, tamil_share: float):
+    # Complaint-like texts: mostly ordinary words with a few keywords, one language each
+    english_kw = [k for k in all_keywords() if k.isascii()]
+    tamil_kw = [k for k in all_keywords() if not k.isascii()]
+    texts = []
+    for _ in range(n):
+        filler, keywords = (TAMIL_FILLER, tamil_kw) if rng.random() < tamil_share else (ENGLISH_FILLER, english_kw)
+        words = [rng.choice(filler) for _ in range(rng.randint(max(1, max_words // 5), max_words))]
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        text = " ".join(words)
+        texts.append(text[0].upper() + text[1:] + ".")
+    return texts
+
+def substring_failure_type(text: str) -> str:
+    # Pre-matcher implementation: one substring scan per keyword
+    text_lower = text.lower()
+    for category, keywords in NLPProcessor.FAILURE_KEYWORDS.items():
+        if any(k in text_lower for k in keywords):
+            return category
+    return "other"
+
+def substring_sentiment(text: str) -> float:
+    text_lower = text.lower()
+    pos_score = sum(1 for w in NLPProcessor.SENTIMENT_POSITIVE if w in text_lower)
+    neg_score = sum(1 for w in NLPProcessor.SENTIMENT_NEGATIVE if w in text_lower)
+    total = pos_score + neg_score
+    return 0.0 if total == 0 else (pos_score - neg_score) / total
+
+def charloop_language(text: str) -> str:
+    low, high = NLPProcessor.TAMIL_UNICODE_RANGE
+    return "ta" if any(low <= ord(c) <= high for c in text) else "en"
+
+def best_of(fn, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the compiled keyword matcher against substring scans")
+    parser.add_argument("--texts", type=int, default=50_000)
+    parser.add_argument("--words", type=int, default=40, help="Maximum words per text")
+    parser.add_argument("--tamil-share", type=float, default=0.3)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = make_texts(rng, args.texts, args.words, args.tamil_share)
+    n = len(texts)
+
+    old, old_time = best_of(lambda: [(substring_failure_type(t), substring_sentiment(t)) for t in texts], args.repeats)
+    new, new_time = best_of(lambda: [
+        (NLPProcessor._failure_type_from_hits(h), NLPProcessor._sentiment_from_hits(h))
+        for h in NLPProcessor.matcher.match_batch(texts)
+    ], args.repeats)
+    _, old_lang = best_of(lambda: [charloop_language(t) for t in texts], args.repeats)
+    _, new_lang = best_of(lambda: [NLPProcessor.detect_language(t) for t in texts], args.repeats)
+    _, old_full = best_of(lambda: [
+        (charloop_language(t), substring_sentiment(t), substring_failure_type(t)) for t in texts
+    ], args.repeats)
+    _, new_full = best_of(lambda: NLPProcessor.analyze_batch(texts), args.repeats)
+
+    print(f"{n} texts, up to {args.words} words, {args.tamil_share:.0%} Tamil (best of {args.repeats})\n")
+    print(f"{'':<24} {'before':>10} {'after':>10} {'speedup':>8}")
+    for name, before, after in [
+        ("failure + sentiment", old_time, new_time),
+        ("language", old_lang, new_lang),
+        ("analyze (all three)", old_full, new_full),
+    ]:
+        print(f"{name:<24} {before:>9.2f}s {after:>9.2f}s {before / after:>7.1f}x")
+    print(f"\nanalyze throughput: {n / old_full:,.0f} -> {n / new_full:,.0f} texts/s")
+
+    type_diff = sum(1 for o, m in zip(old, new) if o[0] != m[0])
+    sentiment_diff = sum(1 for o, m in zip(old, new) if o[1] != m[1])
+    print(f"failure type differs on {type_diff / n:.1%} of texts, sentiment on {sentiment_diff / n:.1%}")
+    print("(substring scans also hit keywords inside other words, e.g. 'no' in 'know', and miss inflected Tamil)")
@@ -0,0 +1,78 @@
+import sys
+import os
+import argparse
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analytics.sketches import KLLSketch
+from app.analytics.deviations import DeviationDetector
+
+QS = [0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99]
+
+def rank_error(sketch: KLLSketch, exact: np.ndarray) -> float:
+    # Largest gap between the requested rank and the true rank of the returned value
+    worst = 0.0
+    for q, value in zip(QS, sketch.quantiles(QS)):
+        lo = np.searchsorted(exact, value, side="left") / len(exact)
+        hi = np.searchsorted(exact, value, side="right") / len(exact)
+        worst = max(worst, 0.0 if lo <= q <= hi else min(abs(q - lo), abs(q - hi)))
+    return worst
+
+def merged_sketch(parts, k: int) -> KLLSketch:
+    # Mirrors the ingest path: each batch is sketched, stored as bytes and merged into the series
+    sketch = KLLSketch(k)
+    for part in parts:
+        sketch = KLLSketch.from_bytes(sketch.to_bytes())
+        sketch.merge(KLLSketch.from_values(part, k))
+    return sketch
+
+def check_merge_bounds(rng, k: int, n: int, batches: int, max_error: float) -> bool:
+    ok = True
+    datasets = {
+        "normal": rng.normal(50, 10, n),
+        "lognormal": rng.lognormal(0, 2, n),
+        "counts": rng.poisson(3, n).astype(float),
+        "sorted": np.sort(rng.normal(0, 1, n))
+    }
+    print(f"{'data':>10} {'single':>8} {'merged':>8}")
+    for name, values in datasets.items():
+        exact = np.sort(values)
+        single = rank_error(KLLSketch.from_values(values, k), exact)
+        merged = merged_sketch(np.array_split(values, batches), k)
+        error = rank_error(merged, exact)
+        exact_summary = merged.count == n and merged.min_value == exact[0] and merged.max_value == exact[-1]
+        print(f"{name:>10} {single:>8.4f} {error:>8.4f}")
+        if error > max_error or single > max_error or not exact_summary:
+            print(f"  FAIL: {name} exceeds rank error {max_error} or lost count/min/max")
+            ok = False
+    return ok
+
+def check_collapsed_scale() -> bool:
+    # Over 75% of a count series on one value: MAD and IQR are both 0
+    values = [5.0] * 39 + [100.0]
+    stats = KLLSketch.from_values(values).robust_stats()
+    scale = 1.4826 * stats["mad"] or stats["iqr"] / 1.349
+    detectors_safe = (
+        DeviationDetector.zscore(values[-1], stats["median"], scale) is None
+        and DeviationDetector.cusum(values, stats["median"], scale) is None
+        and DeviationDetector.ewma(values, stats["median"], scale) is None
+    )
+    print(f"\ncollapsed series: scale={scale}, detectors return None: {detectors_safe}")
+    if scale != 0 or not detectors_safe:
+        print("  FAIL: a zero robust scale must be detected and not divided by")
+        return False
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check KLL sketch merge error bounds and zero-scale handling")
+    parser.add_argument("--k", type=int, default=200)
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--batches", type=int, default=500, help="Merges per series, as from repeated ingests")
+    parser.add_argument("--max-rank-error", type=float, default=0.02)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    ok = check_merge_bounds(rng, args.k, args.n, args.batches, args.max_rank_error)
+    ok = check_collapsed_scale() and ok
+    sys.exit(0 if ok else 1)
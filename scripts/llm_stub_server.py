@@ -0,0 +1,60 @@
+"""
+Local stand-in for the Gemini generateContent endpoint, for exercising the LLM client
+(timeouts, retries, circuit breaker) without network access or an API key.
+
+    python scripts/llm_stub_server.py --port 8090 --latency 0.2 --fail-rate 0.3
+    GEMINI_BASE_URL=http://127.0.0.1:8090 GEMINI_API_KEY=stub python scripts/run_dev.py
+"""
+import asyncio
+import argparse
+import random
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+def create_app(latency: float, jitter: float, fail_rate: float, fail_status: int) -> FastAPI:
+    app = FastAPI(title="LLM stub")
+    app.state.requests = 0
+
+    @app.post("/{api_version}/models/{model}:generateContent")
+    async def generate_content(api_version: str, model: str, request: Request):
+        app.state.requests += 1
+        body = await request.json()
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+        if random.random() < fail_rate:
+            return JSONResponse(
+                status_code=fail_status,
+                content={"error": {"code": fail_status, "message": "Stub failure", "status": "UNAVAILABLE"}}
+            )
+
+        prompt = body["contents"][0]["parts"][0]["text"]
+        severity = next((line.split(":", 1)[1].strip() for line in prompt.splitlines() if "Severity:" in line), "UNKNOWN")
+        return {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": f"[stub {model}] {severity} alert explained."}]},
+                "finishReason": "STOP"
+            }],
+            "usageMetadata": {"promptTokenCount": len(prompt.split()), "candidatesTokenCount": 5}
+        }
+
+    @app.get("/stats")
+    def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake Gemini generateContent API")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--fail-status", type=int, default=503)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(args.latency, args.jitter, args.fail_rate, args.fail_status),
+        host="127.0.0.1", port=args.port
+    )
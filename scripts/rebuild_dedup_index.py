@@ -0,0 +1,26 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal, init_db
+from app.services import dedup_service
+from app.services.nlp_service import NLPService
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the near-duplicate index and re-link all classified issues")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        result = dedup_service.rebuild_duplicate_links(db, args.chunk_size)
+        # Term counts only include canonical issues, so recount against the new links
+        documents = NLPService.rebuild_term_counts(db, args.chunk_size)
+    finally:
+        db.close()
+
+    print(f"Checked {result['checked']} issues: {result['duplicates']} duplicates, {result['indexed']} canonical issues indexed.")
+    print(f"Recounted terms of {documents} documents.")
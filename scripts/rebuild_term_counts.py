@@ -0,0 +1,22 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal, init_db
+from app.services.nlp_service import NLPService
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recount the daily term table from all classified texts")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        documents = NLPService.rebuild_term_counts(db, args.chunk_size)
+    finally:
+        db.close()
+
+    print(f"Recounted terms of {documents} documents.")
@@ -0,0 +1,25 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal, init_db
+from app.services.nlp_service import NLPService
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify every unanalyzed Issue and TextRecord")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size; 0 runs inline")
+    parser.add_argument("--max-rows", type=int, default=None, help="Stop after this many rows; the next run resumes")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        summary = NLPService.run_backlog_job(db, args.chunk_size, args.workers, args.max_rows)
+    finally:
+        db.close()
+
+    for key, value in summary.items():
+        print(f"{key}: {value}")
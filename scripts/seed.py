@@ -7,6 +7,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.db import SessionLocal, init_db, engine
 from app.models import Base, Region, RegionType, Sector, Policy, User, Role, SignalDefinition
 from app.services.auth_service import create_user
+from app.services.region_service import rebuild_closure
 
 def seed_data():
     print("Creating tables...")
@@ -37,6 +38,7 @@ def seed_data():
             db.add(reg)
             
     db.commit()
+    rebuild_closure(db)
 
     # 2. Sectors & Signals (matching dataset.json IDs for seamless ingest)
     print("Seeding Sectors...")
@@ -0,0 +1,24 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal, init_db
+from app.services.nlp_service import NLPService
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the topic model with new documents and assign cluster ids")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--rebuild", action="store_true", help="Start from a fresh model and recluster everything")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        summary = NLPService.train_topic_model(db, args.batch_size, args.rebuild)
+    finally:
+        db.close()
+
+    for key, value in summary.items():
+        print(f"{key}: {value}")